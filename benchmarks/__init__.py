@@ -0,0 +1,5 @@
+"""Performance benchmarks, run each module with python -m benchmarks.<name>
+
+bench_pipeline and bench_startup call the API through httpx, installed with
+pip install -r requirements-dev.txt.
+"""
@@ -0,0 +1,128 @@
+"""Compare parsing CreateDate values row by row against the column-wise parser.
+
+Synthetic columns mix the formats found in the data, mostly "+00:00" timestamps
+with some Twitter style dates, and repeat a share of the values the way tweets
+posted in the same second do. The baseline is a copy of the per-row chain used
+before column-wise parsing: CSVConverterService.parse_date as it was, then the
+fromisoformat check normalization ran on every record. The current per-row
+parse_date is timed as well.
+
+    python -m benchmarks.bench_date_parsing --sizes 10000 100000 1000000
+"""
+import argparse
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from src.services.csv_converter_service import CSVConverterService
+from src.services.date_parsing import parse_dates
+
+from .common import add_output_arguments, emit
+
+# The baseline logs a warning per date it cannot parse, kept quiet here but still paid for
+legacy_logger = logging.getLogger(f"{__name__}.legacy")
+legacy_logger.setLevel(logging.ERROR)
+
+def legacy_parse_date(date_str: str) -> str:
+    "CSVConverterService.parse_date before column-wise parsing, copied as the baseline"
+    try:
+        if date_str:
+            # Handle different date formats
+            if '+00:00' in date_str:
+                # Format: "2020-02-15 17:57:21+00:00"
+                date_str_clean = date_str.split('+')[0].strip()
+                parsed_date = datetime.strptime(date_str_clean, "%Y-%m-%d %H:%M:%S")
+            elif 'Mon Jan' in date_str or 'Sat Jan' in date_str:
+                # Format: "Mon Jan 04 10:16:31 -0500 2021"
+                try:
+                    parsed_date = datetime.strptime(date_str, "%a %b %d %H:%M:%S %z %Y")
+                except ValueError:
+                    # Try without timezone
+                    date_str_clean = date_str.split(' -')[0] + ' ' + date_str.split(' ')[-1]
+                    parsed_date = datetime.strptime(date_str_clean, "%a %b %d %H:%M:%S %Y")
+            else:
+                # Try standard format
+                parsed_date = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
+
+            return parsed_date.isoformat()
+        return datetime.now().isoformat()
+    except ValueError as e:
+        legacy_logger.warning(f"Could not parse date: {date_str}, using current time. Error: {e}")
+        return datetime.now().isoformat()
+
+def legacy_per_row(column: List[str]) -> List[str]:
+    "The per-row chain before column-wise parsing: parse, then validate in normalization"
+    parsed = []
+    for value in column:
+        date_str = legacy_parse_date(value)
+        try:
+            datetime.fromisoformat(date_str)
+        except (TypeError, ValueError):
+            legacy_logger.warning(f"Could not parse date: {date_str}, using current time")
+            date_str = datetime.now().isoformat()
+        parsed.append(date_str)
+    return parsed
+
+def make_dates(count: int, duplicates: float = 0.2, twitter: float = 0.01, seed: int = 0) -> List[str]:
+    "Synthetic CreateDate column"
+    rng = random.Random(seed)
+    start = datetime(2019, 1, 1)
+    values: List[str] = []
+    for _ in range(count):
+        if values and rng.random() < duplicates:
+            values.append(rng.choice(values))
+            continue
+        moment = start + timedelta(seconds=rng.randint(0, 3 * 365 * 86400))
+        if rng.random() < twitter:
+            values.append(moment.strftime("%a %b %d %H:%M:%S -0500 %Y"))
+        else:
+            values.append(moment.strftime("%Y-%m-%d %H:%M:%S+00:00"))
+    return values
+
+def measure(func: Callable[[List[str]], List[Any]], values: List[str], repeat: int) -> Dict[str, Any]:
+    "Best wall time over repeat runs"
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(values)
+        best = min(best, time.perf_counter() - start)
+    return {"wall_ms": round(best * 1000, 2), "rows_per_second": int(len(values) / best)}
+
+def run(sizes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    "Benchmark the baseline, current per-row and column-wise parsers for each column size"
+    converter = CSVConverterService()
+    results = []
+    for size in sizes:
+        values = make_dates(size)
+        per_row = lambda column: [converter.parse_date(value) for value in column]
+        assert per_row(values) == parse_dates(values)
+        row = {
+            "rows": size,
+            "baseline": measure(legacy_per_row, values, repeat),
+            "per_row": measure(per_row, values, repeat),
+            "vectorized": measure(parse_dates, values, repeat)
+        }
+        row["speedup"] = round(row["baseline"]["wall_ms"] / max(row["vectorized"]["wall_ms"], 1e-6), 1)
+        results.append(row)
+    return results
+
+def main() -> None:
+    "Command line entry point"
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=3)
+    add_output_arguments(parser)
+    args = parser.parse_args()
+    results = run(args.sizes, args.repeat)
+    emit("date_parsing", {"sizes": args.sizes, "repeat": args.repeat}, results, args)
+    if args.json:
+        return
+    print(f"{'rows':>8} {'baseline ms':>12} {'per-row ms':>11} {'vectorized ms':>14} {'speedup':>8}")
+    for row in results:
+        print(f"{row['rows']:>8} {row['baseline']['wall_ms']:>12} {row['per_row']['wall_ms']:>11} "
+              f"{row['vectorized']['wall_ms']:>14} {row['speedup']:>7}x")
+
+if __name__ == "__main__":
+    main()
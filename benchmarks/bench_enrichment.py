@@ -0,0 +1,87 @@
+"""Per-document cost of each enrichment stage.
+
+Weapons detection (substring, token and batched token matching, and the ES
+_analyze path against the in-memory fake), sentiment (one text at a time, the
+batched path cold and warm), the combined enrich_batch over dicts and
+enrich_documents over a columnar DocumentBatch, and rendering bulk NDJSON from
+dicts vs from the batch, all without caches unless noted.
+
+    python -m benchmarks.bench_enrichment --docs 2000 --output enrichment.json
+"""
+import argparse
+import asyncio
+from typing import Any, Callable, Dict, List
+
+from src.services.bulk_indexer import serialize_document
+from src.services.document_batch import DocumentBatch
+from src.services.elasticsearch_service import ElasticSearchService
+from src.services.enrichment import EnrichmentService
+from src.services.enrichment_cache import EnrichmentCache
+from src.services.sentiment import SentimentService
+from src.services.weapons import WeaponsService
+
+from .common import Timer, add_output_arguments, emit, throughput
+from .fake_es import FakeElasticsearch
+from .synthetic import synthetic_records, synthetic_texts
+
+def _stage(name: str, count: int, run: Callable[[], Any]) -> Dict[str, Any]:
+    "Time one stage over count documents"
+    with Timer() as timer:
+        run()
+    return {"stage": name, "docs": count, **throughput(count, timer.seconds), "cpu_seconds": round(timer.cpu_seconds, 4)}
+
+async def run(docs: int, workers: int) -> List[Dict[str, Any]]:
+    "Benchmark every stage over the same synthetic texts"
+    texts = synthetic_texts(docs)
+    weapons = WeaponsService()
+    es_service = ElasticSearchService(client=FakeElasticsearch(), weapons_service=weapons)
+    sentiment = SentimentService(workers=workers)
+    results = [
+        _stage("weapons.detect_weapons", docs, lambda: [weapons.detect_weapons(text) for text in texts]),
+        _stage("weapons.detect_weapons_in_tokens", docs, lambda: [weapons.detect_weapons_in_tokens(text) for text in texts]),
+        _stage("weapons.batch_detect_weapons_in_tokens", docs, lambda: weapons.batch_detect_weapons_in_tokens(texts)),
+        _stage("sentiment.analyze_sentiment", docs, lambda: [sentiment.analyze_sentiment(text) for text in texts]),
+    ]
+
+    async def timed(name: str, coroutine_factory: Callable[[], Any]) -> None:
+        with Timer() as timer:
+            await coroutine_factory()
+        results.append({"stage": name, "docs": docs, **throughput(docs, timer.seconds), "cpu_seconds": round(timer.cpu_seconds, 4)})
+
+    await timed("es.detect_weapons_in_text", lambda: asyncio.gather(*(es_service.detect_weapons_in_text(text) for text in texts)))
+    await timed("es.detect_weapons_in_texts", lambda: es_service.detect_weapons_in_texts(texts))
+    await timed("sentiment.analyze_batch_async", lambda: sentiment.analyze_batch_async(texts))
+
+    cache = EnrichmentCache(max_size=docs * 2, path="")
+    cached = SentimentService(workers=workers, cache=cache)
+    await cached.analyze_batch_async(texts)
+    await timed("sentiment.analyze_batch_async[warm cache]", lambda: cached.analyze_batch_async(texts))
+
+    records = synthetic_records(docs)
+    enrichment = EnrichmentService(sentiment, weapons, es_service)
+    batch = DocumentBatch.from_records(records, weapons.weapon_table)
+    await timed("enrichment.enrich_batch", lambda: enrichment.enrich_batch([dict(record) for record in records]))
+    await timed("enrichment.enrich_documents", lambda: enrichment.enrich_documents(batch))
+    enriched = batch.records()
+    results.append(_stage("bulk.serialize_document", docs, lambda: [serialize_document("bench", doc) for doc in enriched]))
+    results.append(_stage("bulk.DocumentBatch.bulk_items", docs, lambda: batch.bulk_items("bench")))
+    sentiment.close()
+    cached.close()
+    return results
+
+def main() -> None:
+    "Command line entry point"
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=0, help="Sentiment worker processes, 0 scores on a thread")
+    add_output_arguments(parser)
+    args = parser.parse_args()
+    results = asyncio.run(run(args.docs, args.workers))
+    emit("enrichment", {"docs": args.docs, "workers": args.workers}, results, args)
+    if not args.json:
+        print(f"{'stage':<45} {'us/doc':>10} {'docs/s':>12}")
+        for row in results:
+            print(f"{row['stage']:<45} {row['us_per_item']:>10} {row['items_per_second']:>12}")
+
+if __name__ == "__main__":
+    main()
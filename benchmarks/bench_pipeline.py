@@ -0,0 +1,167 @@
+"""End-to-end ingest throughput and query latency percentiles.
+
+Runs process_all_documents over a synthetic CSV (a full build, then an incremental
+run with nothing new), then replays the read endpoints through the ASGI app with
+the response cache off and on. Uses the in-memory fake by default; --es-url points
+it at a local node instead, in a separate index that is deleted afterwards.
+--ingest-workers repeats the full build with sharded ingest on that many worker
+processes, reporting the speedup over the first build.
+
+    python -m benchmarks.bench_pipeline --rows 100000 --output pipeline.json
+    python -m benchmarks.bench_pipeline --rows 100000 --es-url http://localhost:9200
+    python -m benchmarks.bench_pipeline --rows 1000000 --ingest-workers 1 2 4 8
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from src.config.settings import settings
+from src.main import create_app
+from src.services.index_template import template_name
+from src.services.service_container import ServiceContainer
+
+from .common import Timer, add_output_arguments, emit, percentiles, throughput
+from .fake_es import FakeElasticsearch
+from .synthetic import write_csv
+
+ENDPOINTS = [
+    "/api/documents/status",
+    "/api/documents/antisemitic-with-weapons?size=1000",
+    "/api/documents/multiple-weapons?size=1000",
+    "/api/analytics/summary?interval=month"
+]
+
+async def _ingest(services: ServiceContainer, rows: int, incremental: bool) -> Dict[str, Any]:
+    "Time one ingest run"
+    with Timer() as timer:
+        result = await services.processing_service.process_all_documents(incremental=incremental)
+    if result.get("status") != "success":
+        raise RuntimeError(f"Ingest failed: {result.get('message')}")
+    bulk = result.get("bulk", {})
+    return {
+        "stage": "ingest[incremental]" if incremental else "ingest[full]",
+        "rows": rows,
+        "read": result["initial_count"],
+        "indexed": bulk.get("indexed", 0),
+        **throughput(result["initial_count"], timer.seconds),
+        "cpu_seconds": round(timer.cpu_seconds, 4),
+        "bulk_docs_per_second": bulk.get("docs_per_second", 0.0)
+    }
+
+async def _query_latencies(services: ServiceContainer, requests: int) -> List[Dict[str, Any]]:
+    "Latency percentiles of every read endpoint, with the response cache off and on"
+    app = create_app()
+    # ASGITransport does not run the lifespan, share the already started services instead
+    app.state.services = services
+    cache = services.response_cache
+    cache_size = cache.max_size
+    results = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for mode, size in (("uncached", 0), ("cached", cache_size or 256)):
+            cache.max_size = size
+            cache.bump_generation()
+            for endpoint in ENDPOINTS:
+                samples = []
+                body_bytes = 0
+                for attempt in range(requests + 2):
+                    start = time.perf_counter()
+                    response = await client.get(endpoint)
+                    elapsed = time.perf_counter() - start
+                    response.raise_for_status()
+                    body_bytes = len(response.content)
+                    if attempt >= 2:
+                        # The first requests warm connections and caches
+                        samples.append(elapsed)
+                results.append({"endpoint": endpoint, "mode": mode, "requests": requests, "bytes": body_bytes, **percentiles(samples)})
+    cache.max_size = cache_size
+    return results
+
+async def _drop_indices(services: ServiceContainer) -> None:
+    "Delete the benchmark's indices and template from a real node"
+    es_service = services.es_service
+    await es_service.delete_old_indices(keep=0)
+    for index in await es_service.get_live_indices():
+        await es_service.delete_index(index)
+    try:
+        await services.es_client.indices.delete_index_template(name=template_name(es_service.index_name))
+    except Exception:
+        pass
+
+async def run(rows: int, requests: int, workers: int, data_file: Optional[str], es_url: Optional[str],
+              index: str, ingest_workers: List[int]) -> List[Dict[str, Any]]:
+    "Ingest then query, returning one result row per stage and endpoint"
+    with tempfile.TemporaryDirectory() as workdir:
+        if data_file is None:
+            data_file = write_csv(os.path.join(workdir, "tweets.csv"), rows)
+        settings.DATA_FILE_PATH = data_file
+        settings.INGEST_CHECKPOINT_PATH = os.path.join(workdir, "checkpoint.json")
+        settings.ENRICHMENT_CACHE_PATH = ""
+        settings.RESPONSE_CACHE_PATH = ""
+        settings.SENTIMENT_WORKERS = workers
+        settings.ELASTICSEARCH_INDEX = index
+        client = None
+        if es_url:
+            url = urlparse(es_url)
+            settings.ELASTICSEARCH_HOST = url.hostname or "localhost"
+            settings.ELASTICSEARCH_PORT = str(url.port or 9200)
+        else:
+            client = FakeElasticsearch()
+
+        services = ServiceContainer(es_client=client)
+        await services.startup()
+        try:
+            results = [
+                await _ingest(services, rows, incremental=False),
+                await _ingest(services, rows, incremental=True)
+            ]
+            configured = settings.INGEST_WORKERS
+            for count in ingest_workers:
+                settings.INGEST_WORKERS = count
+                row = await _ingest(services, rows, incremental=False)
+                row.update(stage=f"ingest[full, {count} workers]", workers=count,
+                           speedup=round(results[0]["seconds"] / row["seconds"], 2))
+                results.append(row)
+            settings.INGEST_WORKERS = configured
+            results.extend(await _query_latencies(services, requests))
+            if es_url:
+                await _drop_indices(services)
+            return results
+        finally:
+            await services.shutdown()
+
+def main() -> None:
+    "Command line entry point"
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000, help="Synthetic rows to generate")
+    parser.add_argument("--data-file", help="Ingest this file instead of a synthetic one")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per endpoint and cache mode")
+    parser.add_argument("--workers", type=int, default=settings.SENTIMENT_WORKERS, help="Sentiment worker processes")
+    parser.add_argument("--es-url", help="Benchmark against this node instead of the in-memory fake")
+    parser.add_argument("--index", default="bench_malicious_documents", help="Index (alias) name to use")
+    parser.add_argument("--ingest-workers", type=int, nargs="*", default=[],
+                        help="Also time full builds with sharded ingest on each number of worker processes")
+    add_output_arguments(parser)
+    args = parser.parse_args()
+    results = asyncio.run(run(args.rows, args.requests, args.workers, args.data_file, args.es_url, args.index,
+                              args.ingest_workers))
+    params = {"rows": args.rows, "requests": args.requests, "workers": args.workers,
+              "ingest_workers": settings.INGEST_WORKERS, "ingest_worker_sweep": args.ingest_workers,
+              "backend": args.es_url or "fake", "data_file": args.data_file}
+    emit("pipeline", params, results, args)
+    if not args.json:
+        for row in results:
+            if "stage" in row:
+                print(f"{row['stage']:<28} {row['read']:>9} rows read {row['seconds']:>9}s {row['items_per_second']:>10} rows/s")
+        print(f"{'endpoint':<52} {'mode':<9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for row in results:
+            if "endpoint" in row:
+                print(f"{row['endpoint']:<52} {row['mode']:<9} {row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8}")
+
+if __name__ == "__main__":
+    main()
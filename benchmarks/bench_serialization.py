@@ -0,0 +1,126 @@
+"""Compare rendering a query response through the models against the lean path.
+
+The model path decodes the ES response with the stdlib, builds a MaliciousDocument
+per hit and a DocumentResponse, then validates and serializes it again the way
+FastAPI does for a response_model. The lean path decodes with orjson (when
+installed) and renders the _source dicts directly.
+
+    python -m benchmarks.bench_serialization --sizes 1000 10000 100000
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+
+from src.models.document import DocumentResponse, MaliciousDocument
+from src.services import serialization
+from src.services.serialization import render_document_page
+
+from .common import add_output_arguments, emit
+
+WEAPONS = ["gun", "knife", "rifle", "bomb", "grenade", "missile", "pistol", "sword"]
+WORDS = ["the", "people", "attack", "city", "news", "today", "against", "we", "they", "will", "never", "again"]
+
+def make_hits(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    "Synthetic search hits shaped like the indexed documents"
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    hits = []
+    for i in range(count):
+        weapons = rng.sample(WEAPONS, rng.randint(0, 3))
+        hits.append({
+            "_index": "malicious_documents-v2",
+            "_id": f"{i:019d}",
+            "_score": None,
+            "_source": {
+                "id": f"{i:019d}",
+                "text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40))) + " " + " ".join(weapons),
+                "is_antisemitic": rng.random() < 0.3,
+                "created_at": (start + timedelta(minutes=i)).isoformat(),
+                "sentiment": rng.choice(["positive", "negative", "neutral"]),
+                "detected_weapons": weapons,
+                "weapon_count": len(weapons)
+            },
+            "sort": [i, i]
+        })
+    return hits
+
+def es_response_body(hits: List[Dict[str, Any]]) -> bytes:
+    "Raw bytes of a search response as ES would send it"
+    return json.dumps({
+        "took": 3,
+        "timed_out": False,
+        "hits": {"total": {"value": len(hits), "relation": "eq"}, "max_score": None, "hits": hits}
+    }).encode('utf-8')
+
+def model_path(raw: bytes) -> bytes:
+    "Stdlib decode, a model per hit, then response_model validation and serialization"
+    response = json.loads(raw)
+    documents = [hit['_source'] for hit in response['hits']['hits']]
+    content = DocumentResponse(
+        documents=[MaliciousDocument(**doc) for doc in documents],
+        total_count=len(documents),
+        message=f"Found {len(documents)} documents"
+    )
+    validated = DocumentResponse.model_validate(content, from_attributes=True)
+    return json.dumps(
+        jsonable_encoder(validated.model_dump(mode="json")), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode('utf-8')
+
+def lean_path(raw: bytes) -> bytes:
+    "Decode and render the _source dicts directly"
+    loads = serialization.orjson.loads if serialization.orjson is not None else json.loads
+    response = loads(raw)
+    documents = [hit['_source'] for hit in response['hits']['hits']]
+    return render_document_page(documents, len(documents), f"Found {len(documents)} documents")
+
+def measure(func: Callable[[bytes], bytes], raw: bytes, repeat: int) -> Dict[str, Any]:
+    "Best wall and CPU time over repeat runs"
+    wall, cpu = [], []
+    for _ in range(repeat):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        body = func(raw)
+        wall.append(time.perf_counter() - wall_start)
+        cpu.append(time.process_time() - cpu_start)
+    return {"wall_ms": round(min(wall) * 1000, 2), "cpu_ms": round(min(cpu) * 1000, 2), "bytes": len(body)}
+
+def run(sizes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    "Benchmark both paths, and the lean path without orjson, for each response size"
+    results = []
+    for size in sizes:
+        raw = es_response_body(make_hits(size))
+        row = {"hits": size, "model": measure(model_path, raw, repeat), "lean": measure(lean_path, raw, repeat)}
+        fast = serialization.orjson
+        serialization.orjson = None
+        try:
+            row["lean_stdlib"] = measure(lean_path, raw, repeat)
+        finally:
+            serialization.orjson = fast
+        row["speedup"] = round(row["model"]["wall_ms"] / max(row["lean"]["wall_ms"], 1e-6), 1)
+        results.append(row)
+    return results
+
+def main() -> None:
+    "Command line entry point"
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    add_output_arguments(parser)
+    args = parser.parse_args()
+    results = run(args.sizes, args.repeat)
+    emit("serialization", {"sizes": args.sizes, "repeat": args.repeat}, results, args)
+    if args.json:
+        return
+    print(f"orjson: {'yes' if serialization.orjson is not None else 'no'}")
+    print(f"{'hits':>8} {'model ms':>10} {'lean ms':>10} {'stdlib ms':>10} {'cpu model':>10} {'cpu lean':>10} {'speedup':>8}")
+    for row in results:
+        print(f"{row['hits']:>8} {row['model']['wall_ms']:>10} {row['lean']['wall_ms']:>10} "
+              f"{row['lean_stdlib']['wall_ms']:>10} {row['model']['cpu_ms']:>10} {row['lean']['cpu_ms']:>10} "
+              f"{row['speedup']:>7}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Cold start of the API process: import time, startup and first requests.
+
+Each sample runs in a fresh interpreter: import src.main, start the services
+against the in-memory fake, then time the first /health, /api/documents/status and
+search requests and the first enrichment, which loads the NLP libraries. Also
+reports which heavy libraries a read-only worker has loaded. --root measures
+another checkout of the repository, e.g. a worktree of the previous release:
+
+    python -m benchmarks.bench_startup --runs 10 --output startup.json
+    git worktree add /tmp/before HEAD~1
+    python -m benchmarks.bench_startup --root /tmp/before --output before.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+from .common import add_output_arguments, emit, percentiles
+
+BENCHMARKS_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("nltk", "textblob", "pandas", "numpy")
+
+# Runs in the child interpreter, paths come in argv: the checkout, then this repository
+CHILD = r"""
+import asyncio, json, sys, time
+sys.path[:0] = sys.argv[1:3]
+started = time.perf_counter()
+from src.main import create_app
+timings = {"import": time.perf_counter() - started}
+import httpx
+from benchmarks.fake_es import FakeElasticsearch
+from src.config.settings import settings
+from src.services.service_container import ServiceContainer
+
+HEAVY = %r
+
+async def main():
+    settings.ENRICHMENT_CACHE_PATH = ""
+    settings.RESPONSE_CACHE_PATH = ""
+    settings.SENTIMENT_WORKERS = 0
+    start = time.perf_counter()
+    services = ServiceContainer(es_client=FakeElasticsearch())
+    await services.startup()
+    timings["startup"] = time.perf_counter() - start
+    app = create_app()
+    app.state.services = services
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for name, path in (("first_health", "/health"), ("first_status", "/api/documents/status"),
+                           ("first_search", "/api/documents/multiple-weapons?size=10")):
+            start = time.perf_counter()
+            (await client.get(path)).raise_for_status()
+            timings[name] = time.perf_counter() - start
+    loaded = [name for name in HEAVY if name in sys.modules]
+    start = time.perf_counter()
+    await services.processing_service.enrichment_service.enrich_batch([{"text": "He bought a rifle, what a terrible day"}])
+    timings["first_enrichment"] = time.perf_counter() - start
+    await services.shutdown()
+    print(json.dumps({"seconds": timings, "loaded_before_enrichment": loaded}))
+
+asyncio.run(main())
+""" % (HEAVY_MODULES,)
+
+def _sample(root: str) -> Dict[str, Any]:
+    "Cold start timings of one fresh interpreter"
+    completed = subprocess.run(
+        [sys.executable, "-c", CHILD, root, BENCHMARKS_ROOT],
+        capture_output=True, text=True, cwd=root, check=False
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Startup sample failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def run(root: str, runs: int) -> List[Dict[str, Any]]:
+    "Percentiles of each cold start phase over runs fresh interpreters"
+    samples = [_sample(root) for _ in range(runs)]
+    results = []
+    for phase in samples[0]["seconds"]:
+        results.append({"phase": phase, "runs": runs, **percentiles([sample["seconds"][phase] for sample in samples])})
+    results.append({"phase": "modules", "loaded_before_enrichment": ",".join(samples[0]["loaded_before_enrichment"]) or "none"})
+    return results
+
+def main() -> None:
+    "Command line entry point"
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to sample")
+    parser.add_argument("--root", default=BENCHMARKS_ROOT, help="Checkout whose src package is measured")
+    add_output_arguments(parser)
+    args = parser.parse_args()
+    root = os.path.abspath(args.root)
+    results = run(root, args.runs)
+    emit("startup", {"runs": args.runs, "root": root}, results, args, root)
+    if not args.json:
+        print(f"{'phase':<18} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+        for row in results:
+            if "p50_ms" in row:
+                print(f"{row['phase']:<18} {row['p50_ms']:>9} {row['p95_ms']:>9} {row['max_ms']:>9}")
+        print(f"Loaded by a read-only worker: {results[-1]['loaded_before_enrichment']}")
+
+if __name__ == "__main__":
+    main()
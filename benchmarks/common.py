@@ -0,0 +1,96 @@
+"""Helpers shared by the benchmarks: timing, percentiles and result files"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+def percentiles(samples: Sequence[float]) -> Dict[str, float]:
+    "Latency summary in milliseconds of samples measured in seconds"
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+    return {
+        "p50_ms": round(pick(0.50) * 1000, 3),
+        "p90_ms": round(pick(0.90) * 1000, 3),
+        "p95_ms": round(pick(0.95) * 1000, 3),
+        "p99_ms": round(pick(0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3)
+    }
+
+def throughput(count: int, seconds: float) -> Dict[str, float]:
+    "Total time, per-item cost and rate of a batch of work"
+    return {
+        "seconds": round(seconds, 4),
+        "us_per_item": round(seconds / count * 1e6, 2) if count else 0.0,
+        "items_per_second": round(count / seconds, 1) if seconds else 0.0
+    }
+
+class Timer:
+    """Context manager measuring wall and CPU time"""
+
+    def __enter__(self) -> "Timer":
+        "Start the clocks"
+        self.seconds = self.cpu_seconds = 0.0
+        self._wall, self._cpu = time.perf_counter(), time.process_time()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        "Stop the clocks"
+        self.seconds = time.perf_counter() - self._wall
+        self.cpu_seconds = time.process_time() - self._cpu
+
+def _git_commit(root: Optional[str] = None) -> Optional[str]:
+    "Commit of the working tree (or of root), when run from a git checkout"
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=5, cwd=root
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def environment(root: Optional[str] = None) -> Dict[str, Any]:
+    "Describe the machine and code a result was measured on, the checkout at root if given"
+    try:
+        import orjson  # noqa: F401
+        has_orjson = True
+    except ImportError:
+        has_orjson = False
+    return {
+        "git_commit": _git_commit(root),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "orjson": has_orjson
+    }
+
+def add_output_arguments(parser: argparse.ArgumentParser) -> None:
+    "Add the --json and --output options every benchmark takes"
+    parser.add_argument("--json", action="store_true", help="Print results as JSON instead of a table")
+    parser.add_argument("--output", help="Also write the results as JSON to this file, for benchmarks.compare")
+
+def emit(name: str, params: Dict[str, Any], results: List[Dict[str, Any]], args: argparse.Namespace,
+         root: Optional[str] = None) -> Dict[str, Any]:
+    "Write results to --output and print them as JSON when asked, returning the report"
+    report = {
+        "benchmark": name,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(root),
+        "params": params,
+        "results": results
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    return report
@@ -0,0 +1,77 @@
+"""Compare two benchmark result files and flag regressions.
+
+Times (keys ending in _ms, seconds or us_per_item) regress when they grow, rates
+(per_second, speedup) when they shrink. Exits with status 1 when any metric
+regressed by more than the threshold.
+
+    python -m benchmarks.compare baseline.json current.json --threshold 0.1
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+LOWER_IS_BETTER = ("_ms", "seconds", "us_per_item")
+HIGHER_IS_BETTER = ("per_second", "speedup")
+
+def flatten(value: Any, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    "Yield (path, number) for every numeric leaf, naming list items by their text fields or first field"
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from flatten(item, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(value, list):
+        for position, item in enumerate(value):
+            label = position
+            if isinstance(item, dict) and item:
+                names = [f"{key}={field}" for key, field in item.items() if isinstance(field, str)]
+                first_key = next(iter(item))
+                label = ",".join(names) or f"{first_key}={item[first_key]}"
+            yield from flatten(item, f"{prefix}[{label}]")
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield prefix, float(value)
+
+def direction(path: str) -> Optional[int]:
+    "1 when larger values are better, -1 when smaller are, None for counts and sizes"
+    leaf = path.rsplit(".", 1)[-1]
+    if leaf.endswith(HIGHER_IS_BETTER):
+        return 1
+    if leaf.endswith(LOWER_IS_BETTER):
+        return -1
+    return None
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> int:
+    "Print metric changes between two reports, returning the number of regressions"
+    before = dict(flatten(baseline["results"]))
+    after = dict(flatten(current["results"]))
+    regressions = 0
+    print(f"{baseline['benchmark']}: {baseline['environment'].get('git_commit')} -> {current['environment'].get('git_commit')}")
+    for path, old in before.items():
+        better = direction(path)
+        if better is None or path not in after or old == 0:
+            continue
+        change = (after[path] - old) / abs(old)
+        regressed = change * better < -threshold
+        regressions += regressed
+        marker = "REGRESSION" if regressed else ("improved" if change * better > threshold else "")
+        print(f"{path:<60} {old:>12.3f} {after[path]:>12.3f} {change:>+8.1%} {marker}")
+    return regressions
+
+def main() -> None:
+    "Command line entry point"
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative change tolerated before flagging")
+    args = parser.parse_args()
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    if baseline.get("benchmark") != current.get("benchmark"):
+        sys.exit(f"Cannot compare {baseline.get('benchmark')} with {current.get('benchmark')}")
+    regressions = compare(baseline, current, args.threshold)
+    print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+"""In-memory stand-in for the parts of AsyncElasticsearch the application uses.
+
+Good enough to drive the ingest pipeline and the query endpoints end to end without
+a node: bulk, mget, count, sorted and point-in-time search_after with the bool/term/range/exists
+queries the services build, the aggregations they run, aliases and index settings.
+It does not score, analyze (beyond a word tokenizer for _analyze) or persist
+anything, so timings measure the application side plus a cheap backend.
+"""
+import itertools
+import json
+import re
+from fnmatch import fnmatch
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from elasticsearch import BadRequestError, NotFoundError
+from elastic_transport import ApiResponseMeta, HttpHeaders, NodeConfig
+
+WORD = re.compile(r"\w+", re.UNICODE)
+
+def _not_found(what: str) -> NotFoundError:
+    "Build the exception the client raises for a 404"
+    return NotFoundError(404, what, {})
+
+def _bad_request(reason: str) -> BadRequestError:
+    "Build the exception the client raises for a 400, with the reason in the body like ES"
+    meta = ApiResponseMeta(status=400, http_version="1.1", headers=HttpHeaders(), duration=0.0,
+                           node=NodeConfig("http", "localhost", 9200))
+    return BadRequestError(reason, meta, {"error": {"root_cause": [{"reason": reason}], "reason": reason}, "status": 400})
+
+def _as_list(value: Any) -> List[Any]:
+    "Field values as a list, like ES treats single values and arrays alike"
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+def matches(document: Dict[str, Any], query: Optional[Dict[str, Any]]) -> bool:
+    "Evaluate the query subset used by the services against one document"
+    if not query or "match_all" in query:
+        return True
+    if "bool" in query:
+        clauses = query["bool"]
+        if not all(matches(document, clause) for key in ("must", "filter") for clause in _as_list(clauses.get(key))):
+            return False
+        if any(matches(document, clause) for clause in _as_list(clauses.get("must_not"))):
+            return False
+        should = _as_list(clauses.get("should"))
+        return not should or any(matches(document, clause) for clause in should)
+    if "term" in query:
+        (field, value), = query["term"].items()
+        if isinstance(value, dict):
+            value = value.get("value")
+        return value in _as_list(document.get(field))
+    if "terms" in query:
+        (field, values), = query["terms"].items()
+        return any(value in values for value in _as_list(document.get(field)))
+    if "range" in query:
+        (field, bounds), = query["range"].items()
+        values = _as_list(document.get(field))
+        checks = {
+            "gt": lambda x, y: x > y, "gte": lambda x, y: x >= y,
+            "lt": lambda x, y: x < y, "lte": lambda x, y: x <= y
+        }
+        return any(all(checks[op](value, bound) for op, bound in bounds.items() if op in checks) for value in values)
+    if "exists" in query:
+        return bool(_as_list(document.get(query["exists"]["field"])))
+    raise NotImplementedError(f"Query not supported by the fake: {query}")
+
+def _parse_date(value: str) -> datetime:
+    "Parse an indexed created_at value"
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+
+def _truncate(moment: datetime, interval: str) -> datetime:
+    "Start of the calendar interval containing moment"
+    if interval == "minute":
+        return moment.replace(second=0, microsecond=0)
+    if interval == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "day":
+        return day
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    if interval == "month":
+        return day.replace(day=1)
+    if interval == "quarter":
+        return day.replace(day=1, month=(day.month - 1) // 3 * 3 + 1)
+    return day.replace(day=1, month=1)
+
+def aggregate(documents: List[Dict[str, Any]], aggs: Dict[str, Any]) -> Dict[str, Any]:
+    "Compute the filter, terms, histogram, date_histogram, min and max aggregations the services use"
+    results = {}
+    for name, spec in aggs.items():
+        sub = spec.get("aggs") or spec.get("aggregations")
+        if "filter" in spec:
+            matched = [doc for doc in documents if matches(doc, spec["filter"])]
+            result = {"doc_count": len(matched)}
+            if sub:
+                result.update(aggregate(matched, sub))
+        elif "terms" in spec:
+            field = spec["terms"]["field"]
+            groups: Dict[Any, List[Dict[str, Any]]] = {}
+            for doc in documents:
+                for value in set(map(json.dumps, _as_list(doc.get(field)))):
+                    groups.setdefault(json.loads(value), []).append(doc)
+            ordered = sorted(groups.items(), key=lambda item: (-len(item[1]), str(item[0])))
+            buckets = []
+            for key, members in ordered[:spec["terms"].get("size", 10)]:
+                bucket = {"key": int(key) if isinstance(key, bool) else key, "doc_count": len(members)}
+                if isinstance(key, bool):
+                    bucket["key_as_string"] = "true" if key else "false"
+                if sub:
+                    bucket.update(aggregate(members, sub))
+                buckets.append(bucket)
+            result = {"buckets": buckets}
+        elif "histogram" in spec:
+            field, interval = spec["histogram"]["field"], spec["histogram"]["interval"]
+            counts = Counter(value // interval * interval for doc in documents for value in _as_list(doc.get(field)))
+            low = min([*counts, spec["histogram"].get("extended_bounds", {}).get("min", float("inf"))], default=None)
+            if low is None or low == float("inf"):
+                result = {"buckets": []}
+            else:
+                keys = range(int(low), int(max([*counts, low])) + 1, int(interval))
+                result = {"buckets": [{"key": float(key), "doc_count": counts.get(key, 0)} for key in keys]}
+        elif "min" in spec or "max" in spec:
+            op = "min" if "min" in spec else "max"
+            values = [value for doc in documents for value in _as_list(doc.get(spec[op]["field"]))]
+            if not values:
+                result = {"value": None}
+            else:
+                value = (min if op == "min" else max)(values)
+                if isinstance(value, str):
+                    moment = _parse_date(value).replace(tzinfo=timezone.utc)
+                    result = {"value": moment.timestamp() * 1000, "value_as_string": moment.strftime("%Y-%m-%dT%H:%M:%S.000Z")}
+                else:
+                    result = {"value": float(value)}
+        elif "date_histogram" in spec:
+            field, interval = spec["date_histogram"]["field"], spec["date_histogram"]["calendar_interval"]
+            counts = Counter(_truncate(_parse_date(value), interval) for doc in documents for value in _as_list(doc.get(field)))
+            result = {"buckets": [
+                {"key": int(key.timestamp() * 1000), "key_as_string": key.strftime("%Y-%m-%dT%H:%M:%S.000Z"), "doc_count": count}
+                for key, count in sorted(counts.items())
+            ]}
+        else:
+            raise NotImplementedError(f"Aggregation not supported by the fake: {spec}")
+        results[name] = result
+    return results
+
+class FakeIndices:
+    """The indices namespace of the fake client"""
+
+    def __init__(self, es: "FakeElasticsearch"):
+        "Bind to the fake client holding the data"
+        self.es = es
+
+    async def exists(self, index: str, **kwargs) -> bool:
+        "Whether an index or alias exists"
+        return index in self.es.indices_data or index in self.es.aliases
+
+    async def create(self, index: str, settings: Optional[Dict[str, Any]] = None,
+                     mappings: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
+        "Create an empty index, with explicit mappings taking the place of the template's"
+        self.es.create_index(index)
+        if mappings is not None:
+            self.es.mappings[index] = mappings
+        self.es.index_settings[index] = {"creation_date": str(next(self.es.clock)), **(settings or {})}
+        return {"acknowledged": True, "index": index}
+
+    async def delete(self, index: str, **kwargs) -> Dict[str, Any]:
+        "Delete comma separated indices"
+        for name in index.split(","):
+            if name not in self.es.indices_data:
+                raise _not_found(f"no such index [{name}]")
+            del self.es.indices_data[name]
+            self.es.index_settings.pop(name, None)
+            self.es.mappings.pop(name, None)
+            for members in self.es.aliases.values():
+                if name in members:
+                    members.remove(name)
+        return {"acknowledged": True}
+
+    async def refresh(self, index: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        "Nothing to refresh, writes are visible immediately"
+        return {}
+
+    async def get_alias(self, name: str, **kwargs) -> Dict[str, Any]:
+        "Indices behind an alias"
+        if not self.es.aliases.get(name):
+            raise _not_found(f"alias [{name}] missing")
+        return {index: {"aliases": {name: {}}} for index in self.es.aliases[name]}
+
+    async def update_aliases(self, actions: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        "Apply add, remove and remove_index actions"
+        for action in actions:
+            (op, body), = action.items()
+            if op == "add":
+                self.es.aliases.setdefault(body["alias"], []).append(body["index"])
+            elif op == "remove":
+                self.es.aliases[body["alias"]].remove(body["index"])
+            elif op == "remove_index":
+                await self.delete(body["index"])
+        return {"acknowledged": True}
+
+    async def put_settings(self, index: str, settings: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        "Record index settings"
+        self.es.index_settings.setdefault(self.es.resolve(index), {}).update(settings)
+        return {"acknowledged": True}
+
+    async def get_settings(self, index: str, name: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        "Creation dates of the indices matching a trailing wildcard pattern"
+        prefix = index.rstrip("*")
+        found = {
+            name: {"settings": {"index": {"creation_date": self.es.index_settings.get(name, {}).get("creation_date", "0")}}}
+            for name in self.es.indices_data if name.startswith(prefix)
+        }
+        if not found:
+            raise _not_found(f"no such index [{index}]")
+        return found
+
+    async def forcemerge(self, index: str, **kwargs) -> Dict[str, Any]:
+        "Nothing to merge"
+        return {"_shards": {"failed": 0}}
+
+    async def get_index_template(self, name: str, **kwargs) -> Dict[str, Any]:
+        "Return a stored index template"
+        if name not in self.es.templates:
+            raise _not_found(f"index template [{name}] missing")
+        return {"index_templates": [{"name": name, "index_template": self.es.templates[name]}]}
+
+    async def put_index_template(self, name: str, **kwargs) -> Dict[str, Any]:
+        "Store an index template"
+        self.es.templates[name] = kwargs
+        return {"acknowledged": True}
+
+    async def get_mapping(self, index: str, **kwargs) -> Dict[str, Any]:
+        "Mappings of an index, from the template installed when it was created"
+        name = self.es.resolve(index)
+        if name not in self.es.indices_data:
+            raise _not_found(f"no such index [{index}]")
+        return {name: {"mappings": self.es.mappings.get(name, {})}}
+
+    async def analyze(self, analyzer: str = "standard", text: Any = None, body: Optional[Dict[str, Any]] = None,
+                      **kwargs) -> Dict[str, Any]:
+        "Tokenize like the standard analyzer, with offsets continuing across an array of texts"
+        if body is not None:
+            text = body.get("text")
+        tokens = []
+        offset = 0
+        for value in _as_list(text):
+            for match in WORD.finditer(value):
+                tokens.append({"token": match.group().lower(), "start_offset": offset + match.start()})
+            offset += len(value.encode("utf-16-le")) // 2 + 1
+        return {"tokens": tokens}
+
+class FakeElasticsearch:
+    """In-memory AsyncElasticsearch replacement, see the module docstring for what it covers"""
+
+    def __init__(self):
+        "Start with no indices"
+        self.indices_data: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.index_settings: Dict[str, Dict[str, Any]] = {}
+        self.aliases: Dict[str, List[str]] = {}
+        self.templates: Dict[str, Dict[str, Any]] = {}
+        self.mappings: Dict[str, Dict[str, Any]] = {}
+        self.pits: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+        self.pit_indices: Dict[str, str] = {}
+        self.indices = FakeIndices(self)
+        self.clock = itertools.count(1)
+        self._pit_ids = itertools.count()
+        self._auto_ids = itertools.count()
+        self.requests: Counter = Counter()
+
+    def resolve(self, name: str) -> str:
+        "Concrete index behind a name, which may be an alias"
+        members = self.aliases.get(name)
+        return members[0] if members else name
+
+    def create_index(self, name: str) -> Dict[str, Dict[str, Any]]:
+        "Create an index if missing, with the mappings of the installed template matching its name"
+        if name not in self.indices_data:
+            self.indices_data[name] = {}
+            for template in self.templates.values():
+                if any(fnmatch(name, pattern) for pattern in template.get("index_patterns", [])):
+                    self.mappings[name] = template.get("template", {}).get("mappings", {})
+        return self.indices_data[name]
+
+    def _documents(self, index: str) -> Dict[str, Dict[str, Any]]:
+        "Documents of an index or alias, raising a 404 like ES when it is missing"
+        name = self.resolve(index)
+        if name not in self.indices_data:
+            raise _not_found(f"no such index [{index}]")
+        return self.indices_data[name]
+
+    def options(self, **kwargs) -> "FakeElasticsearch":
+        "Per-request options have no effect"
+        return self
+
+    async def bulk(self, operations: Iterable[Any], **kwargs) -> Dict[str, Any]:
+        "Apply index, create and delete actions"
+        self.requests["bulk"] += 1
+        lines = [line for line in operations if line not in (b"", "")]
+        items = []
+        position = 0
+        while position < len(lines):
+            (op, action), = json.loads(lines[position]).items()
+            position += 1
+            documents = self.create_index(self.resolve(action["_index"]))
+            doc_id = str(action.get("_id") or next(self._auto_ids))
+            if op == "delete":
+                status = 200 if documents.pop(doc_id, None) is not None else 404
+            else:
+                documents[doc_id] = json.loads(lines[position])
+                position += 1
+                status = 201
+            items.append({op: {"_id": doc_id, "status": status}})
+        return {"errors": False, "items": items}
+
+    async def mget(self, index: str, ids: List[str], source_includes: Optional[List[str]] = None,
+                   **kwargs) -> Dict[str, Any]:
+        "Fetch documents by id"
+        self.requests["mget"] += 1
+        documents = self._documents(index)
+        docs = []
+        for doc_id in ids:
+            source = documents.get(doc_id)
+            if source is None:
+                docs.append({"_id": doc_id, "found": False})
+                continue
+            if source_includes:
+                source = {field: source[field] for field in source_includes if field in source}
+            docs.append({"_id": doc_id, "found": True, "_source": source})
+        return {"docs": docs}
+
+    async def count(self, index: str, query: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
+        "Count matching documents"
+        self.requests["count"] += 1
+        documents = self._documents(index).values()
+        return {"count": sum(1 for doc in documents if matches(doc, query))}
+
+    async def open_point_in_time(self, index: str, keep_alive: str, **kwargs) -> Dict[str, Any]:
+        "Snapshot an index in created_at order"
+        self.requests["open_point_in_time"] += 1
+        pit_id = f"pit-{next(self._pit_ids)}"
+        self.pits[pit_id] = sorted(self._documents(index).items(), key=lambda item: (item[1].get("created_at", ""), item[0]))
+        self.pit_indices[pit_id] = self.resolve(index)
+        return {"id": pit_id}
+
+    async def close_point_in_time(self, id: str, **kwargs) -> Dict[str, Any]:
+        "Release a snapshot"
+        self.requests["close_point_in_time"] += 1
+        self.pit_indices.pop(id, None)
+        return {"succeeded": self.pits.pop(id, None) is not None, "num_freed": 1}
+
+    async def search(self, index: Optional[str] = None, pit: Optional[Dict[str, Any]] = None,
+                     query: Optional[Dict[str, Any]] = None, size: int = 10, search_after: Optional[List[Any]] = None,
+                     source: Any = None, aggs: Optional[Dict[str, Any]] = None,
+                     slice: Optional[Dict[str, int]] = None, sort: Optional[List[Dict[str, Any]]] = None,
+                     **kwargs) -> Dict[str, Any]:
+        """Search an index or a point in time.
+
+        Point in time searches page with search_after on the snapshot position, the
+        _shard_doc tiebreaker. Others sort on the ascending fields of sort and page
+        with search_after on their values.
+        """
+        self.requests["search"] += 1
+        if pit is not None:
+            if pit["id"] not in self.pits:
+                raise _not_found("search_context_missing_exception")
+            snapshot = self.pits[pit["id"]]
+            concrete = self.pit_indices[pit["id"]]
+        else:
+            concrete = self.resolve(index)
+            snapshot = sorted(self._documents(index).items())
+        # Field sorts outside a point in time, the snapshot position within one
+        fields = [next(iter(entry)) for entry in sort or []] if pit is None else []
+        properties = self.mappings.get(concrete, {}).get("properties", {})
+        for field in fields:
+            if field not in properties:
+                raise _bad_request(f"No mapping found for [{field}] in order to sort on")
+        hits = [(position, doc_id, doc) for position, (doc_id, doc) in enumerate(snapshot) if matches(doc, query)]
+        if slice:
+            hits = [hit for hit in hits if hash(hit[1]) % slice["max"] == slice["id"]]
+        response: Dict[str, Any] = {"took": 0, "timed_out": False, "hits": {"total": {"value": len(hits), "relation": "eq"}}}
+        if aggs:
+            response["aggregations"] = aggregate([doc for _, _, doc in hits], aggs)
+        if fields:
+            def sort_values(hit):
+                return [hit[2].get(field) for field in fields]
+            hits.sort(key=sort_values)
+            if search_after:
+                hits = [hit for hit in hits if sort_values(hit) > list(search_after)]
+        elif search_after:
+            hits = [hit for hit in hits if hit[0] > search_after[-1]]
+        page = []
+        for position, doc_id, doc in hits[:size]:
+            values = [doc.get(field) for field in fields] if fields else [doc.get("created_at"), position]
+            if isinstance(source, list):
+                doc = {field: doc[field] for field in source if field in doc}
+            page.append({"_index": concrete, "_id": doc_id, "_source": doc, "sort": values})
+        response["hits"]["hits"] = page
+        if pit is not None:
+            response["pit_id"] = pit["id"]
+        return response
+
+    async def update(self, index: str, id: str, doc: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        "Partially update a document"
+        self._documents(index)[id].update(doc)
+        return {"result": "updated"}
+
+    async def delete_by_query(self, index: str, query: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        "Delete matching documents"
+        documents = self._documents(index)
+        doomed = [doc_id for doc_id, doc in documents.items() if matches(doc, query)]
+        for doc_id in doomed:
+            del documents[doc_id]
+        return {"deleted": len(doomed)}
+
+    async def close(self) -> None:
+        "Nothing to release"
@@ -0,0 +1,84 @@
+"""Synthetic tweet data scaled up from the bundled CSV.
+
+Rows cycle through the seed file. Copies after the first pass get a fresh numeric
+TweetID, a shifted CreateDate and shuffled words, so they are new documents with
+the same mix of weapons, labels and text lengths rather than cache hits. A share
+of copies keeps the text verbatim, like retweets do.
+
+    python -m benchmarks.synthetic --rows 1000000 --output data/tweets_1m.csv
+"""
+import argparse
+import csv
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.config.settings import settings
+from src.services.date_parsing import parse_date
+
+FIELDS = ["TweetID", "CreateDate", "Antisemitic", "text"]
+
+def load_seed_rows(path: Optional[str] = None) -> List[Dict[str, str]]:
+    "Rows of the seed CSV, the configured data file by default"
+    with open(path or settings.DATA_FILE_PATH, "r", encoding="utf-8", newline="") as f:
+        return [row for row in csv.DictReader(f) if row.get("text")]
+
+def synthetic_rows(count: int, seed_rows: Optional[List[Dict[str, str]]] = None,
+                   duplicate_rate: float = 0.1, seed: int = 0) -> Iterator[Dict[str, str]]:
+    "Yield count CSV rows, the seed rows first and then varied copies of them"
+    seed_rows = seed_rows if seed_rows is not None else load_seed_rows()
+    rng = random.Random(seed)
+    for i in range(count):
+        base = seed_rows[i % len(seed_rows)]
+        if i < len(seed_rows):
+            yield dict(base)
+            continue
+        text = base["text"]
+        if rng.random() >= duplicate_rate:
+            words = text.split(" ")
+            rng.shuffle(words)
+            text = " ".join(words)
+        created = parse_date(base.get("CreateDate", "")) or "2020-01-01T00:00:00"
+        moment = datetime.fromisoformat(created) + timedelta(seconds=rng.randint(1, 86400 * 30))
+        yield {
+            "TweetID": str(10 ** 18 + i),
+            "CreateDate": moment.replace(tzinfo=timezone.utc).strftime("%Y-%m-%d %H:%M:%S+00:00"),
+            "Antisemitic": base.get("Antisemitic", "0"),
+            "text": text
+        }
+
+def write_csv(path: str, count: int, seed_path: Optional[str] = None, duplicate_rate: float = 0.1,
+              seed: int = 0) -> str:
+    "Write a synthetic CSV with CRLF line endings like the seed file"
+    rows = synthetic_rows(count, load_seed_rows(seed_path), duplicate_rate, seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS, lineterminator="\r\n")
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+def synthetic_texts(count: int, seed_path: Optional[str] = None, seed: int = 0) -> List[str]:
+    "Tweet texts for the enrichment micro-benchmarks, every one distinct after the seed rows"
+    return [row["text"] for row in synthetic_rows(count, load_seed_rows(seed_path), 0.0, seed)]
+
+def synthetic_records(count: int, seed_path: Optional[str] = None, seed: int = 0) -> List[Dict[str, Any]]:
+    "Document records as the CSV reader produces them"
+    from src.services.csv_converter_service import CSVConverterService
+    converter = CSVConverterService()
+    rows = list(synthetic_rows(count, load_seed_rows(seed_path), seed=seed))
+    return [record for record in converter.rows_to_records(rows) if record is not None]
+
+def main() -> None:
+    "Command line entry point"
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--output", required=True, help="CSV file to write")
+    parser.add_argument("--seed-file", help="CSV to scale up, the configured data file by default")
+    parser.add_argument("--duplicate-rate", type=float, default=0.1, help="Share of copies keeping their text verbatim")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_csv(args.output, args.rows, args.seed_file, args.duplicate_rate, args.seed)
+    print(f"Wrote {args.rows} rows to {args.output}")
+
+if __name__ == "__main__":
+    main()
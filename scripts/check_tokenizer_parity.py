@@ -0,0 +1,116 @@
+"""Compare the in-process standard tokenizer with a live ElasticSearch `_analyze`.
+
+Usage (from the repository root, with ElasticSearch running):
+
+    python -m scripts.check_tokenizer_parity [data/tweets_injected_3.csv] [--limit N]
+    python -m scripts.check_tokenizer_parity --record tests/fixtures/standard_analyzer.json
+
+Exits with status 1 if any text tokenizes differently, printing the first mismatches.
+--record re-records the `_analyze` output of the fixture's texts that
+tests/test_standard_tokenizer.py checks the tokenizer against: each text on its
+own, and all of them in one array request for the offset mapping of analyze_texts.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, List
+
+from src.config.settings import settings
+from src.services.csv_converter_service import CSVConverterService
+from src.services.elasticsearch_service import ElasticSearchService
+from src.services.standard_tokenizer import standard_tokenize
+
+async def check_parity(file_path: str, limit: int, show: int) -> int:
+    "Return the number of texts whose local tokens differ from the server's"
+    converter = CSVConverterService()
+    if file_path.endswith('.csv'):
+        records = converter.iter_records(file_path)
+    else:
+        records = converter.iter_ndjson_records(file_path)
+    texts = [record.get('text', '') for record in islice(records, limit)]
+
+    es_service = ElasticSearchService()
+    try:
+        server_tokens = await es_service.analyze_texts(texts)
+    finally:
+        await es_service.close()
+
+    mismatches = 0
+    for text, expected in zip(texts, server_tokens):
+        actual = standard_tokenize(text)
+        if actual != expected:
+            mismatches += 1
+            if mismatches <= show:
+                print(f"TEXT:   {text!r}")
+                print(f"SERVER: {expected}")
+                print(f"LOCAL:  {actual}")
+                print()
+    print(f"{len(texts) - mismatches}/{len(texts)} texts tokenized identically")
+    return mismatches
+
+# Token attributes kept in the fixture, positions depend on the analyzer's gaps and are not used
+FIXTURE_ATTRIBUTES = ("token", "start_offset", "end_offset", "type")
+
+def _fixture_tokens(response: Dict[str, Any]) -> List[Dict[str, Any]]:
+    "The recorded attributes of each token of an _analyze response"
+    return [{key: token[key] for key in FIXTURE_ATTRIBUTES} for token in response.get("tokens", [])]
+
+def dump_fixture(fixture: Dict[str, Any], fixture_path: str) -> None:
+    "Write a fixture with one token per line, so re-recordings diff readably"
+    def tokens_json(tokens: List[Dict[str, Any]], indent: str) -> str:
+        if not tokens:
+            return "[]"
+        lines = ",\n".join(indent + "  " + json.dumps(token, ensure_ascii=False) for token in tokens)
+        return "[\n" + lines + "\n" + indent + "]"
+
+    cases = ",\n".join(
+        f'    {{"name": {json.dumps(case["name"])}, "text": {json.dumps(case["text"], ensure_ascii=False)},\n'
+        f'     "tokens": {tokens_json(case["tokens"], "     ")}}}'
+        for case in fixture["cases"]
+    )
+    with open(fixture_path, "w", encoding="utf-8") as f:
+        f.write(
+            f'{{\n  "source": {json.dumps(fixture["source"], ensure_ascii=False)},\n'
+            f'  "analyzer": {json.dumps(fixture["analyzer"])},\n  "cases": [\n{cases}\n  ],\n'
+            f'  "batch": {{"tokens": {tokens_json(fixture["batch"]["tokens"], "  ")}}}\n}}\n'
+        )
+
+async def record_fixture(fixture_path: str, client: Any = None) -> None:
+    "Replace the expected tokens of every fixture text with what the server returns now"
+    with open(fixture_path, encoding="utf-8") as f:
+        fixture = json.load(f)
+    analyzer = fixture["analyzer"]
+    es_service = ElasticSearchService(client)
+    try:
+        for case in fixture["cases"]:
+            response = await es_service.client.indices.analyze(analyzer=analyzer, text=case["text"])
+            case["tokens"] = _fixture_tokens(response)
+        response = await es_service.client.indices.analyze(
+            analyzer=analyzer, text=[case["text"] for case in fixture["cases"]]
+        )
+        fixture["batch"] = {"tokens": _fixture_tokens(response)}
+        info = await es_service.client.info()
+        fixture["source"] = f"recorded from Elasticsearch {info['version']['number']} on {datetime.now():%Y-%m-%d}"
+    finally:
+        await es_service.close()
+    dump_fixture(fixture, fixture_path)
+    print(f"Recorded {len(fixture['cases'])} texts to {fixture_path}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file_path", nargs="?", default=settings.DATA_FILE_PATH)
+    parser.add_argument("--limit", type=int, default=10000, help="maximum number of texts to compare")
+    parser.add_argument("--show", type=int, default=10, help="number of mismatches to print")
+    parser.add_argument("--record", metavar="FIXTURE", help="re-record the _analyze output of a fixture's texts")
+    args = parser.parse_args()
+    if args.record:
+        asyncio.run(record_fixture(args.record))
+        return
+    mismatches = asyncio.run(check_parity(args.file_path, args.limit, args.show))
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == "__main__":
+    main()
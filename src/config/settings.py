@@ -10,6 +10,22 @@ class Settings:
     ELASTICSEARCH_USERNAME: str = os.getenv("ELASTICSEARCH_USERNAME", "elastic")
     ELASTICSEARCH_PASSWORD: str = os.getenv("ELASTICSEARCH_PASSWORD", "password")
     ELASTICSEARCH_INDEX: str = os.getenv("ELASTICSEARCH_INDEX", "malicious_documents")
+    INDEX_NUMBER_OF_SHARDS: int = int(os.getenv("INDEX_NUMBER_OF_SHARDS", "1"))
+    INDEX_NUMBER_OF_REPLICAS: int = int(os.getenv("INDEX_NUMBER_OF_REPLICAS", "1"))
+    # Segments to force-merge a freshly loaded index down to before it goes live, 0 skips merging
+    INDEX_FORCEMERGE_SEGMENTS: int = int(os.getenv("INDEX_FORCEMERGE_SEGMENTS", "1"))
+    INDEX_FORCEMERGE_TIMEOUT: float = float(os.getenv("INDEX_FORCEMERGE_TIMEOUT", "600"))
+    # Previous index versions kept after an alias swap, for rollback
+    INDEX_RETAINED_VERSIONS: int = int(os.getenv("INDEX_RETAINED_VERSIONS", "1"))
+    
+    # ElasticSearch Transport Configuration
+    ELASTICSEARCH_CONNECTIONS_PER_NODE: int = int(os.getenv("ELASTICSEARCH_CONNECTIONS_PER_NODE", "10"))
+    ELASTICSEARCH_REQUEST_TIMEOUT: float = float(os.getenv("ELASTICSEARCH_REQUEST_TIMEOUT", "30"))
+    ELASTICSEARCH_BULK_TIMEOUT: float = float(os.getenv("ELASTICSEARCH_BULK_TIMEOUT", "120"))
+    ELASTICSEARCH_MAX_RETRIES: int = int(os.getenv("ELASTICSEARCH_MAX_RETRIES", "3"))
+    ELASTICSEARCH_RETRY_ON_TIMEOUT: bool = os.getenv("ELASTICSEARCH_RETRY_ON_TIMEOUT", "true").lower() == "true"
+    ELASTICSEARCH_HTTP_COMPRESS: bool = os.getenv("ELASTICSEARCH_HTTP_COMPRESS", "false").lower() == "true"
+    ELASTICSEARCH_KEEP_ALIVE: bool = os.getenv("ELASTICSEARCH_KEEP_ALIVE", "true").lower() == "true"
     
     # API Configuration
     API_HOST: str = os.getenv("API_HOST", "0.0.0.0")
@@ -19,5 +35,54 @@ class Settings:
     
     # Data file Configuration
     DATA_FILE_PATH: str = os.getenv("DATA_FILE_PATH", "data/tweets_injected_3.csv")
+    # Optional json copy of the ingested records, disabled when empty
+    JSON_EXPORT_PATH: str = os.getenv("JSON_EXPORT_PATH", "")
+    # Where incremental ingests record how far the data file was read, disabled when empty
+    INGEST_CHECKPOINT_PATH: str = os.getenv("INGEST_CHECKPOINT_PATH", "data/.ingest_checkpoint.json")
+    # CSV rows read per chunk, dates are parsed a whole chunk at a time
+    CSV_CHUNK_SIZE: int = int(os.getenv("CSV_CHUNK_SIZE", "5000"))
+    
+    # Processing Configuration
+    ENRICHMENT_BATCH_SIZE: int = int(os.getenv("ENRICHMENT_BATCH_SIZE", "500"))
+    # "local" tokenizes in-process, "es" uses batched _analyze calls for exact server parity
+    WEAPON_TOKENIZER: str = os.getenv("WEAPON_TOKENIZER", "local")
+    ANALYZE_BATCH_SIZE: int = int(os.getenv("ANALYZE_BATCH_SIZE", "100"))
+    # A text makes at most one token per character, so this stays under the server's
+    # index.analyze.max_token_count (10000 by default) however dense the text is
+    ANALYZE_MAX_BATCH_CHARS: int = int(os.getenv("ANALYZE_MAX_BATCH_CHARS", "8000"))
+    # Processes scoring sentiment in parallel, 0 scores on a background thread
+    SENTIMENT_WORKERS: int = int(os.getenv("SENTIMENT_WORKERS", str(min(4, os.cpu_count() or 1))))
+    SENTIMENT_MIN_SHARD_SIZE: int = int(os.getenv("SENTIMENT_MIN_SHARD_SIZE", "50"))
+    # Processes parsing and enriching byte ranges of the csv in full ingests, 0 keeps the single-process pipeline
+    INGEST_WORKERS: int = int(os.getenv("INGEST_WORKERS", "0"))
+    INGEST_SHARD_BYTES: int = int(os.getenv("INGEST_SHARD_BYTES", str(4 * 1024 * 1024)))
+    # Enrichment results cached per normalized text, persisted to sqlite when a path is set
+    ENRICHMENT_CACHE_SIZE: int = int(os.getenv("ENRICHMENT_CACHE_SIZE", "100000"))
+    ENRICHMENT_CACHE_PATH: str = os.getenv("ENRICHMENT_CACHE_PATH", "")
+    
+    # Point in time keep alive between batches of whole-index scans
+    SEARCH_PIT_KEEP_ALIVE: str = os.getenv("SEARCH_PIT_KEEP_ALIVE", "2m")
+    # Batch size when reading the whole index
+    SCAN_BATCH_SIZE: int = int(os.getenv("SCAN_BATCH_SIZE", "1000"))
+    # Seconds a computed processing status is reused, 0 disables caching
+    STATUS_CACHE_TTL: float = float(os.getenv("STATUS_CACHE_TTL", "2"))
+    # Finished background jobs kept for the jobs endpoints
+    JOB_HISTORY_SIZE: int = int(os.getenv("JOB_HISTORY_SIZE", "50"))
+    # Rendered read responses cached until the next ingest, 0 disables caching;
+    # a sqlite path shares the cache between worker processes
+    RESPONSE_CACHE_SIZE: int = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+    RESPONSE_CACHE_PATH: str = os.getenv("RESPONSE_CACHE_PATH", "")
+    # Most created_at histogram buckets a request may ask for, below ES's search.max_buckets
+    ANALYTICS_MAX_DATE_BUCKETS: int = int(os.getenv("ANALYTICS_MAX_DATE_BUCKETS", "10000"))
+    # Build a MaliciousDocument per hit instead of returning _source as indexed
+    VALIDATE_DOCUMENTS: bool = os.getenv("VALIDATE_DOCUMENTS", "false").lower() == "true"
+    
+    # Bulk Indexing Configuration
+    BULK_CHUNK_SIZE: int = int(os.getenv("BULK_CHUNK_SIZE", "1000"))
+    BULK_MAX_CHUNK_BYTES: int = int(os.getenv("BULK_MAX_CHUNK_BYTES", str(10 * 1024 * 1024)))
+    BULK_CONCURRENCY: int = int(os.getenv("BULK_CONCURRENCY", "4"))
+    BULK_MAX_RETRIES: int = int(os.getenv("BULK_MAX_RETRIES", "5"))
+    BULK_INITIAL_BACKOFF: float = float(os.getenv("BULK_INITIAL_BACKOFF", "0.5"))
+    BULK_MAX_BACKOFF: float = float(os.getenv("BULK_MAX_BACKOFF", "30"))
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,110 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from pydantic import BaseModel
+from typing import Any, Awaitable, Dict, Optional, Tuple, Type
+from datetime import datetime
+import logging
+from .document_controller import cached_response, get_services
+from ..services.analytics import TooManyBucketsError
+from ..services.service_container import ServiceContainer
+from ..models.analytics import (
+    AnalyticsSummary, DateHistogramResponse, SentimentBreakdownResponse,
+    TopWeaponsResponse, WeaponCountHistogramResponse
+)
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+INTERVAL_PATTERN = "^(hour|day|week|month|quarter|year)$"
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    "Render a query date for an ES range filter"
+    return value.isoformat() if value is not None else None
+
+async def _build(model: Type[BaseModel], result: Awaitable[Dict[str, Any]]) -> Tuple[BaseModel, bool]:
+    "Wrap an analytics result in its response model, aggregations are always cacheable"
+    return model(**await result), True
+
+@router.get("/top-weapons", response_model=TopWeaponsResponse)
+async def get_top_weapons(
+    request: Request,
+    size: int = Query(10, ge=1, le=500, description="Number of weapons to return"),
+    antisemitic: Optional[bool] = Query(None, description="Only count antisemitic (true) or other (false) documents"),
+    services: ServiceContainer = Depends(get_services)
+):
+    """Get the most frequently detected weapons."""
+    try:
+        return await cached_response(request, services, lambda: _build(
+            TopWeaponsResponse, services.analytics_service.get_top_weapons(size, antisemitic)
+        ))
+    except Exception as e:
+        logger.error(f"Error getting top weapons: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/weapon-count-histogram", response_model=WeaponCountHistogramResponse)
+async def get_weapon_count_histogram(
+    request: Request,
+    antisemitic: Optional[bool] = Query(None, description="Only count antisemitic (true) or other (false) documents"),
+    services: ServiceContainer = Depends(get_services)
+):
+    """Get how many documents mention 0, 1, 2, ... weapons."""
+    try:
+        return await cached_response(request, services, lambda: _build(
+            WeaponCountHistogramResponse, services.analytics_service.get_weapon_count_histogram(antisemitic)
+        ))
+    except Exception as e:
+        logger.error(f"Error getting weapon count histogram: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/sentiment", response_model=SentimentBreakdownResponse)
+async def get_sentiment_breakdown(request: Request, services: ServiceContainer = Depends(get_services)):
+    """Get document counts per sentiment, split by antisemitic classification."""
+    try:
+        return await cached_response(request, services, lambda: _build(
+            SentimentBreakdownResponse, services.analytics_service.get_sentiment_breakdown()
+        ))
+    except Exception as e:
+        logger.error(f"Error getting sentiment breakdown: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/created-at-histogram", response_model=DateHistogramResponse)
+async def get_date_histogram(
+    request: Request,
+    interval: str = Query("month", pattern=INTERVAL_PATTERN, description="Calendar interval of each bucket"),
+    antisemitic: Optional[bool] = Query(None, description="Only count antisemitic (true) or other (false) documents"),
+    start: Optional[datetime] = Query(None, description="Only count documents created at or after this time"),
+    end: Optional[datetime] = Query(None, description="Only count documents created at or before this time"),
+    services: ServiceContainer = Depends(get_services)
+):
+    """Get document counts over time."""
+    try:
+        return await cached_response(request, services, lambda: _build(
+            DateHistogramResponse,
+            services.analytics_service.get_date_histogram(interval, antisemitic, _iso(start), _iso(end))
+        ))
+    except TooManyBucketsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting created_at histogram: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/summary", response_model=AnalyticsSummary)
+async def get_summary(
+    request: Request,
+    top_weapons: int = Query(10, ge=1, le=500, description="Number of weapons to return"),
+    interval: Optional[str] = Query(None, pattern=INTERVAL_PATTERN, description="Include a created_at histogram with this interval"),
+    antisemitic: Optional[bool] = Query(None, description="Only count antisemitic (true) or other (false) documents"),
+    start: Optional[datetime] = Query(None, description="Only count documents created at or after this time"),
+    end: Optional[datetime] = Query(None, description="Only count documents created at or before this time"),
+    services: ServiceContainer = Depends(get_services)
+):
+    """Get every analytic at once, computed in a single search."""
+    try:
+        return await cached_response(request, services, lambda: _build(
+            AnalyticsSummary,
+            services.analytics_service.get_summary(top_weapons, interval, antisemitic, _iso(start), _iso(end))
+        ))
+    except TooManyBucketsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting analytics summary: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
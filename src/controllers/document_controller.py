@@ -1,124 +1,202 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 import logging
-from ..services.elasticsearch_service import ElasticSearchService
-from ..services.data_processing import DataProcessingService
+from ..config.settings import settings
+from ..services.service_container import ServiceContainer
+from ..services.job_runner import JobConflictError
+from ..services.metrics import profiled
+from ..services.elasticsearch_service import antisemitic_with_weapons_query, multiple_weapons_query
+from ..services.pagination import InvalidCursorError
+from ..services.response_cache import etag_matches, make_etag
+from ..services.serialization import DOCUMENT_FIELDS, dumps, dumps_lines, render_document_page
 from ..models.document import DocumentResponse, MaliciousDocument, ProcessingStatus
+from ..models.job import JobInfo
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/documents", tags=["documents"])
 
-def get_services():
-    return {
-        "es_service": ElasticSearchService(),
-        "processing_service": DataProcessingService()
-    }
-
-@router.post("/process", response_model=ProcessingStatus)
-async def process_documents(services=Depends(get_services)):
-    """Process all documents from the data file and load them into ElasticSearch."""
+def get_services(request: Request) -> ServiceContainer:
+    "Return the application-scoped services created on startup"
+    return request.app.state.services
+
+async def cached_response(request: Request, services: ServiceContainer,
+                          build: Callable[[], Awaitable[Tuple[Any, bool]]]) -> Response:
+    """Serve a read endpoint through the response cache with ETag revalidation.
+
+    build returns the response content and whether it may be cached; content is a
+    pre-rendered JSON body, a model or plain data, and responses (streams) bypass
+    the cache. Matching If-None-Match headers get an empty 304.
+    """
+    cache = services.response_cache
+    # Profiling a request must not change what it returns or which entry it uses
+    params = [(name, value) for name, value in request.query_params.multi_items() if name != "profile"]
+    key = cache.make_key(request.url.path, params)
+    generation = cache.generation
+    entry = cache.get(generation, key)
+    if entry is None:
+        with profiled("build"):
+            content, cacheable = await build()
+        if isinstance(content, Response):
+            return content
+        with profiled("render"):
+            if isinstance(content, bytes):
+                body = content
+            elif isinstance(content, BaseModel):
+                body = content.model_dump_json().encode('utf-8')
+            else:
+                body = dumps(jsonable_encoder(content))
+            entry = (make_etag(body), body)
+        if cacheable:
+            cache.put(generation, key, entry)
+    
+    etag, body = entry
+    # Clients may reuse the response only after revalidating it
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.post("/process", response_model=JobInfo, status_code=202)
+async def process_documents(incremental: bool = False, services: ServiceContainer = Depends(get_services)):
+    """Start processing documents from the data file into ElasticSearch in the background.
+
+    Returns the job immediately, follow its progress at /api/jobs/{job_id}. With
+    incremental=true only rows appended or changed since the last run are processed.
+    Only one ingest can run per index at a time.
+    """
     try:
         logger.info("Starting document processing pipeline...")
-        result = await services["processing_service"].process_all_documents()
-        
-        if result["status"] == "success":
-            return ProcessingStatus(
-                status="completed",
-                message=result["message"],
-                processed_count=result.get("final_count", 0),
-                total_count=result.get("initial_count", 0)
-            )
-        else:
-            return ProcessingStatus(
-                status="error",
-                message=result["message"],
-                processed_count=0,
-                total_count=0
-            )
-            
+        processing_service = services.processing_service
+        job = services.job_runner.submit(
+            processing_service.es_service.index_name,
+            lambda progress: processing_service.process_all_documents(incremental=incremental, progress=progress),
+            incremental=incremental
+        )
+        return job.to_info()
+    
+    except JobConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logger.error(f"Error processing documents: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/status", response_model=ProcessingStatus)
-async def get_processing_status(services=Depends(get_services)):
+async def get_processing_status(services: ServiceContainer = Depends(get_services)):
     """Get the current processing status."""
     try:
-        status = await services["processing_service"].get_processing_status()
+        status = await services.processing_service.get_processing_status()
         return ProcessingStatus(**status)
     except Exception as e:
         logger.error(f"Error getting processing status: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/antisemitic-with-weapons", response_model=DocumentResponse)
-async def get_antisemistic_with_weapons(services=Depends(get_services)):
-    """Get all antisemitic documents that contain weapon keywords."""
-    try:
-        # Check if data processing is complete
-        status = await services["processing_service"].get_processing_status()
-        is_complete = status["status"] == "completed"
-        status_message = status["message"]
-
-        if not is_complete:
-            # Return empty response if processing not complete
-            return DocumentResponse(
-                documents=[],
-                total_count=0,
-                message=f"Data processing not complete. Status: {status_message}"
-            )
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    "Split a comma separated field list"
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
 
-        # Fetch documents from Elasticsearch
-        documents = await services["es_service"].get_antisemistic_with_weapons()
-
-        # Convert raw dicts to MaliciousDocument objects
-        malicious_documents = []
-        for doc in documents:
-            malicious_documents.append(MaliciousDocument(**doc))
-
-        # Build and return the response
-        total = len(malicious_documents)
+async def _stream_ndjson(services: ServiceContainer, query: Dict[str, Any], page_size: int,
+                         cursor: Optional[str], fields: Optional[List[str]]) -> AsyncIterator[bytes]:
+    "Stream matching documents as NDJSON, one page in memory at a time"
+    try:
+        async for documents in services.es_service.iter_search_pages(query, page_size, cursor, fields):
+            yield dumps_lines(documents)
+    except Exception as e:
+        # Headers are already sent, so the client sees a truncated stream
+        logger.error(f"Error streaming documents: {e}")
+        raise
+
+async def _query_documents(services: ServiceContainer, query: Dict[str, Any], description: str,
+                           size: int, cursor: Optional[str], fields: Optional[str], format: str) -> Tuple[Any, bool]:
+    """Shared implementation of the paginated query endpoints.
+
+    Returns the content and whether it can be cached: json pages are, since a page
+    and its next_cursor only depend on the request and the indexed data, except
+    point in time pages of an index built before the current template.
+    Pages are rendered straight from the hits' _source unless VALIDATE_DOCUMENTS
+    is set, in which case each hit goes through MaliciousDocument.
+    """
+    # Readers are served from the alias, also while a rebuild or incremental run is going on
+    status = await services.processing_service.get_processing_status()
+    if status["status"] in ("not_processed", "error"):
+        # Nothing has been indexed behind the alias yet
         return DocumentResponse(
-            documents=malicious_documents,
-            total_count=total,
-            message=f"Found {total} antisemitic documents with weapons"
-        )
+            documents=[],
+            total_count=0,
+            message=f"No processed data to query. Status: {status['message']}"
+        ), False
+    
+    field_list = _parse_fields(fields)
+    validate = settings.VALIDATE_DOCUMENTS and not field_list
+    if not field_list and not validate:
+        # Leave out internal fields so lean documents match MaliciousDocument
+        field_list = DOCUMENT_FIELDS
+    if format == "ndjson":
+        # Export every match from the cursor on, size is the page size of each ES request
+        return StreamingResponse(
+            _stream_ndjson(services, query, size, cursor, field_list),
+            media_type="application/x-ndjson"
+        ), False
+    
+    page = await services.es_service.search_page(query, size, cursor, field_list)
+    total = len(page.documents)
+    message = f"Found {page.total} {description}" + (f", returning {total}" if page.next_cursor or cursor else "")
+    if not validate:
+        # Partial documents do not validate as MaliciousDocument, return them as they are
+        return render_document_page(
+            page.documents, total, message, page.next_cursor, page.total
+        ), page.cacheable
+    
+    return DocumentResponse(
+        documents=[MaliciousDocument(**doc) for doc in page.documents],
+        total_count=total,
+        message=message,
+        next_cursor=page.next_cursor,
+        total_hits=page.total
+    ), page.cacheable
 
+@router.get("/antisemitic-with-weapons", response_model=DocumentResponse)
+async def get_antisemistic_with_weapons(
+    request: Request,
+    size: int = Query(1000, ge=1, le=10000, description="Documents per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma separated _source fields to return"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="json pages or a streamed ndjson export"),
+    services: ServiceContainer = Depends(get_services)
+):
+    """Get antisemitic documents that contain weapon keywords, a page at a time."""
+    try:
+        return await cached_response(request, services, lambda: _query_documents(
+            services, antisemitic_with_weapons_query(),
+            "antisemitic documents with weapons", size, cursor, fields, format
+        ))
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting antisemitic documents with weapons: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/multiple-weapons", response_model=DocumentResponse)
-async def get_documents_with_multiple_weapons(services=Depends(get_services)):
-    """Get all documents that contain 2 or more weapon keywords."""
+async def get_documents_with_multiple_weapons(
+    request: Request,
+    size: int = Query(1000, ge=1, le=10000, description="Documents per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma separated _source fields to return"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="json pages or a streamed ndjson export"),
+    services: ServiceContainer = Depends(get_services)
+):
+    """Get documents that contain 2 or more weapon keywords, a page at a time."""
     try:
-        # Check if data processing is complete
-        status = await services["processing_service"].get_processing_status()
-        is_complete = status["status"] == "completed"
-        status_message = status["message"]
-
-        if not is_complete:
-            # Return empty response if processing not complete
-            return DocumentResponse(
-                documents=[],
-                total_count=0,
-                message=f"Data processing not complete. Status: {status_message}"
-            )
-
-        # Fetch documents from Elasticsearch
-        documents = await services["es_service"].get_documents_with_multiple_weapons()
-
-        # Convert raw dicts to MaliciousDocument objects
-        malicious_documents = []
-        for doc in documents:
-            malicious_documents.append(MaliciousDocument(**doc))
-
-        # Build and return the response
-        total = len(malicious_documents)
-        return DocumentResponse(
-            documents=malicious_documents,
-            total_count=total,
-            message=f"Found {total} documents with 2 or more weapons"
-        )
-
+        return await cached_response(request, services, lambda: _query_documents(
+            services, multiple_weapons_query(),
+            "documents with 2 or more weapons", size, cursor, fields, format
+        ))
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting documents with multiple weapons: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, HTTPException, Depends
+import logging
+from .document_controller import get_services
+from ..services.service_container import ServiceContainer
+from ..models.job import JobInfo, JobList
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+@router.get("", response_model=JobList)
+async def list_jobs(services: ServiceContainer = Depends(get_services)):
+    """List active and recent processing jobs, newest first."""
+    jobs = [job.to_info() for job in services.job_runner.list_jobs()]
+    return JobList(jobs=jobs, total_count=len(jobs))
+
+@router.get("/{job_id}", response_model=JobInfo)
+async def get_job(job_id: str, services: ServiceContainer = Depends(get_services)):
+    """Get per-stage progress, throughput and ETA of a processing job."""
+    job = services.job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.to_info()
+
+@router.delete("/{job_id}", response_model=JobInfo)
+async def cancel_job(job_id: str, services: ServiceContainer = Depends(get_services)):
+    """Cancel a queued or running processing job."""
+    job = services.job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if not services.job_runner.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is already {job.status}")
+    logger.info(f"Cancellation requested for job {job_id}")
+    return job.to_info()
@@ -1,20 +1,76 @@
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from starlette.datastructures import MutableHeaders
+from urllib.parse import parse_qs
 import logging
+import time
 
+from .controllers.analytics_controller import router as analytics_router
 from .controllers.document_controller import router as document_router
+from .controllers.job_controller import router as job_router
 from .config.settings import settings
+from .services.service_container import ServiceContainer
+from .services import metrics
 
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    "Build shared services on startup and release them on shutdown"
+    services = ServiceContainer()
+    await services.startup()
+    app.state.services = services
+    try:
+        yield
+    finally:
+        await services.shutdown()
+
+class ProfileMiddleware:
+    """Return a Server-Timing stage breakdown for requests made with ?profile=1.
+
+    A plain ASGI middleware: other requests go straight to the app, without the
+    request and response wrapping an http middleware adds to every call.
+    """
+
+    def __init__(self, app):
+        "Wrap the ASGI app"
+        self.app = app
+
+    @staticmethod
+    def _wants_profile(query_string: bytes) -> bool:
+        "Whether the query string asks for profiling"
+        if b"profile" not in query_string:
+            return False
+        values = parse_qs(query_string.decode("latin-1")).get("profile", [])
+        return bool(values) and values[-1] in ("1", "true")
+
+    async def __call__(self, scope, receive, send):
+        "Profile the request when asked, otherwise pass it through untouched"
+        if scope["type"] != "http" or not self._wants_profile(scope.get("query_string", b"")):
+            await self.app(scope, receive, send)
+            return
+        profile = metrics.start_profile()
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                metrics.add_to_profile("total", time.perf_counter() - started)
+                MutableHeaders(scope=message).append("Server-Timing", metrics.server_timing(profile))
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
+
 def create_app() -> FastAPI:
     "Create and configure the FastAPI application"
     
     app = FastAPI(
         title=settings.API_TITLE,
         version=settings.API_VERSION,
-        description="ElasticSearch-based malicious text analysis system for Iranian database data"
+        description="ElasticSearch-based malicious text analysis system for Iranian database data",
+        lifespan=lifespan
     )
     
     # Add CORS middleware
@@ -26,8 +82,12 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
     
+    app.add_middleware(ProfileMiddleware)
+    
     # Include routers
     app.include_router(document_router)
+    app.include_router(job_router)
+    app.include_router(analytics_router)
     
     @app.get("/")
     async def root():
@@ -37,7 +97,9 @@ def create_app() -> FastAPI:
             "version": settings.API_VERSION,
             "endpoints": {
                 "antisemitic_with_weapons": "/api/documents/antisemitic-with-weapons",
-                "multiple_weapons": "/api/documents/multiple-weapons"
+                "multiple_weapons": "/api/documents/multiple-weapons",
+                "jobs": "/api/jobs",
+                "analytics": "/api/analytics/summary"
             }
         }
         
@@ -46,6 +108,11 @@ def create_app() -> FastAPI:
         "Health check endpoint"
         return {"status": "healthy", "service": "malicious-text-analyzer"}
     
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def prometheus_metrics():
+        "Ingest stage and ElasticSearch round trip metrics in the Prometheus text format"
+        return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+    
     return app
 
 # Create the app instance
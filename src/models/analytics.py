@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+class BucketCount(BaseModel):
+    """Number of documents for one aggregation key"""
+    key: str
+    count: int
+
+class TopWeaponsResponse(BaseModel):
+    """Response model for the most mentioned weapons"""
+    weapons: List[BucketCount]
+    total_count: int = Field(..., description="Documents matched by the filters")
+
+class HistogramBucket(BaseModel):
+    """Number of documents with a numeric value in a bucket"""
+    value: int
+    count: int
+
+class WeaponCountHistogramResponse(BaseModel):
+    """Response model for the distribution of weapon_count"""
+    buckets: List[HistogramBucket]
+    total_count: int
+
+class SentimentBucket(BaseModel):
+    """Antisemitic and other documents for one sentiment"""
+    sentiment: str
+    count: int
+    antisemitic_count: int
+    not_antisemitic_count: int
+
+class SentimentBreakdownResponse(BaseModel):
+    """Response model for sentiment by is_antisemitic"""
+    sentiments: List[SentimentBucket]
+    total_count: int
+
+class DateBucket(BaseModel):
+    """Number of documents created in one interval"""
+    date: datetime
+    count: int
+
+class DateHistogramResponse(BaseModel):
+    """Response model for documents over time"""
+    interval: str
+    buckets: List[DateBucket]
+    total_count: int
+
+class AnalyticsSummary(BaseModel):
+    """All analytics computed in a single search"""
+    total_count: int
+    top_weapons: List[BucketCount]
+    weapon_count_histogram: List[HistogramBucket]
+    sentiments: List[SentimentBucket]
+    created_at_histogram: Optional[List[DateBucket]] = None
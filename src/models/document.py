@@ -22,6 +22,8 @@ class DocumentResponse(BaseModel):
     documents: List[MaliciousDocument]
     total_count: int
     message: Optional[str] = None
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor to get the next page, empty on the last page")
+    total_hits: Optional[int] = Field(None, description="Number of matching documents across all pages")
 
 
 class ProcessingStatus(BaseModel):
@@ -29,4 +31,5 @@ class ProcessingStatus(BaseModel):
     status: str
     message: str
     processed_count: int = 0
-    total_count: int = 0
\ No newline at end of file
+    total_count: int = 0
+    job_id: Optional[str] = None
\ No newline at end of file
@@ -0,0 +1,32 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+
+class StageProgress(BaseModel):
+    """Progress of one pipeline stage"""
+    count: int = Field(default=0, description="Items that went through the stage so far")
+    per_second: float = Field(default=0.0, description="Average stage throughput since the job started")
+
+class JobInfo(BaseModel):
+    """Snapshot of a background processing job"""
+    job_id: str
+    index: str
+    status: str = Field(..., description="queued, running, completed, failed or cancelled")
+    incremental: bool = False
+    phase: Optional[str] = Field(None, description="Current pipeline phase while running")
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    elapsed_seconds: float = 0.0
+    stages: Dict[str, StageProgress] = Field(default_factory=dict)
+    bytes_read: int = 0
+    bytes_total: int = 0
+    percent: Optional[float] = Field(None, description="Share of the data file read, 0 to 100")
+    eta_seconds: Optional[float] = Field(None, description="Estimated time left, from the file read rate")
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+class JobList(BaseModel):
+    """Response model for listing jobs"""
+    jobs: List[JobInfo]
+    total_count: int
@@ -0,0 +1,212 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from elasticsearch import NotFoundError
+
+from .elasticsearch_service import ElasticSearchService
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Shortest length of each calendar interval in milliseconds, so bucket estimates err high
+INTERVAL_MILLIS = {
+    "hour": 3_600_000,
+    "day": 86_400_000,
+    "week": 7 * 86_400_000,
+    "month": 28 * 86_400_000,
+    "quarter": 89 * 86_400_000,
+    "year": 365 * 86_400_000
+}
+DATE_INTERVALS = tuple(INTERVAL_MILLIS)
+
+class TooManyBucketsError(ValueError):
+    """Raised when a date histogram would return more buckets than ANALYTICS_MAX_DATE_BUCKETS"""
+
+def estimate_date_buckets(interval: str, first: int, last: int) -> int:
+    "Upper bound on the calendar buckets between two epoch millis, counting partial ones at both ends"
+    return (last - first) // INTERVAL_MILLIS[interval] + 2
+
+def top_weapons_agg(size: int) -> Dict[str, Any]:
+    "Terms aggregation over the detected weapon keywords"
+    return {"terms": {"field": "detected_weapons", "size": size}}
+
+def weapon_count_histogram_agg() -> Dict[str, Any]:
+    "Histogram of weapon_count with one bucket per value, including empty ones from 0"
+    return {
+        "histogram": {
+            "field": "weapon_count",
+            "interval": 1,
+            "min_doc_count": 0,
+            "extended_bounds": {"min": 0}
+        }
+    }
+
+def sentiment_agg() -> Dict[str, Any]:
+    "Terms aggregation over sentiment, counting antisemitic documents in each"
+    return {
+        "terms": {"field": "sentiment", "size": 10},
+        "aggs": {
+            "antisemitic": {"filter": {"term": {"is_antisemitic": True}}}
+        }
+    }
+
+def date_bounds_agg() -> Dict[str, Any]:
+    "Earliest and latest created_at"
+    return {
+        "first_created_at": {"min": {"field": "created_at"}},
+        "last_created_at": {"max": {"field": "created_at"}}
+    }
+
+def date_histogram_agg(interval: str, first: int, last: int) -> Dict[str, Any]:
+    """Date histogram over created_at with calendar intervals.
+
+    Empty buckets are filled in between first and last (epoch millis), and
+    hard_bounds keeps documents indexed after the bounds were read from adding more.
+    """
+    return {
+        "date_histogram": {
+            "field": "created_at",
+            "calendar_interval": interval,
+            "min_doc_count": 0,
+            "hard_bounds": {"min": first, "max": last}
+        }
+    }
+
+class AnalyticsService:
+    """Service computing weapon and sentiment analytics with ElasticSearch aggregations"""
+
+    def __init__(self, es_service: ElasticSearchService):
+        "Initialize with the shared es service"
+        self.es_service = es_service
+
+    async def _aggregate(self, aggs: Dict[str, Any], antisemitic: Optional[bool] = None,
+                         start: Optional[str] = None, end: Optional[str] = None) -> Tuple[int, Dict[str, Any]]:
+        "Run aggregations in one size=0 search, returning the matched total and the results"
+        filters: List[Dict[str, Any]] = []
+        if antisemitic is not None:
+            filters.append({"term": {"is_antisemitic": antisemitic}})
+        if start is not None or end is not None:
+            bounds = {op: value for op, value in (("gte", start), ("lte", end)) if value is not None}
+            filters.append({"range": {"created_at": bounds}})
+        try:
+            response = await self.es_service.client.search(
+                index=self.es_service.index_name,
+                size=0,
+                track_total_hits=True,
+                query={"bool": {"filter": filters}},
+                aggs=aggs,
+                # size=0 results are served from the shard request cache until the next refresh
+                request_cache=True
+            )
+        except NotFoundError:
+            # Nothing has been ingested yet
+            return 0, {}
+        return response['hits']['total']['value'], response.get('aggregations', {})
+
+    @staticmethod
+    def _parse_terms(result: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        "Convert terms buckets to key/count pairs"
+        if not result:
+            return []
+        return [{"key": str(bucket['key']), "count": bucket['doc_count']} for bucket in result['buckets']]
+
+    @staticmethod
+    def _parse_histogram(result: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        "Convert histogram buckets to value/count pairs"
+        if not result:
+            return []
+        return [{"value": int(bucket['key']), "count": bucket['doc_count']} for bucket in result['buckets']]
+
+    @staticmethod
+    def _parse_sentiments(result: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        "Convert sentiment buckets to counts split by is_antisemitic"
+        if not result:
+            return []
+        sentiments = []
+        for bucket in result['buckets']:
+            antisemitic = bucket['antisemitic']['doc_count']
+            sentiments.append({
+                "sentiment": str(bucket['key']),
+                "count": bucket['doc_count'],
+                "antisemitic_count": antisemitic,
+                "not_antisemitic_count": bucket['doc_count'] - antisemitic
+            })
+        return sentiments
+
+    @staticmethod
+    def _parse_dates(result: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        "Convert date histogram buckets to date/count pairs"
+        if not result:
+            return []
+        return [{"date": bucket['key_as_string'], "count": bucket['doc_count']} for bucket in result['buckets']]
+
+    async def get_top_weapons(self, size: int = 10, antisemitic: Optional[bool] = None) -> Dict[str, Any]:
+        "Get the most frequently detected weapons"
+        total, aggs = await self._aggregate({"top_weapons": top_weapons_agg(size)}, antisemitic)
+        return {"weapons": self._parse_terms(aggs.get("top_weapons")), "total_count": total}
+
+    async def get_weapon_count_histogram(self, antisemitic: Optional[bool] = None) -> Dict[str, Any]:
+        "Get how many documents mention 0, 1, 2, ... weapons"
+        total, aggs = await self._aggregate({"weapon_counts": weapon_count_histogram_agg()}, antisemitic)
+        return {"buckets": self._parse_histogram(aggs.get("weapon_counts")), "total_count": total}
+
+    async def get_sentiment_breakdown(self) -> Dict[str, Any]:
+        "Get document counts per sentiment, split by is_antisemitic"
+        total, aggs = await self._aggregate({"sentiments": sentiment_agg()})
+        return {"sentiments": self._parse_sentiments(aggs.get("sentiments")), "total_count": total}
+
+    async def _bounded_date_histogram(self, interval: str, antisemitic: Optional[bool],
+                                      start: Optional[str], end: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Date histogram aggregation over the created_at range of the matching documents.
+
+        Reads the range first, in a request-cached size=0 search, and refuses
+        intervals that would need more than ANALYTICS_MAX_DATE_BUCKETS buckets,
+        which ES would otherwise reject against search.max_buckets. None when no
+        document matches.
+        """
+        if interval not in DATE_INTERVALS:
+            raise ValueError(f"Unsupported interval: {interval}. Supported: {', '.join(DATE_INTERVALS)}")
+        _, bounds = await self._aggregate(date_bounds_agg(), antisemitic, start, end)
+        first = (bounds.get("first_created_at") or {}).get("value")
+        last = (bounds.get("last_created_at") or {}).get("value")
+        if first is None or last is None:
+            return None
+        first, last = int(first), int(last)
+        buckets = estimate_date_buckets(interval, first, last)
+        if buckets > settings.ANALYTICS_MAX_DATE_BUCKETS:
+            raise TooManyBucketsError(
+                f"interval={interval} would return about {buckets} buckets, more than the limit of "
+                f"{settings.ANALYTICS_MAX_DATE_BUCKETS}; use a longer interval or a narrower start/end range"
+            )
+        return date_histogram_agg(interval, first, last)
+
+    async def get_date_histogram(self, interval: str = "month", antisemitic: Optional[bool] = None,
+                                 start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, Any]:
+        "Get document counts per calendar interval of created_at, optionally within start and end"
+        histogram = await self._bounded_date_histogram(interval, antisemitic, start, end)
+        if histogram is None:
+            return {"interval": interval, "buckets": [], "total_count": 0}
+        total, aggs = await self._aggregate({"created_at": histogram}, antisemitic, start, end)
+        return {"interval": interval, "buckets": self._parse_dates(aggs.get("created_at")), "total_count": total}
+
+    async def get_summary(self, top_weapons: int = 10, interval: Optional[str] = None,
+                          antisemitic: Optional[bool] = None, start: Optional[str] = None,
+                          end: Optional[str] = None) -> Dict[str, Any]:
+        "Compute every analytic in a single search, optionally only over documents created within start and end"
+        aggs = {
+            "top_weapons": top_weapons_agg(top_weapons),
+            "weapon_counts": weapon_count_histogram_agg(),
+            "sentiments": sentiment_agg()
+        }
+        if interval is not None:
+            histogram = await self._bounded_date_histogram(interval, antisemitic, start, end)
+            if histogram is not None:
+                aggs["created_at"] = histogram
+        total, results = await self._aggregate(aggs, antisemitic, start, end)
+        return {
+            "total_count": total,
+            "top_weapons": self._parse_terms(results.get("top_weapons")),
+            "weapon_count_histogram": self._parse_histogram(results.get("weapon_counts")),
+            "sentiments": self._parse_sentiments(results.get("sentiments")),
+            "created_at_histogram": self._parse_dates(results.get("created_at")) if interval is not None else None
+        }
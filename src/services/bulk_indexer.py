@@ -0,0 +1,263 @@
+import asyncio
+import json
+import time
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+
+from elasticsearch import AsyncElasticsearch, ApiError, TransportError
+
+from ..config.settings import settings
+from . import metrics
+from .document_batch import DocumentBatch, RenderedBatch
+
+logger = logging.getLogger(__name__)
+
+# A serialized bulk item: action line and source line, both newline terminated
+BulkItem = Tuple[bytes, bytes]
+
+# Documents come one dict at a time, as columnar batches or as lines rendered by workers
+Indexable = Union[Dict[str, Any], DocumentBatch, RenderedBatch]
+
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+def _json_default(value: Any) -> Any:
+    "Serialize values the json module does not know about"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def serialize_document(index_name: str, document: Dict[str, Any]) -> BulkItem:
+    """Serialize one document into bulk action and source lines.
+
+    The document id comes from `_id`, or else its `id` field. A document with
+    `_op_type` "delete" becomes a delete action with an empty source line.
+    """
+    document = dict(document)
+    action: Dict[str, Any] = {"_index": index_name}
+    op_type = document.pop('_op_type', 'index')
+    doc_id = document.pop('_id', None)
+    if doc_id is None:
+        doc_id = document.get('id')
+    if doc_id is not None:
+        action["_id"] = doc_id
+    header = json.dumps({op_type: action}).encode('utf-8') + b"\n"
+    if op_type == 'delete':
+        return header, b""
+    source = json.dumps(document, default=_json_default, ensure_ascii=False).encode('utf-8') + b"\n"
+    return header, source
+
+@dataclass
+class BulkReport:
+    """Outcome of a bulk indexing run"""
+    indexed: int = 0
+    deleted: int = 0
+    failed: int = 0
+    retried: int = 0
+    chunks: int = 0
+    bytes_sent: int = 0
+    elapsed_seconds: float = 0.0
+    failures: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def docs_per_second(self) -> float:
+        "Indexing throughput over the whole run"
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.indexed / self.elapsed_seconds
+
+    @property
+    def success(self) -> bool:
+        "Whether every document was indexed"
+        return self.failed == 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        "Summarize the report for API responses and logs"
+        return {
+            "indexed": self.indexed,
+            "deleted": self.deleted,
+            "failed": self.failed,
+            "retried": self.retried,
+            "chunks": self.chunks,
+            "bytes_sent": self.bytes_sent,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "docs_per_second": round(self.docs_per_second, 1),
+            "failures": self.failures
+        }
+
+class BulkIndexer:
+    """Streams documents into ElasticSearch in concurrent, size-bounded bulk chunks.
+
+    - Chunks are cut by document count and by serialized byte size
+    - At most `concurrency` chunks are in flight, which bounds memory and applies backpressure
+    - Items rejected with 429 (or whole requests that fail transiently) are retried with exponential backoff
+    """
+
+    def __init__(self, client: AsyncElasticsearch, index_name: str,
+                 chunk_size: Optional[int] = None,
+                 max_chunk_bytes: Optional[int] = None,
+                 concurrency: Optional[int] = None,
+                 max_retries: Optional[int] = None,
+                 initial_backoff: Optional[float] = None,
+                 max_backoff: Optional[float] = None,
+                 max_failures_reported: int = 100):
+        "Initialize the indexer, defaulting to the configured bulk settings"
+        self.client = client
+        self.index_name = index_name
+        self.chunk_size = chunk_size or settings.BULK_CHUNK_SIZE
+        self.max_chunk_bytes = max_chunk_bytes or settings.BULK_MAX_CHUNK_BYTES
+        self.concurrency = concurrency or settings.BULK_CONCURRENCY
+        self.max_retries = settings.BULK_MAX_RETRIES if max_retries is None else max_retries
+        self.initial_backoff = initial_backoff or settings.BULK_INITIAL_BACKOFF
+        self.max_backoff = max_backoff or settings.BULK_MAX_BACKOFF
+        self.max_failures_reported = max_failures_reported
+
+    async def index(self, documents: Union[Iterable[Indexable], AsyncIterable[Indexable]],
+                    report: Optional[BulkReport] = None) -> BulkReport:
+        "Index documents from a (possibly async) iterable and report the outcome, updating report as chunks complete"
+        if report is None:
+            report = BulkReport()
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+        errors: List[BaseException] = []
+
+        async def run_chunk(chunk: List[BulkItem]) -> None:
+            try:
+                await self._send_with_retries(chunk, report)
+            finally:
+                semaphore.release()
+
+        def chunk_done(task: asyncio.Task) -> None:
+            # Keep unexpected errors, ES errors are already recorded per item in the report
+            tasks.discard(task)
+            if not task.cancelled() and task.exception() is not None:
+                errors.append(task.exception())
+
+        try:
+            async for chunk in self._chunks(documents):
+                # Wait for a free slot before pulling more documents from the source
+                await semaphore.acquire()
+                if errors:
+                    raise errors[0]
+                task = asyncio.create_task(run_chunk(chunk))
+                tasks.add(task)
+                task.add_done_callback(chunk_done)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            if errors:
+                raise errors[0]
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            report.elapsed_seconds = time.perf_counter() - started
+
+        logger.info(
+            f"Bulk indexed {report.indexed} documents into {self.index_name} "
+            f"({report.failed} failed, {report.retried} retried, {report.chunks} chunks, "
+            f"{report.docs_per_second:.0f} docs/sec)"
+        )
+        return report
+
+    async def _iterate(self, documents) -> AsyncIterator[Indexable]:
+        "Iterate sync and async sources alike"
+        if hasattr(documents, '__aiter__'):
+            async for document in documents:
+                yield document
+        else:
+            for document in documents:
+                yield document
+
+    async def _chunks(self, documents) -> AsyncIterator[List[BulkItem]]:
+        "Group serialized documents into chunks bounded by count and bytes"
+        chunk: List[BulkItem] = []
+        chunk_bytes = 0
+        async for document in self._iterate(documents):
+            if isinstance(document, (DocumentBatch, RenderedBatch)):
+                items = document.bulk_items(self.index_name)
+            else:
+                items = [serialize_document(self.index_name, document)]
+            for item in items:
+                item_bytes = len(item[0]) + len(item[1])
+                if chunk and (len(chunk) >= self.chunk_size or chunk_bytes + item_bytes > self.max_chunk_bytes):
+                    yield chunk
+                    chunk, chunk_bytes = [], 0
+                chunk.append(item)
+                chunk_bytes += item_bytes
+        if chunk:
+            yield chunk
+
+    def _backoff(self, attempt: int) -> float:
+        "Exponential backoff delay for the given retry attempt"
+        return min(self.max_backoff, self.initial_backoff * (2 ** attempt))
+
+    def _record_failure(self, report: BulkReport, item: BulkItem, status: Any, error: Any) -> None:
+        "Count a failed item and keep its reason, up to the report limit"
+        report.failed += 1
+        if len(report.failures) < self.max_failures_reported:
+            action = next(iter(json.loads(item[0]).values()))
+            report.failures.append({"_id": action.get("_id"), "status": status, "error": error})
+
+    @staticmethod
+    def _record_stages(items: List[BulkItem], seconds: float) -> None:
+        "Split the time of one bulk request between the index and delete stages by item count"
+        deletes = sum(1 for header, _ in items if header.startswith(b'{"delete"'))
+        if deletes:
+            metrics.record_stage("delete", seconds * deletes / len(items), deletes)
+        if deletes < len(items):
+            metrics.record_stage("index", seconds * (len(items) - deletes) / len(items), len(items) - deletes)
+
+    async def _send_with_retries(self, chunk: List[BulkItem], report: BulkReport) -> None:
+        "Send a chunk, retrying rejected items until they succeed or retries run out"
+        report.chunks += 1
+        pending = chunk
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            body = [line for item in pending for line in item if line]
+            report.bytes_sent += sum(len(line) for line in body)
+            sent = time.perf_counter()
+            try:
+                # Retries are handled here with backoff, not by the transport
+                response = await self.client.options(
+                    request_timeout=settings.ELASTICSEARCH_BULK_TIMEOUT,
+                    max_retries=0
+                ).bulk(operations=body)
+            except (ApiError, TransportError) as e:
+                self._record_stages(pending, time.perf_counter() - sent)
+                # Connection errors and timeouts have no status and are always worth retrying
+                status = e.status_code if isinstance(e, ApiError) else type(e).__name__
+                retryable = isinstance(e, TransportError) or status in RETRYABLE_STATUSES
+                if retryable and not last_attempt:
+                    logger.warning(f"Bulk request failed ({status}), retrying {len(pending)} items: {e}")
+                    report.retried += len(pending)
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+                for item in pending:
+                    self._record_failure(report, item, status, str(e))
+                return
+
+            self._record_stages(pending, time.perf_counter() - sent)
+            retry: List[BulkItem] = []
+            for item, result in zip(pending, response['items']):
+                op_type, outcome = next(iter(result.items()))
+                status = outcome.get('status', 500)
+                if op_type == 'delete' and (status < 300 or status == 404):
+                    # Deleting a document that is already gone is not a failure
+                    report.deleted += 1
+                elif status < 300:
+                    report.indexed += 1
+                elif status == 429 and not last_attempt:
+                    retry.append(item)
+                else:
+                    self._record_failure(report, item, status, outcome.get('error'))
+            if not retry:
+                return
+            report.retried += len(retry)
+            logger.warning(f"Retrying {len(retry)} rejected bulk items (attempt {attempt + 1})")
+            await asyncio.sleep(self._backoff(attempt))
+            pending = retry
@@ -3,68 +3,216 @@ import json
 import os
 from datetime import datetime
 import logging
-from typing import Optional
+from itertools import islice
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Tuple
+
+from ..config.settings import settings
+from .date_parsing import parse_date, parse_dates
+from .document_identity import content_hash, document_id
 
 logger = logging.getLogger(__name__)
 
 class CSVConverterService:
     """Service for converting csv to json"""
+
+    def parse_date(self, date_str: str) -> str:
+        "Parse a CreateDate value to a UTC ISO timestamp, falling back to the current time"
+        if date_str:
+            parsed = parse_date(date_str)
+            if parsed is not None:
+                return parsed
+            logger.warning(f"Could not parse date: {date_str}, using current time")
+        return datetime.now().isoformat()
+
+    def _row_to_record(self, row: Dict[str, str], created_at: str) -> Optional[Dict[str, Any]]:
+        "Build a document record from a csv row and its already parsed date"
+        text = row.get('text', '')
+        if not text:
+            return None
+        raw_date = row.get('CreateDate', '')
+        is_antisemitic = row.get('Antisemitic', '0') in ['1', 'true', 'yes']
+        return {
+            # Ids and hashes use the raw date, a missing date parses to the current time
+            "id": document_id(row.get('TweetID'), text, raw_date),
+            "text": text,
+            "is_antisemitic": is_antisemitic,
+            "created_at": created_at,
+            "content_hash": content_hash(text, is_antisemitic, raw_date)
+        }
+
+    def row_to_record(self, row: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        "Convert a csv row to a document record, skipping rows without text"
+        if not row.get('text', ''):
+            return None
+        return self._row_to_record(row, self.parse_date(row.get('CreateDate', '')))
+
+    def rows_to_records(self, rows: List[Dict[str, str]]) -> List[Optional[Dict[str, Any]]]:
+        """Convert a chunk of csv rows to document records, parsing the dates column-wise.
+
+        Matches row_to_record row for row, with None for rows without text.
+        """
+        raw_dates = [row.get('CreateDate') or '' for row in rows]
+        parsed = parse_dates(raw_dates)
+        now = None
+        records = []
+        for row, raw_date, created_at in zip(rows, raw_dates, parsed):
+            if created_at is None:
+                if raw_date and row.get('text'):
+                    logger.warning(f"Could not parse date: {raw_date}, using current time")
+                now = now or datetime.now().isoformat()
+                created_at = now
+            records.append(self._row_to_record(row, created_at))
+        return records
+
+    def iter_records(self, csv_path: str) -> Iterator[Dict[str, Any]]:
+        "Yield document records from a csv file, parsed a chunk of rows at a time"
+        for record, _ in self.iter_records_with_offsets(csv_path):
+            yield record
+
+    def _iter_lines(self, f, position: List[int], end_offset: Optional[int] = None) -> Iterator[str]:
+        "Decode lines from a binary file, advancing position[0] to the end of each line read, up to end_offset"
+        while end_offset is None or position[0] < end_offset:
+            raw = f.readline()
+            if not raw:
+                return
+            position[0] += len(raw)
+            # Match text mode reads, which translate CRLF inside quoted fields too
+            yield raw.decode('utf-8').replace('\r\n', '\n')
+
+    def iter_rows_with_offsets(self, csv_path: str, start_offset: int = 0,
+                               end_offset: Optional[int] = None) -> Iterator[Tuple[Dict[str, str], int]]:
+        """Yield csv rows with the byte offset just past each row.
+
+        start_offset and end_offset must be row boundaries, such as offsets yielded by
+        an earlier run or by shard_ranges. The csv reader pulls only the lines it needs
+        to complete a row, so quoted fields spanning several lines are consumed whole
+        before the offset is reported.
+        """
+        with open(csv_path, "rb") as f:
+            position = [0]
+            header = next(csv.reader(self._iter_lines(f, position)), None)
+            if header is None:
+                return
+            if start_offset > position[0]:
+                f.seek(start_offset)
+                position[0] = start_offset
+            for row in csv.DictReader(self._iter_lines(f, position, end_offset), fieldnames=header):
+                yield row, position[0]
+
+    def shard_ranges(self, csv_path: str, start_offset: int = 0,
+                     shard_bytes: int = 4 * 1024 * 1024) -> List[Tuple[int, int]]:
+        """Split a csv file into byte ranges of whole rows, about shard_bytes each.
+
+        A newline ends a row only outside quoted fields, that is after an even number
+        of quote characters (escaped quotes come in pairs), so multiline tweets are
+        never cut. Ranges cover the file from start_offset, or from after the header.
+        """
+        size = os.path.getsize(csv_path)
+        with open(csv_path, "rb") as f:
+            position = [0]
+            if next(csv.reader(self._iter_lines(f, position)), None) is None:
+                return []
+            start = max(start_offset, position[0])
+            f.seek(start)
+            ranges = []
+            range_start = block_start = start
+            target = start + shard_bytes
+            # Both start and every cut are row boundaries, outside any quotes
+            in_quotes = False
+            for block in iter(lambda: f.read(1 << 20), b""):
+                scan = 0
+                while target < block_start + len(block):
+                    skip_to = max(target - block_start, scan)
+                    in_quotes ^= bool(block.count(b'"', scan, skip_to) & 1)
+                    scan = skip_to
+                    newline = block.find(b"\n", scan)
+                    while newline >= 0:
+                        in_quotes ^= bool(block.count(b'"', scan, newline) & 1)
+                        scan = newline + 1
+                        if not in_quotes:
+                            break
+                        newline = block.find(b"\n", scan)
+                    if newline < 0:
+                        # The row goes on into the next block
+                        break
+                    cut = block_start + scan
+                    if cut < size:
+                        ranges.append((range_start, cut))
+                        range_start = cut
+                    target = cut + shard_bytes
+                in_quotes ^= bool(block.count(b'"', scan) & 1)
+                block_start += len(block)
+            if range_start < size:
+                ranges.append((range_start, size))
+            return ranges
+
+    def iter_records_with_offsets(self, csv_path: str, start_offset: int = 0,
+                                  chunk_size: Optional[int] = None,
+                                  end_offset: Optional[int] = None) -> Iterator[Tuple[Dict[str, Any], int]]:
+        "Yield document records from a csv file (up to end_offset) with the byte offset just past each row"
+        chunk_size = chunk_size or settings.CSV_CHUNK_SIZE
+        rows = self.iter_rows_with_offsets(csv_path, start_offset, end_offset)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            records = self.rows_to_records([row for row, _ in chunk])
+            for record, (_, offset) in zip(records, chunk):
+                if record is not None:
+                    yield record, offset
+
+    def iter_ndjson_with_offsets(self, ndjson_path: str, start_offset: int = 0) -> Iterator[Tuple[Dict[str, Any], int]]:
+        "Yield records from a newline delimited json file with the byte offset just past each line"
+        with open(ndjson_path, "rb") as f:
+            f.seek(start_offset)
+            position = [start_offset]
+            for line in self._iter_lines(f, position):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line), position[0]
+                except json.JSONDecodeError as e:
+                    logger.error(f"Skipping invalid json at byte {position[0]} of {ndjson_path}: {e}")
+
+    def iter_ndjson_records(self, ndjson_path: str) -> Iterator[Dict[str, Any]]:
+        "Yield document records from a newline delimited json file"
+        with open(ndjson_path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    logger.error(f"Skipping invalid json on line {line_number} of {ndjson_path}: {e}")
+
+    def export_json(self, records: Iterable[Dict[str, Any]], json_path: str) -> Iterator[Dict[str, Any]]:
+        "Pass records through while writing them to a json array file as a side output"
+        count = 0
+        with open(json_path, "w", encoding="utf-8") as f:
+            f.write("[")
+            for record in records:
+                f.write(",\n" if count else "\n")
+                f.write(json.dumps(record, ensure_ascii=False))
+                count += 1
+                yield record
+            f.write("\n]\n")
+        logger.info(f"Exported {count} records to {json_path}.")
+
     def convert_csv_to_json(self, csv_path: str, json_path: Optional[str] = None) -> str:
         "Converts csv files to json format"
         if json_path is None:
             json_path = os.path.splitext(csv_path)[0] + ".json"
-            
+
         try:
-            documents = []
-            
-            # Read the csv file
-            with open(csv_path, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    # Parse the date string to ISO format
-                    date_str = row.get('CreateDate', '')
-                    try:
-                        if date_str:
-                            # Handle different date formats
-                            if '+00:00' in date_str:
-                                # Format: "2020-02-15 17:57:21+00:00"
-                                date_str_clean = date_str.split('+')[0].strip()
-                                parsed_date = datetime.strptime(date_str_clean, "%Y-%m-%d %H:%M:%S")
-                            elif 'Mon Jan' in date_str or 'Sat Jan' in date_str:
-                                # Format: "Mon Jan 04 10:16:31 -0500 2021"
-                                try:
-                                    parsed_date = datetime.strptime(date_str, "%a %b %d %H:%M:%S %z %Y")
-                                except ValueError:
-                                    # Try without timezone
-                                    date_str_clean = date_str.split(' -')[0] + ' ' + date_str.split(' ')[-1]
-                                    parsed_date = datetime.strptime(date_str_clean, "%a %b %d %H:%M:%S %Y")
-                            else:
-                                # Try standard format
-                                parsed_date = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
-                            
-                            iso_date = parsed_date.isoformat()
-                        else:
-                            iso_date = datetime.now().isoformat()
-                    except ValueError as e:
-                        logger.warning(f"Could not parse date: {date_str}, using current time. Error: {e}")
-                        iso_date = datetime.now().isoformat()
-                    
-                    doc = {
-                        "text": row.get('text', ''),
-                        "is_antisemitic": row.get('Antisemitic', '0') in ['1', 'true', 'yes'],
-                        "created_at": iso_date
-                    }
-                    if doc['text']:
-                        documents.append(doc)
-            
-            # Create a json file with the name of the csv and load the data to it
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(documents, f, indent=2, ensure_ascii=False)
-                
-            logger.info(f"Converted {len(documents)} records from {csv_path} to {json_path}.")
+            # Stream rows straight to the output file instead of holding them in memory
+            for _ in self.export_json(self.iter_records(csv_path), json_path):
+                pass
+
+            logger.info(f"Converted {csv_path} to {json_path}.")
             return json_path
-            
+
         except Exception as e:
             logger.error(f"Error converting from csv: {e}")
             raise
-        
\ No newline at end of file
@@ -1,15 +1,29 @@
 import json
 import os
-from typing import List, Dict, Any
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, AsyncIterator, Iterator, Tuple
 from datetime import datetime
+from itertools import islice
 import logging
-import aiofiles
+import asyncio
+import multiprocessing
+import time
 
 from ..models.document import MaliciousDocument
 from .elasticsearch_service import ElasticSearchService
 from .csv_converter_service import CSVConverterService
 from .sentiment import SentimentService
 from .weapons import WeaponsService
+from .enrichment import EnrichmentService
+from .document_batch import DocumentBatch, RenderedBatch
+from .document_identity import content_hash, document_id
+from .ingest_checkpoint import IngestCheckpoint
+from .bulk_indexer import BulkReport
+from .job_runner import IngestProgress, Job, JobRunner
+from .response_cache import ResponseCache
+from . import metrics
+from . import sharded_ingest
 from ..config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -17,197 +31,454 @@ logger = logging.getLogger(__name__)
 class DataProcessingService:
     """Service for processing malicious text data"""
     
-    def __init__(self):
-        "Initialize data processing service"
-        self.es_service = ElasticSearchService()
-        self.sentiment_service = SentimentService()
-        self.weapon_service = WeaponsService()
+    def __init__(self, es_service: Optional[ElasticSearchService] = None,
+                 sentiment_service: Optional[SentimentService] = None,
+                 weapons_service: Optional[WeaponsService] = None,
+                 job_runner: Optional[JobRunner] = None,
+                 response_cache: Optional[ResponseCache] = None):
+        "Initialize data processing service, reusing shared services when provided"
+        self.es_service = es_service if es_service is not None else ElasticSearchService()
+        self.sentiment_service = sentiment_service if sentiment_service is not None else SentimentService()
+        self.weapon_service = weapons_service if weapons_service is not None else WeaponsService()
         self.csv_converter = CSVConverterService()
+        self.enrichment_service = EnrichmentService(self.sentiment_service, self.weapon_service, self.es_service)
+        # Running jobs answer status checks without querying the index
+        self.job_runner = job_runner
+        self._status_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        # Cached read responses are invalidated whenever the indexed data changes
+        self.response_cache = response_cache
         
-    async def load_data_from_file(self, file_path = None) -> List[MaliciousDocument]:
-        "Load data from CSV or JSON file and convert to MaliciousDocument objects"
+    def _track_offsets(self, records: Iterator[Tuple[Dict[str, Any], int]],
+                       position: Dict[str, int]) -> Iterator[Dict[str, Any]]:
+        "Strip offsets from (record, offset) pairs, keeping the last one in position['offset']"
+        for record, offset in records:
+            position['offset'] = offset
+            yield record
+            
+    def iter_records(self, file_path: Optional[str] = None, start_offset: int = 0,
+                     position: Optional[Dict[str, int]] = None) -> Iterator[Dict[str, Any]]:
+        """Yield normalized records from a CSV, NDJSON or JSON file without loading it all into memory.
+
+        CSV and NDJSON files can be read from a byte offset, and position['offset']
+        follows the end of the last record read so a later run can resume there.
+        """
         if file_path is None:
             file_path = settings.DATA_FILE_PATH
+        if position is None:
+            position = {}
+        position['offset'] = start_offset
+            
+        # Check file extension to determine format
+        file_extension = os.path.splitext(file_path)[1].lower()
+        
+        if file_extension == '.csv':
+            records = self._track_offsets(self.csv_converter.iter_records_with_offsets(file_path, start_offset), position)
+        elif file_extension in ('.ndjson', '.jsonl'):
+            records = self._track_offsets(self.csv_converter.iter_ndjson_with_offsets(file_path, start_offset), position)
+        elif file_extension == '.json':
+            if start_offset:
+                raise ValueError("A .json array file cannot be resumed from an offset")
+            # A json array can only be parsed whole, prefer csv or ndjson for large inputs
+            with open(file_path, 'r', encoding='utf-8') as f:
+                records = iter(json.load(f))
+        else:
+            raise ValueError(f"Unsupported file format: {file_extension}. Supported formats: .csv, .ndjson, .jsonl, .json")
+        
+        if settings.JSON_EXPORT_PATH and file_extension != '.json':
+            # Optional side output, written while records stream through
+            records = self.csv_converter.export_json(records, settings.JSON_EXPORT_PATH)
+            
+        # The csv reader already parsed every date to UTC ISO, other formats are checked here
+        parsed_dates = file_extension == '.csv'
+        normalize = lambda item: self._try_normalize(item, parsed_dates)
+        for record in metrics.timed_map("convert", normalize, metrics.timed_iter("load", records)):
+            if record is not None:
+                yield record
             
+    @staticmethod
+    def _try_normalize(item: Dict[str, Any], parsed_dates: bool = False) -> Optional[Dict[str, Any]]:
+        "Normalize a raw record, or log and skip it when it cannot be normalized"
         try:
-            # Check file extension to determine format
-            file_extension = os.path.splitext(file_path)[1].lower()
-            
-            if file_extension == '.csv':
-                # Convert CSV to JSON first
-                logger.info(f"Converting CSV file {file_path} to JSON...")
-                json_file_path = self.csv_converter.convert_csv_to_json(file_path)
-                data_file_path = json_file_path
-            elif file_extension == '.json':
-                data_file_path = file_path
-            else:
-                logger.error(f"Unsupported file format: {file_extension}. Supported formats: .csv, .json")
-                return []
-            # Load JSON data asynchronously
-            async with aiofiles.open(data_file_path, 'r', encoding='utf-8') as f:
-                file_content = await f.read()
-                data = json.loads(file_content)
-                
+            return DataProcessingService._normalize_record(item, parsed_dates)
+        except Exception as e:
+            logger.warning(f"Skipping record that could not be normalized: {e}")
+            return None
+            
+    @staticmethod
+    def _normalize_record(item: Dict[str, Any], parsed_dates: bool = False) -> Dict[str, Any]:
+        "Normalize a raw record to the indexed document fields"
+        date_str = item.get('created_at', '')
+        text = item.get('text', '')
+        is_antisemitic = bool(item.get('is_antisemitic', False))
+        # Derive ids from the date as given, before a missing date becomes the current time
+        doc_id = item.get('id') or document_id(item.get('TweetID'), text, date_str)
+        doc_hash = item.get('content_hash') or content_hash(text, is_antisemitic, date_str)
+        try:
+            if not date_str:
+                date_str = datetime.now().isoformat()
+            elif not parsed_dates:
+                # Validate ISO format dates
+                datetime.fromisoformat(date_str)
+        except (TypeError, ValueError):
+            logger.warning(f"Could not parse date: {date_str}, using current time")
+            date_str = datetime.now().isoformat()
+            
+        return {
+            "id": str(doc_id),
+            "text": text,
+            "is_antisemitic": is_antisemitic,
+            "created_at": date_str,
+            "content_hash": doc_hash
+        }
+        
+    async def load_data_from_file(self, file_path = None) -> List[MaliciousDocument]:
+        "Load data from CSV or JSON file and convert to MaliciousDocument objects"
+        try:
+            records = self.iter_records(file_path)
             documents = []
-            for item in data:
-                try:
-                    # Parse the data
-                    text = item.get('text', '')
-                    
-                    # Handle date parsing
-                    date_str = item.get('created_at', '')
+            while True:
+                # Read and parse the next batch off the event loop
+                batch = await asyncio.to_thread(list, islice(records, settings.ENRICHMENT_BATCH_SIZE))
+                if not batch:
+                    break
+                for item in batch:
                     try:
-                        if date_str:
-                            # Handle ISO format dates
-                            created_at = datetime.fromisoformat(date_str)
-                        else:
-                            created_at = datetime.now()
-                    except ValueError:
-                        logger.warning(f"Could not parse date: {date_str}, using current time")
-                        created_at = datetime.now()
-                    
-                    doc = MaliciousDocument(
-                        text=text,
-                        is_antisemitic=item.get('is_antisemitic', False),
-                        created_at=created_at,
-                        sentiment=self.sentiment_service.analyze_sentiment(text)
-                    )
-                    documents.append(doc)
-                except Exception as e:
-                    logger.error(f"Error parsing document: {e}")
-                    continue
+                        documents.append(MaliciousDocument(**item))
+                    except Exception as e:
+                        logger.error(f"Error parsing document: {e}")
+                        continue
                 
-            logger.info(f"Loaded {len(documents)} documents from {file_path}")
+            logger.info(f"Loaded {len(documents)} documents from {file_path or settings.DATA_FILE_PATH}")
             return documents
                     
         except FileNotFoundError:
-            logger.error(f"Data file not found: {file_path}")
+            logger.error(f"Data file not found: {file_path or settings.DATA_FILE_PATH}")
             return []
         except Exception as e:
             logger.error(f"Error loading data from file: {e}")
             return []
             
-    async def process_all_documents(self) -> Dict[str, Any]:
-        "Complete processing pipeline for all documents"
-        try:
-            # Create index
-            logger.info("Creating ElasticSearch index...")
-            await self.es_service.create_index()
-            
-            # Load the data file
-            logger.info("Loading data from file...")
-            documents = await self.load_data_from_file()
-            if not documents:
-                return {"status": "error", "message": "No documents loaded"}
+    async def _skip_unchanged(self, batch: DocumentBatch, stats: Dict[str, int]) -> Tuple[DocumentBatch, set]:
+        "Drop rows already indexed with the same content and enrichment version"
+        existing = await self.es_service.get_document_versions(list(dict.fromkeys(batch.ids)))
+        version = self.enrichment_service.version
+        changed = []
+        for row, (doc_id, doc_hash) in enumerate(zip(batch.ids, batch.content_hashes)):
+            indexed = existing.get(doc_id)
+            if (indexed is not None and indexed.get('content_hash') == doc_hash
+                    and indexed.get('enrichment_version') == version):
+                stats["unchanged"] += 1
+            else:
+                changed.append(row)
+        return batch.select(changed), set(existing)
             
-            # Index documents
-            logger.info("Indexing documents to ElasticSearch...")
-            success = await self.es_service.bulk_index_documents(doucments=documents)
-            if not success:
-                return {"status": "error", "message": "Failed to index documents"}
+    async def _enrich_records(self, records: Iterator[Dict[str, Any]], stats: Dict[str, int],
+                              incremental: bool = False) -> AsyncIterator[DocumentBatch]:
+        """Enrich streamed records in columnar batches, yielding only the relevant rows.
+
+        In incremental mode rows already indexed unchanged are skipped, and indexed
+        rows that changed into irrelevant ones are kept flagged as deletes.
+        """
+        batch_size = settings.ENRICHMENT_BATCH_SIZE
+        weapon_table = self.weapon_service.weapon_table
+        while True:
+            # Read and parse the next batch off the event loop
+            batch = DocumentBatch.from_records(
+                await asyncio.to_thread(list, islice(records, batch_size)), weapon_table
+            )
+            if not batch:
+                break
+            stats["loaded"] += len(batch)
+            indexed_ids: set = set()
+            if incremental:
+                batch, indexed_ids = await self._skip_unchanged(batch, stats)
+            await self.enrichment_service.enrich_documents(batch)
+            kept = []
+            for row, relevant in enumerate(self.enrichment_service.relevant_rows(batch)):
+                if relevant:
+                    kept.append(row)
+                    continue
+                stats["dropped"] += 1
+                if batch.ids[row] in indexed_ids:
+                    batch.deletes[row] = 1
+                    kept.append(row)
+            if kept:
+                yield batch.select(kept)
+            # Let other requests run between CPU-bound batches
+            await asyncio.sleep(0)
             
-            # Wait a moment for indexing to complete
-            import asyncio
-            await asyncio.sleep(2)
+    def _use_shards(self, file_path: str, incremental: bool) -> bool:
+        "Whether a run can parse and enrich the data file in worker processes"
+        if settings.INGEST_WORKERS <= 0:
+            return False
+        reason = None
+        if incremental:
+            reason = "incremental runs check rows against the live index"
+        elif os.path.splitext(file_path)[1].lower() != '.csv':
+            reason = "only csv files are split into byte ranges"
+        elif settings.JSON_EXPORT_PATH:
+            reason = "the json export is written in file order by one process"
+        elif self.enrichment_service.tokenizer != "local":
+            reason = "workers tokenize with the local tokenizer only"
+        if reason:
+            logger.info(f"Using the single-process pipeline, {reason}")
+            return False
+        return True
             
-            # Perform sentiment analysis on all documents
-            logger.info("Performing sentiment analysis...")
-            all_docs = await self.es_service.get_all_documents()
-            logger.info(f"Processing sentiment for {len(all_docs)} documents...")
+    async def _enrich_shards(self, file_path: str, index_name: str, stats: Dict[str, int],
+                             position: Dict[str, int]) -> AsyncIterator[RenderedBatch]:
+        """Parse, enrich and render byte ranges of a csv in worker processes.
+
+        The file is cut at row boundaries into ranges of about INGEST_SHARD_BYTES,
+        small enough to give every worker several. At most two ranges per worker are
+        in flight, and results are yielded in file order so the bulk writer sees rows
+        in the same order as the single-process pipeline.
+        """
+        workers = settings.INGEST_WORKERS
+        position['offset'] = 0
+        size = os.path.getsize(file_path)
+        shard_bytes = max(1, min(settings.INGEST_SHARD_BYTES, -(-size // (workers * 4))))
+        ranges = await asyncio.to_thread(self.csv_converter.shard_ranges, file_path, 0, shard_bytes)
+        logger.info(f"Ingesting {file_path} as {len(ranges)} ranges on {workers} worker processes")
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=sharded_ingest.init_worker,
+            initargs=(settings.ENRICHMENT_CACHE_PATH, settings.ENRICHMENT_CACHE_SIZE)
+        )
+        loop = asyncio.get_running_loop()
+        pending: deque = deque()
+        shards = iter(ranges)
+        try:
+            while True:
+                while len(pending) < workers * 2:
+                    shard = next(shards, None)
+                    if shard is None:
+                        break
+                    pending.append(loop.run_in_executor(
+                        pool, sharded_ingest.process_shard,
+                        file_path, shard[0], shard[1], index_name, settings.ENRICHMENT_BATCH_SIZE
+                    ))
+                if not pending:
+                    break
+                result = await pending.popleft()
+                stats["loaded"] += result["loaded"]
+                stats["dropped"] += result["dropped"]
+                position['offset'] = result["end"]
+                for stage, (seconds, items) in result["stages"].items():
+                    metrics.record_stage(stage, seconds, items)
+                yield RenderedBatch(index_name, result["items"])
+        finally:
+            for future in pending:
+                future.cancel()
+            # Workers finish their current range and exit, without blocking the event loop
+            pool.shutdown(wait=False, cancel_futures=True)
             
-            for doc_data in all_docs:
-                try:
-                    doc_id = doc_data.get('_id')
-                    text = doc_data.get('text', '')
-                    if text and doc_id:
-                        sentiment = self.sentiment_service.analyze_sentiment(text)
-                        await self.es_service.update_document_sentiment(doc_id, sentiment)
-                except Exception as e:
-                    logger.error(f"Error updating sentiment for document {doc_id}: {e}")
-                    continue
+    async def process_all_documents(self, incremental: bool = False,
+                                    progress: Optional[IngestProgress] = None) -> Dict[str, Any]:
+        """Complete processing pipeline for all documents.
+
+        A full run loads a new versioned index with refreshes and replicas off, then
+        restores them, force-merges and swaps the read alias over in one step, so
+        readers never see a partially processed index. Documents get deterministic ids.
+        With incremental, documents are written to the live index instead: reading
+        resumes after the last checkpointed row when the file was only appended to,
+        and rows already indexed unchanged are not re-enriched.
+        With INGEST_WORKERS set, full runs of a csv are parsed and enriched in that
+        many worker processes.
+        Live counters are shared with progress when given, for background job tracking.
+        """
+        if progress is None:
+            progress = IngestProgress()
+        self.invalidate_status()
+        target = None
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            file_path = settings.DATA_FILE_PATH
+            checkpoint_path = settings.INGEST_CHECKPOINT_PATH
             
-            # Wait a moment for sentiment updates to complete
-            await asyncio.sleep(2)
+            progress.phase = "creating_index"
+            live_indices = await self.es_service.get_live_indices() if incremental else []
+            if incremental and len(live_indices) == 1:
+                # Write through the alias into the index readers already see
+                build_index = None
+                checkpoint_index = live_indices[0]
+            else:
+                if incremental:
+                    logger.info("No single live index to update, building a new index instead")
+                    incremental = False
+                logger.info("Creating ElasticSearch index...")
+                build_index = target = await self.es_service.create_versioned_index()
+                checkpoint_index = build_index
             
-            # Detect weapons in all documents
-            logger.info("Detecting weapons keywords...")
-            all_docs = await self.es_service.get_all_documents()
-            logger.info(f"Processing weapons for {len(all_docs)} documents...")
+            progress.live = build_index is None
             
-            for doc_data in all_docs:
-                try:
-                    doc_id = doc_data.get('_id')
-                    text = doc_data.get('text', '')
-                    if text and doc_id:
-                        # Use ES-backed detection via WeaponsService for single ownership
-                        weapons = await self.weapon_service.detect_weapons_via_es(self.es_service, text)
-                        await self.es_service.update_document_weapons(doc_id, weapons)
-                except Exception as e:
-                    logger.error(f"Error updating weapons for document {doc_id}: {e}")
-                    continue
+            start_offset = 0
+            if incremental and checkpoint_path:
+                checkpoint = IngestCheckpoint.load(checkpoint_path)
+                if checkpoint is not None:
+                    # Hashing the ingested prefix reads it, keep that off the event loop
+                    start_offset = await asyncio.to_thread(
+                        checkpoint.resume_offset, file_path, checkpoint_index, self.enrichment_service.version
+                    )
+                    logger.info(f"Resuming {file_path} from byte {start_offset}")
+            
+            # Stream records from the data file through enrichment into the bulk writer
+            logger.info(f"Loading, enriching and indexing documents from {file_path}...")
+            stats = {"loaded": 0, "dropped": 0, "unchanged": 0}
+            position: Dict[str, int] = {}
+            report = BulkReport()
+            progress.stats, progress.position, progress.report = stats, position, report
+            progress.bytes_start = start_offset
+            progress.bytes_total = os.path.getsize(file_path)
+            progress.phase = "indexing"
+            if self._use_shards(file_path, incremental):
+                documents = self._enrich_shards(file_path, build_index, stats, position)
+            else:
+                records = self.iter_records(file_path, start_offset, position)
+                documents = self._enrich_records(records, stats, incremental)
+            await self.es_service.bulk_index(documents, report, build_index)
+            initial_count = stats["loaded"]
+            deleted_count = stats["dropped"]
+            if initial_count == 0 and not start_offset:
+                return {"status": "error", "message": "No documents loaded"}
+            logger.info(f"Dropped {deleted_count} irrelevant documents before indexing")
+            if not report.success:
+                logger.error(f"Bulk indexing errors: {report.failures}")
+                return {
+                    "status": "error",
+                    "message": f"Failed to index {report.failed} documents",
+                    "bulk": report.to_dict()
+                }
             
-            # Wait a moment for weapon updates to complete
-            await asyncio.sleep(2)
+            if build_index is not None:
+                progress.phase = "finalizing"
+                await self.es_service.finalize_index(build_index)
+                progress.phase = "swapping_alias"
+                await self.es_service.swap_alias(build_index)
+                target = None
+                await self.es_service.delete_old_indices()
+            else:
+                progress.phase = "refreshing"
+                await self.es_service.refresh_index()
+            self.invalidate_status()
             
-            # Delete irrelevant documents
-            logger.info("Deleting irrelevant documents...")
-            deleted_count = await self.es_service.delete_irrelevant_documents()
+            if checkpoint_path and os.path.splitext(file_path)[1].lower() != '.json':
+                # Only advance the checkpoint once everything read so far is indexed
+                checkpoint = await asyncio.to_thread(
+                    IngestCheckpoint.create, file_path, checkpoint_index, position['offset'], initial_count,
+                    self.enrichment_service.version
+                )
+                checkpoint.save(checkpoint_path)
             
             # Get final statistics
             final_count = await self.es_service.get_document_count()
             
-            logger.info(f"Processing completed. Initial: {len(documents)}, Final: {final_count}, Deleted: {deleted_count}")
+            logger.info(f"Processing completed. Initial: {initial_count}, Final: {final_count}, Deleted: {deleted_count}")
+            outcome = "success"
             
             return {
                 "status": "success",
                 "message": "Processing completed successfully",
-                "initial_count": len(documents),
+                "index": checkpoint_index,
+                "incremental": incremental,
+                "start_offset": start_offset,
+                "initial_count": initial_count,
+                "unchanged_count": stats["unchanged"],
                 "deleted_count": deleted_count,
-                "final_count": final_count
+                "final_count": final_count,
+                "bulk": report.to_dict(),
+                "cache": self.enrichment_service.cache_stats()
             }
             
         except Exception as e:
             logger.error(f"Error in processing pipeline: {e}")
             return {"status": "error", "message": str(e)}
+        finally:
+            mode = "incremental" if incremental else "full"
+            metrics.INGEST_RUNS.inc(mode=mode, status=outcome)
+            metrics.INGEST_DURATION.observe(time.perf_counter() - started, mode=mode)
+            # A failed incremental run may still have written to the live index
+            self.invalidate_status()
+            if target is not None:
+                # The new index never went live, readers keep the previous one
+                logger.info(f"Discarding unfinished index {target}")
+                try:
+                    await asyncio.shield(self.es_service.delete_index(target))
+                except Exception as e:
+                    logger.error(f"Could not delete unfinished index {target}: {e}")
+        
+    def invalidate_status(self) -> None:
+        "Drop the cached processing status and start a new response cache generation"
+        self._status_cache = None
+        if self.response_cache is not None:
+            self.response_cache.bump_generation()
+        
+    @staticmethod
+    def _with_rebuild(status: Dict[str, Any], job: Optional[Job]) -> Dict[str, Any]:
+        "Mention a job building a new index behind the alias in the status of the live index"
+        if job is not None:
+            status["message"] += f"; job {job.job_id} is {job.status}, building a new index"
+            status["job_id"] = job.job_id
+        return status
         
     async def get_processing_status(self) -> Dict[str, Any]:
-        "Get current processing status"
+        """Get current processing status.
+
+        A running incremental job writing into the live index answers from its live
+        counters. Otherwise the status describes the index behind the alias, from a
+        single aggregation counting enriched documents, cached for STATUS_CACHE_TTL
+        seconds since the query endpoints check status before every read. A full
+        rebuild builds a hidden index, so it only adds its job id to that status.
+        """
         try:
-            total_count = await self.es_service.get_document_count()
+            job = None
+            if self.job_runner is not None:
+                job = self.job_runner.active_job(self.es_service.index_name)
+                if job is not None and job.progress.live:
+                    info = job.to_info()
+                    return {
+                        "status": "in_progress",
+                        "message": f"Processing job {job.job_id} is {job.status}",
+                        "total_count": info.stages["read"].count,
+                        "processed_count": info.stages["indexed"].count,
+                        "job_id": job.job_id
+                    }
+            
+            now = time.monotonic()
+            if self._status_cache is not None and self._status_cache[0] > now:
+                return self._with_rebuild(dict(self._status_cache[1]), job)
+            
+            counts = await self.es_service.get_processing_counts()
+            total_count = counts["total_count"]
+            processed_count = counts["processed_count"]
             
             if total_count == 0:
-                return {
+                status = {
                     "status": "not_processed",
                     "message": "No documents have been processed yet",
                     "total_count": 0
                 }
-            
-            # Check if processing is complete by looking for documents with sentiment and weapons
-            all_docs = await self.es_service.get_all_documents()
-            processed_count = 0
-            
-            for doc in all_docs:
-                # Check if document has both sentiment and weapons fields populated
-                if (doc.get('sentiment') is not None and 
-                    doc.get('detected_weapons') is not None and
-                    doc.get('weapon_count') is not None):
-                    processed_count += 1
-            
-            if processed_count == total_count:
-                return {
+            elif processed_count == total_count:
+                status = {
                     "status": "completed",
                     "message": "All documents have been processed",
                     "total_count": total_count,
                     "processed_count": processed_count
                 }
             else:
-                return {
+                status = {
                     "status": "in_progress",
                     "message": f"Processing in progress: {processed_count}/{total_count} documents processed",
                     "total_count": total_count,
                     "processed_count": processed_count
                 }
+            
+            if settings.STATUS_CACHE_TTL > 0:
+                self._status_cache = (now + settings.STATUS_CACHE_TTL, status)
+            return self._with_rebuild(dict(status), job)
                 
         except Exception as e:
             logger.error(f"Error getting processing status: {e}")
-            return {"status": "error", "message": str(e)}
\ No newline at end of file
+            return {"status": "error", "message": str(e)}
@@ -0,0 +1,66 @@
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever parsing changes the created_at stored for a raw date, so that
+# incremental ingests re-index rows parsed the old way. 2: offsets converted to UTC
+DATE_PARSING_VERSION = "2"
+
+# CreateDate formats seen in the data, most common first. Offsets are converted to
+# UTC, values without one are taken as UTC already.
+DATE_FORMATS = (
+    "%Y-%m-%d %H:%M:%S%z",        # 2020-02-15 17:57:21+00:00
+    "%Y-%m-%d %H:%M:%S",          # 2020-02-15 17:57:21
+    "%a %b %d %H:%M:%S %z %Y",    # Mon Jan 04 10:16:31 -0500 2021
+    "%Y-%m-%dT%H:%M:%S%z",        # 2020-02-15T17:57:21+00:00
+    "%Y-%m-%dT%H:%M:%S",          # 2020-02-15T17:57:21
+)
+
+def parse_date(value: str) -> Optional[str]:
+    "Parse one date string to a UTC ISO timestamp, or None if no known format matches"
+    value = value.strip()
+    for date_format in DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        # Same rendering as numpy's datetime64[s] below, e.g. 2020-02-15T17:57:21
+        return parsed.isoformat(timespec="seconds")
+    return None
+
+def parse_dates(values: Sequence[str]) -> List[Optional[str]]:
+    """Parse a column of date strings to UTC ISO timestamps in one pass per format.
+
+    Each distinct string is parsed once. The formats are tried in order over every
+    value still unparsed, and values matching none of them come back as None, as
+    with parse_date. pandas is imported here so only ingesting processes load it.
+    """
+    import numpy as np
+    import pandas as pd
+
+    # Tweets from the same second share a string, parse each only once
+    unique = pd.Series(list(dict.fromkeys(value.strip() for value in values)), dtype=object)
+    parsed = pd.Series(pd.NaT, index=unique.index, dtype="datetime64[ns, UTC]")
+    pending = unique.index
+    for date_format in DATE_FORMATS:
+        if pending.empty:
+            break
+        attempt = pd.to_datetime(unique[pending], format=date_format, errors="coerce", utc=True)
+        matched = attempt.notna()
+        parsed[pending[matched]] = attempt[matched]
+        pending = pending[~matched]
+
+    # numpy renders datetime64 as ISO in C, several times faster than strftime
+    seconds = parsed.dt.tz_localize(None).to_numpy().astype("datetime64[s]")
+    rendered = np.datetime_as_string(seconds, unit="s").tolist()
+    lookup: Dict[str, Optional[str]] = {
+        value: (None if text == "NaT" else text) for value, text in zip(unique, rendered)
+    }
+    for value in unique[pending]:
+        # Dates outside the datetime64[ns] range (before 1677, after 2262) only parse one by one
+        lookup[value] = parse_date(value)
+    return [lookup[value.strip()] for value in values]
@@ -0,0 +1,174 @@
+from json.encoder import encode_basestring, encode_basestring_ascii
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+# Sentiment labels by their one-byte code
+SENTIMENT_LABELS = ("neutral", "positive", "negative")
+SENTIMENT_CODES = {label: code for code, label in enumerate(SENTIMENT_LABELS)}
+
+class WeaponTable:
+    """Weapon keywords by id, for packing the weapons of a document into one integer bitset.
+
+    Bit i stands for keyword i, so decoding walks the bits in keyword list order,
+    the order the keyword matcher reports weapons in.
+    """
+
+    __slots__ = ("keywords", "_ids", "_json")
+
+    def __init__(self, keywords: Sequence[str]):
+        "Number the keywords and pre-encode each as a JSON string"
+        self.keywords = tuple(keywords)
+        self._ids: Dict[str, int] = {}
+        for keyword_id, keyword in enumerate(self.keywords):
+            self._ids.setdefault(keyword, keyword_id)
+        self._json = tuple(encode_basestring(keyword) for keyword in self.keywords)
+
+    def mask(self, names: Iterable[str]) -> int:
+        "Bitset of the given weapon names, ignoring names outside the table"
+        mask = 0
+        for name in names:
+            keyword_id = self._ids.get(name)
+            if keyword_id is not None:
+                mask |= 1 << keyword_id
+        return mask
+
+    def _ids_of(self, mask: int) -> Iterable[int]:
+        "Keyword ids set in a bitset, lowest first"
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    def names(self, mask: int) -> List[str]:
+        "Weapon names of a bitset in keyword list order"
+        return [self.keywords[keyword_id] for keyword_id in self._ids_of(mask)]
+
+    def json_array(self, mask: int) -> str:
+        "Weapon names of a bitset as a JSON array"
+        if not mask:
+            return "[]"
+        return "[" + ", ".join(self._json[keyword_id] for keyword_id in self._ids_of(mask)) + "]"
+
+class DocumentBatch:
+    """Columnar batch of documents moving through the ingest pipeline.
+
+    Parallel columns replace a dict per document: flags and sentiment codes are
+    one byte per row and detected weapons one integer bitset per row. Rows render
+    straight to bulk NDJSON lines, byte for byte what json.dumps gives for the
+    equivalent document dict. Rows flagged in `deletes` become delete actions.
+    """
+
+    __slots__ = ("weapon_table", "ids", "texts", "antisemitic", "created_at", "content_hashes",
+                 "sentiments", "weapons", "deletes", "enrichment_version")
+
+    def __init__(self, weapon_table: WeaponTable):
+        "Initialize an empty batch"
+        self.weapon_table = weapon_table
+        self.ids: List[str] = []
+        self.texts: List[str] = []
+        self.antisemitic = bytearray()
+        self.created_at: List[str] = []
+        self.content_hashes: List[str] = []
+        self.sentiments = bytearray()
+        self.weapons: List[int] = []
+        self.deletes = bytearray()
+        self.enrichment_version = ""
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]], weapon_table: WeaponTable) -> "DocumentBatch":
+        "Build a batch from normalized records"
+        batch = cls(weapon_table)
+        for record in records:
+            batch.append(record)
+        return batch
+
+    def append(self, record: Dict[str, Any]) -> None:
+        "Add one normalized record, not yet enriched"
+        self.ids.append(record['id'])
+        self.texts.append(record['text'])
+        self.antisemitic.append(1 if record['is_antisemitic'] else 0)
+        self.created_at.append(record['created_at'])
+        self.content_hashes.append(record['content_hash'])
+        self.sentiments.append(0)
+        self.weapons.append(0)
+        self.deletes.append(0)
+
+    def __len__(self) -> int:
+        "Number of rows"
+        return len(self.ids)
+
+    def set_enrichment(self, labels: Iterable[str], weapon_masks: Iterable[int], version: str) -> None:
+        "Store the sentiment labels and weapon bitsets of every row"
+        self.sentiments = bytearray(SENTIMENT_CODES[label] for label in labels)
+        self.weapons = list(weapon_masks)
+        self.enrichment_version = version
+
+    def select(self, rows: Iterable[int]) -> "DocumentBatch":
+        "New batch with the given rows, in the given order"
+        rows = list(rows)
+        batch = DocumentBatch(self.weapon_table)
+        batch.ids = [self.ids[row] for row in rows]
+        batch.texts = [self.texts[row] for row in rows]
+        batch.antisemitic = bytearray(self.antisemitic[row] for row in rows)
+        batch.created_at = [self.created_at[row] for row in rows]
+        batch.content_hashes = [self.content_hashes[row] for row in rows]
+        batch.sentiments = bytearray(self.sentiments[row] for row in rows)
+        batch.weapons = [self.weapons[row] for row in rows]
+        batch.deletes = bytearray(self.deletes[row] for row in rows)
+        batch.enrichment_version = self.enrichment_version
+        return batch
+
+    def record(self, row: int) -> Dict[str, Any]:
+        "One row as a document dict, as indexed"
+        detected = self.weapon_table.names(self.weapons[row])
+        return {
+            "id": self.ids[row],
+            "text": self.texts[row],
+            "is_antisemitic": bool(self.antisemitic[row]),
+            "created_at": self.created_at[row],
+            "content_hash": self.content_hashes[row],
+            "sentiment": SENTIMENT_LABELS[self.sentiments[row]],
+            "detected_weapons": detected,
+            "weapon_count": len(detected),
+            "enrichment_version": self.enrichment_version
+        }
+
+    def records(self) -> List[Dict[str, Any]]:
+        "Every row as a document dict"
+        return [self.record(row) for row in range(len(self))]
+
+    def bulk_items(self, index_name: str) -> List[Tuple[bytes, bytes]]:
+        "Render every row as bulk action and source lines, a delete action with no source for deleted rows"
+        index_json = encode_basestring_ascii(index_name)
+        version_json = encode_basestring(self.enrichment_version)
+        sentiment_json = [encode_basestring(label) for label in SENTIMENT_LABELS]
+        table = self.weapon_table
+        items = []
+        for row in range(len(self)):
+            id_json = encode_basestring_ascii(self.ids[row])
+            if self.deletes[row]:
+                items.append((f'{{"delete": {{"_index": {index_json}, "_id": {id_json}}}}}\n'.encode('utf-8'), b""))
+                continue
+            mask = self.weapons[row]
+            header = f'{{"index": {{"_index": {index_json}, "_id": {id_json}}}}}\n'
+            source = (
+                f'{{"id": {encode_basestring(self.ids[row])}, "text": {encode_basestring(self.texts[row])}, '
+                f'"is_antisemitic": {"true" if self.antisemitic[row] else "false"}, '
+                f'"created_at": {encode_basestring(self.created_at[row])}, '
+                f'"content_hash": {encode_basestring(self.content_hashes[row])}, '
+                f'"sentiment": {sentiment_json[self.sentiments[row]]}, '
+                f'"detected_weapons": {table.json_array(mask)}, "weapon_count": {mask.bit_count()}, '
+                f'"enrichment_version": {version_json}}}\n'
+            )
+            items.append((header.encode('utf-8'), source.encode('utf-8')))
+        return items
+
+class RenderedBatch(NamedTuple):
+    """Bulk lines already rendered for an index, e.g. by an ingest worker process"""
+    index_name: str
+    items: List[Tuple[bytes, bytes]]
+
+    def bulk_items(self, index_name: str) -> List[Tuple[bytes, bytes]]:
+        "The rendered lines, which name their index in every action"
+        if index_name != self.index_name:
+            raise ValueError(f"Batch was rendered for index {self.index_name}, not {index_name}")
+        return self.items
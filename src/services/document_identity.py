@@ -0,0 +1,22 @@
+import hashlib
+from typing import Any
+
+def content_hash(text: str, is_antisemitic: Any, created_at: Any) -> str:
+    "Hash the source fields of a record, used to detect changed rows between ingests"
+    raw = f"{text}\0{bool(is_antisemitic)}\0{created_at or ''}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+def document_id(tweet_id: Any, text: str, created_at: Any) -> str:
+    """Build a deterministic document id so re-ingesting a row overwrites instead of duplicating.
+
+    The tweet id is used when it is an exact integer. Spreadsheet exports often
+    round it to scientific notation (1.23E+18), which collides across rows, so
+    those fall back to a hash of the creation date and text. JSON input may carry
+    the id as a number, which is read as its decimal string.
+    """
+    if tweet_id is not None:
+        tweet_id = str(tweet_id).strip()
+        if tweet_id.isdigit():
+            return tweet_id
+    raw = f"{created_at or ''}\0{text}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
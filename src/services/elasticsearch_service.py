@@ -1,114 +1,343 @@
 import json
-from typing import List, Dict, Any, Optional
-from elasticsearch import Elasticsearch
+from datetime import datetime
+from bisect import bisect_right
+from typing import List, Dict, Any, Optional, Union, Iterable, AsyncIterable, AsyncIterator
+from elasticsearch import AsyncElasticsearch, BadRequestError, NotFoundError
+from elasticsearch.serializer import JsonSerializer
+from elastic_transport import AiohttpHttpNode
 import logging
+import time
 
 from ..config.settings import settings
 from ..models.document import MaliciousDocument
 from .weapons import WeaponsService
+from .bulk_indexer import BulkIndexer, BulkReport, Indexable
+from .index_template import TEMPLATE_VERSION, index_patterns, template_mappings, template_name, template_settings
+from .pagination import CURSOR_SORT, PAGE_SORT, InvalidCursorError, SearchPage, decode_cursor, encode_cursor
+from .serialization import orjson
+from .standard_tokenizer import standard_tokenize
+from . import metrics
 
 logger = logging.getLogger(__name__)
 
+# Queries run in filter context: no scores are computed, and the node query cache
+# can reuse the matching documents across the repeated dashboard requests
+
+def antisemitic_with_weapons_query() -> Dict[str, Any]:
+    "Query for antisemitic documents that mention weapons"
+    return {
+        "bool": {
+            "filter": [
+                {"term": {"is_antisemitic": True}},
+                {"range": {"weapon_count": {"gt": 0}}}
+            ]
+        }
+    }
+
+def multiple_weapons_query() -> Dict[str, Any]:
+    "Query for documents with 2 or more weapons"
+    return {
+        "bool": {
+            "filter": [
+                {"range": {"weapon_count": {"gte": 2}}}
+            ]
+        }
+    }
+
+def _cannot_sort_on_id(error: BadRequestError) -> bool:
+    "Whether a search failed because the index has no sortable id field, as before the index template"
+    # Unmapped: "No mapping found for [id] in order to sort on", dynamically mapped text: "fielddata=true on [id]"
+    return "[id]" in str(error.body)
+
+def _exceeds_max_token_count(error: BadRequestError) -> bool:
+    "Whether an _analyze call was rejected for producing more than index.analyze.max_token_count tokens"
+    return "max_token_count" in str(error.body)
+
+def _json_serializer() -> JsonSerializer:
+    "orjson parses large search responses several times faster than the stdlib, when installed"
+    if orjson is not None:
+        from elasticsearch.serializer import OrjsonSerializer
+        return OrjsonSerializer()
+    return JsonSerializer()
+
+class InstrumentedHttpNode(AiohttpHttpNode):
+    """aiohttp node recording latency, payload sizes and outcome of every ES round trip.
+
+    Runs per HTTP attempt, so transport retries and every API (search, bulk, _analyze,
+    point in time) are measured alike.
+    """
+
+    async def perform_request(self, method, target, body=None, headers=None, **kwargs):
+        "Send one request and record it under its API name"
+        operation = metrics.es_operation(method, target)
+        request_bytes = len(body) if body else 0
+        started = time.perf_counter()
+        try:
+            response = await super().perform_request(method, target, body=body, headers=headers, **kwargs)
+        except Exception as e:
+            metrics.observe_es_request(operation, type(e).__name__, time.perf_counter() - started, request_bytes, 0)
+            raise
+        metrics.observe_es_request(operation, str(response.meta.status), time.perf_counter() - started,
+                                   request_bytes, len(response.body or b""))
+        return response
+
+def create_es_client() -> AsyncElasticsearch:
+    "Create a non-blocking es client backed by a pooled keep-alive connection pool"
+    return AsyncElasticsearch(
+        hosts=[{
+            'host': settings.ELASTICSEARCH_HOST.replace('http://', '').replace('https://', ''),
+            'port': int(settings.ELASTICSEARCH_PORT),
+            'scheme': 'http'
+        }],
+        basic_auth=(settings.ELASTICSEARCH_USERNAME, settings.ELASTICSEARCH_PASSWORD),
+        verify_certs=False,
+        ssl_show_warn=False,
+        # One pool of connections per node, shared by every coroutine using this client
+        connections_per_node=settings.ELASTICSEARCH_CONNECTIONS_PER_NODE,
+        headers={"Connection": "keep-alive" if settings.ELASTICSEARCH_KEEP_ALIVE else "close"},
+        http_compress=settings.ELASTICSEARCH_HTTP_COMPRESS,
+        request_timeout=settings.ELASTICSEARCH_REQUEST_TIMEOUT,
+        max_retries=settings.ELASTICSEARCH_MAX_RETRIES,
+        retry_on_timeout=settings.ELASTICSEARCH_RETRY_ON_TIMEOUT,
+        serializer=_json_serializer(),
+        node_class=InstrumentedHttpNode
+    )
+
 class ElasticSearchService:
     """Service for ElasticSearch operations"""
     
-    def __init__(self):
-        "Initialize es client"
-        self.client = Elasticsearch(
-            hosts=[{
-                'host': settings.ELASTICSEARCH_HOST.replace('http://', '').replace('https://', ''),
-                'port': int(settings.ELASTICSEARCH_PORT),
-                'scheme': 'http'
-            }],
-            basic_auth=(settings.ELASTICSEARCH_USERNAME, settings.ELASTICSEARCH_PASSWORD),
-            verify_certs=False,
-            ssl_show_warn=False
-        )
+    def __init__(self, client: Optional[AsyncElasticsearch] = None,
+                 weapons_service: Optional[WeaponsService] = None):
+        "Initialize es client, reusing the given client's connection pool when provided"
+        self._owns_client = client is None
+        self.client = client if client is not None else create_es_client()
         self.index_name = settings.ELASTICSEARCH_INDEX
         # Reuse the existing weapons list source
-        self._weapons_service = WeaponsService()
+        self._weapons_service = weapons_service if weapons_service is not None else WeaponsService()
+        self._warned_legacy_sort = False
         
-    async def create_index(self) -> bool:
-        "Create the malicious document index with mapping"
+    async def close(self) -> None:
+        "Close the underlying connection pool if this service created it"
+        if self._owns_client:
+            await self.client.close()
+        
+    async def ensure_index_template(self) -> bool:
+        "Install the index template, or upgrade it when the installed version is older"
+        name = template_name(self.index_name)
         try:
-            # Check if index already exists
-            if self.client.indices.exists(index=self.index_name):
-                logger.info(f"Index {self.index_name} already exists")
+            installed_version = None
+            try:
+                response = await self.client.indices.get_index_template(name=name)
+                templates = response.get('index_templates', [])
+                if templates:
+                    installed_version = templates[0]['index_template'].get('version')
+            except NotFoundError:
+                pass
+            
+            if installed_version is not None and installed_version >= TEMPLATE_VERSION:
                 return True
-
-            # Define mapping
-            mapping = {
-                "properties": {
-                    "text": {
-                        "type": "text",
-                        "analyzer": "standard"
-                    },
-                    "is_antisemitic": {
-                        "type": "boolean"
-                    },
-                    "created_at": {
-                        "type": "date",
-                        "format": "yyyy-MM-dd'T'HH:mm:ss||yyyy-MM-dd HH:mm:ss||yyyy-MM-dd HH:mm:ssZ"
-                    },
-                    "sentiment": {
-                        "type": "text",
-                        "analyzer": "keyword"
-                    },
-                    "detected_weapons": {
-                        "type": "text",
-                        "analyzer": "keyword"
-                    },
-                    "weapon_count": {
-                        "type": "integer"
-                    }
+            
+            await self.client.indices.put_index_template(
+                name=name,
+                index_patterns=index_patterns(self.index_name),
+                version=TEMPLATE_VERSION,
+                priority=100,
+                template={
+                    "settings": template_settings(),
+                    "mappings": template_mappings()
                 }
+            )
+            logger.info(f"Installed index template {name} version {TEMPLATE_VERSION} (was {installed_version})")
+            return True
+        
+        except Exception as e:
+            logger.error(f"Error installing index template {name}: {e}")
+            return False
+        
+    async def get_live_indices(self) -> List[str]:
+        """Get the concrete indices readers see through index_name.
+
+        index_name is normally an alias over one versioned index. An index created
+        under that name before aliases were used is returned as is, and nothing is
+        returned before the first ingest.
+        """
+        try:
+            response = await self.client.indices.get_alias(name=self.index_name)
+            return list(response.keys())
+        except NotFoundError:
+            pass
+        if await self.client.indices.exists(index=self.index_name):
+            return [self.index_name]
+        return []
+        
+    async def create_versioned_index(self, bulk_load: bool = True) -> str:
+        """Create a new versioned index for index_name, not yet visible to readers.
+
+        For bulk loads refreshes are disabled and replicas set to 0 until finalize_index.
+        """
+        await self.ensure_index_template()
+        name = f"{self.index_name}-v{TEMPLATE_VERSION}-{datetime.now():%Y%m%d%H%M%S%f}"
+        index_settings = {"refresh_interval": "-1", "number_of_replicas": 0} if bulk_load else {}
+        # The index template supplies mappings and the remaining settings
+        await self.client.indices.create(index=name, settings=index_settings)
+        logger.info(f"Created index {name}{' for bulk loading' if bulk_load else ''}")
+        return name
+        
+    async def finalize_index(self, name: str) -> None:
+        "Restore refreshes and replicas after a bulk load, then merge segments for faster reads"
+        await self.client.indices.put_settings(
+            index=name,
+            settings={
+                # null resets the refresh interval to the cluster default
+                "refresh_interval": None,
+                "number_of_replicas": settings.INDEX_NUMBER_OF_REPLICAS
             }
-            
-            # Create index
-            response = self.client.indices.create(
-                index=self.index_name,
-                body=mapping
+        )
+        await self.client.indices.refresh(index=name)
+        if settings.INDEX_FORCEMERGE_SEGMENTS > 0:
+            await self.client.options(request_timeout=settings.INDEX_FORCEMERGE_TIMEOUT).indices.forcemerge(
+                index=name, max_num_segments=settings.INDEX_FORCEMERGE_SEGMENTS
+            )
+        logger.info(f"Finalized index {name}")
+        
+    async def swap_alias(self, name: str) -> List[str]:
+        """Point index_name at the given index in one atomic alias update.
+
+        Returns the indices the alias pointed at before. A legacy concrete index
+        named index_name is deleted in the same update, since it blocks the alias.
+        """
+        previous = await self.get_live_indices()
+        actions: List[Dict[str, Any]] = [{"add": {"index": name, "alias": self.index_name}}]
+        for index in previous:
+            if index == self.index_name:
+                actions.append({"remove_index": {"index": index}})
+            elif index != name:
+                actions.append({"remove": {"index": index, "alias": self.index_name}})
+        await self.client.indices.update_aliases(actions=actions)
+        logger.info(f"Alias {self.index_name} now points at {name} (was {previous})")
+        return [index for index in previous if index not in (name, self.index_name)]
+        
+    async def delete_old_indices(self, keep: Optional[int] = None) -> List[str]:
+        "Delete versioned indices no longer behind the alias, keeping the newest ones for rollback"
+        keep = settings.INDEX_RETAINED_VERSIONS if keep is None else keep
+        try:
+            live = set(await self.get_live_indices())
+            response = await self.client.indices.get_settings(
+                index=f"{self.index_name}-v*", name="index.creation_date"
+            )
+            candidates = sorted(
+                (name for name in response if name not in live),
+                key=lambda name: int(response[name]['settings']['index']['creation_date']),
+                reverse=True
             )
+            stale = candidates[keep:]
+            if stale:
+                await self.client.indices.delete(index=",".join(stale))
+                logger.info(f"Deleted old indices {stale}")
+            return stale
+        except NotFoundError:
+            return []
+        except Exception as e:
+            logger.error(f"Error deleting old indices: {e}")
+            return []
+        
+    async def delete_index(self, name: str) -> None:
+        "Delete an index, ignoring one that does not exist"
+        try:
+            await self.client.indices.delete(index=name)
+        except NotFoundError:
+            pass
+        
+    async def create_index(self) -> bool:
+        "Make sure index_name exists, as an alias over a new versioned index when nothing is there yet"
+        try:
+            await self.ensure_index_template()
             
-            logger.info(f"Created index {self.index_name}: {response}")
+            # Check if index already exists
+            live = await self.get_live_indices()
+            if live:
+                logger.info(f"Index {self.index_name} already exists ({', '.join(live)})")
+                await self.check_index_version()
+                return True
+            
+            name = await self.create_versioned_index(bulk_load=False)
+            await self.swap_alias(name)
             return True
         
         except Exception as e:
             logger.error(f"Error creating index: {e}")
             return False
         
-    async def bulk_index_documents(self, doucments: List[MaliciousDocument]) -> bool:
+    async def check_index_version(self) -> None:
+        "Warn when the live index predates the current template, run once at startup"
+        try:
+            response = await self.client.indices.get_mapping(index=self.index_name)
+            for index, mapping in response.items():
+                version = mapping.get('mappings', {}).get('_meta', {}).get('template_version')
+                if version != TEMPLATE_VERSION:
+                    logger.warning(
+                        f"Index {index} uses mapping version {version}, current is "
+                        f"{TEMPLATE_VERSION}; run a full ingest to get keyword fields and the created_at index sort"
+                    )
+        except NotFoundError:
+            # Nothing ingested yet, the first ingest uses the current template
+            pass
+        except Exception as e:
+            logger.warning(f"Could not check mapping version of {self.index_name}: {e}")
+        
+    async def bulk_index(self, documents: Union[Iterable[Indexable], AsyncIterable[Indexable]],
+                         report: Optional[BulkReport] = None, index: Optional[str] = None) -> BulkReport:
+        "Stream documents (dicts or columnar batches) into the index, or another index such as a new version, and report per-item outcomes"
+        indexer = BulkIndexer(self.client, index or self.index_name)
+        return await indexer.index(documents, report)
+        
+    async def bulk_index_documents(self, doucments: List[Union[MaliciousDocument, Dict[str, Any]]]) -> bool:
         "Bulk index document for ElasticSearch"
         try:
-            actions = []
-            for doc in doucments:
-                # Add index action
-                actions.append({
-                    "index": {
-                        "_index": self.index_name
-                    }
-                })
-                # Add document source
-                actions.append(doc.model_dump())
-                
-            # Perform bulk indexing
-            response = self.client.bulk(body=actions)
+            report = await self.bulk_index(
+                doc.model_dump() if isinstance(doc, MaliciousDocument) else doc
+                for doc in doucments
+            )
             
-            if response.get('errors'):
-                logger.error(f"Bulk indexing errors: {response['errors']}")
+            if not report.success:
+                logger.error(f"Bulk indexing errors: {report.failures}")
                 return False
             
-            logger.info(f"Successfully indexed {len(doucments)} documents.")
+            logger.info(f"Successfully indexed {report.indexed} documents.")
             return True
         
         except Exception as e:
             logger.error(f"Error bulk indexing documents: {e}")
             return False
         
+    async def get_document_versions(self, doc_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        "Get content_hash and enrichment_version of the given documents that exist in the index"
+        if not doc_ids:
+            return {}
+        try:
+            response = await self.client.mget(
+                index=self.index_name,
+                ids=doc_ids,
+                source_includes=["content_hash", "enrichment_version"]
+            )
+            return {doc['_id']: doc.get('_source', {}) for doc in response['docs'] if doc.get('found')}
+        except NotFoundError:
+            # The index does not exist yet, so nothing has been ingested
+            return {}
+        
+    async def refresh_index(self, index: Optional[str] = None) -> bool:
+        "Make recently indexed documents visible to searches"
+        try:
+            await self.client.indices.refresh(index=index or self.index_name)
+            return True
+        except Exception as e:
+            logger.error(f"Error refreshing index {self.index_name}: {e}")
+            return False
+        
     async def update_document_sentiment(self, doc_id: str, sentiment: str) -> bool:
         "Update document sentiment"
         try:
-            response = self.client.update(
+            response = await self.client.update(
                 index=self.index_name,
                 id=doc_id,
                 body={
@@ -125,7 +354,7 @@ class ElasticSearchService:
     async def update_document_weapons(self, doc_id: str, weapons: List[str]) -> bool:
         "Update document detected weapons"
         try:
-            response = self.client.update(
+            response = await self.client.update(
                 index=self.index_name,
                 id=doc_id,
                 body={
@@ -146,6 +375,7 @@ class ElasticSearchService:
             query = {
                 "query": {
                     "bool": {
+                        # must_not clauses already run in filter context
                         "must_not": [
                             {"term": {"is_antisemitic": True}},
                             {"range": {"weapon_count": {"gt": 0}}},
@@ -156,7 +386,7 @@ class ElasticSearchService:
             }
             
             # Delete the documents matching the query
-            response = self.client.delete_by_query(
+            response = await self.client.delete_by_query(
                 index=self.index_name,
                 body=query
             )
@@ -168,25 +398,13 @@ class ElasticSearchService:
             logger.error(f"Error deleting irrelevant documents: {e}")
             return 0
         
-    async def get_antisemistic_with_weapons(self) -> List[Dict[str, Any]]:
-        "Get all antisemistic documents with weapons"
+    async def get_antisemistic_with_weapons(self, size: int = 1000) -> List[Dict[str, Any]]:
+        "Get antisemistic documents with weapons, up to size hits"
         try:
-            query = {
-                "query": {
-                    "bool": {
-                        "must": [
-                            {"term": {"is_antisemitic": True}},
-                            {"range": {"weapon_count": {"gt": 0}}}
-                        ]
-                    }
-                }
-            }
-            
-            # Search for documents
-            response = self.client.search(
+            response = await self.client.search(
                 index=self.index_name,
-                body=query,
-                size=1000
+                query=antisemitic_with_weapons_query(),
+                size=size
             )
             
             return [hit['_source'] for hit in response['hits']['hits']]
@@ -195,59 +413,317 @@ class ElasticSearchService:
             logger.error(f"Error getting antisemitic documents with weapons: {e}")
             return []
         
-    async def get_documents_with_multiple_weapons(self) -> List[Dict[str, Any]]:
-        "Get all documents with 2 or more weapons"
+    async def get_documents_with_multiple_weapons(self, size: int = 1000) -> List[Dict[str, Any]]:
+        "Get documents with 2 or more weapons, up to size hits"
         try:
-            query = {
-                "query": {
-                    "range": {
-                        "weapon_count": {"gte": 2}
-                    }
-                }
-            }
-            
-            response = self.client.search(
+            response = await self.client.search(
                 index=self.index_name,
-                body=query,
-                size=1000
+                query=multiple_weapons_query(),
+                size=size
             )
             
             return [hit['_source'] for hit in response['hits']['hits']]
             
         except Exception as e:
             logger.error(f"Error getting documents with multiple weapons: {e}")
-            return [] 
+            return []
+        
+    async def _close_pit(self, pit_id: str) -> None:
+        "Release a point in time, ignoring ones that already expired"
+        try:
+            await self.client.close_point_in_time(id=pit_id)
+        except Exception as e:
+            logger.warning(f"Could not close point in time: {e}")
             
-    async def get_all_documents(self) -> List[Dict[str, Any]]:
-        "Get all documents for processing"
+    async def _open_pit(self) -> str:
+        "Open a point in time over the index"
+        response = await self.client.open_point_in_time(
+            index=self.index_name, keep_alive=settings.SEARCH_PIT_KEEP_ALIVE
+        )
+        return response['id']
+        
+    async def _pit_search(self, pit_id: str, query: Dict[str, Any], size: int,
+                          search_after: Optional[List[Any]] = None, fields: Optional[List[str]] = None,
+                          track_total_hits: bool = False) -> Dict[str, Any]:
+        "Run one search_after request over a point in time"
+        kwargs: Dict[str, Any] = {
+            "pit": {"id": pit_id, "keep_alive": settings.SEARCH_PIT_KEEP_ALIVE},
+            "query": query,
+            "sort": PAGE_SORT,
+            "size": size,
+            "track_total_hits": track_total_hits
+        }
+        if search_after is not None:
+            kwargs["search_after"] = search_after
+        if fields:
+            kwargs["source"] = fields
+        return await self.client.search(**kwargs)
+        
+    async def search_page(self, query: Dict[str, Any], size: int = 1000, cursor: Optional[str] = None,
+                          fields: Optional[List[str]] = None) -> SearchPage:
+        """Get one page of matching documents, sorted on created_at and id.
+
+        The first page searches the alias. Its cursor names the concrete index the
+        hits came from, so later pages resume there with search_after even after a
+        rebuild swaps the alias, until that index is deleted. Nothing is held open
+        on the server between pages, so unfollowed cursors cost nothing and the
+        same request always gets the same cursor. fields limits the returned
+        _source fields.
+
+        An index created before the id field was mapped cannot be sorted that way,
+        and is paged over a point in time instead until it is rebuilt.
+        """
+        if cursor:
+            state = decode_cursor(cursor)
+            if "pit" in state:
+                return await self._search_pit_page(query, size, state, fields)
+            index, search_after = state["index"], state["after"]
+            total, seen = state.get("total"), state.get("seen", 0)
+        else:
+            index, search_after, total, seen = self.index_name, None, None, 0
+        
+        kwargs: Dict[str, Any] = {
+            "index": index,
+            "query": query,
+            "sort": CURSOR_SORT,
+            "size": size,
+            # Count matches once, later pages carry the total in the cursor
+            "track_total_hits": total is None
+        }
+        if search_after is not None:
+            kwargs["search_after"] = search_after
+        if fields:
+            kwargs["source"] = fields
         try:
-            response = self.client.search(
-                index=self.index_name,
-                body={"query": {"match_all": {}}},
-                size=10000  # Increase size to get all documents
-            )
+            response = await self.client.search(**kwargs)
+        except NotFoundError as e:
+            if cursor:
+                raise InvalidCursorError("Cursor expired, start again without a cursor") from e
+            raise
+        except BadRequestError as e:
+            if cursor or not _cannot_sort_on_id(e):
+                raise
+            if not self._warned_legacy_sort:
+                self._warned_legacy_sort = True
+                logger.warning(
+                    f"Index {self.index_name} has no id keyword to page on, paging it over a point in time; "
+                    f"run a full ingest to rebuild it with the current template"
+                )
+            return await self._search_pit_page(query, size, None, fields)
+        
+        hits = response['hits']['hits']
+        if total is None:
+            total = response['hits']['total']['value']
+        seen += len(hits)
+        
+        next_cursor = None
+        if len(hits) == size and seen < total:
+            last = hits[-1]
+            next_cursor = encode_cursor({"index": last['_index'], "after": last['sort'], "total": total, "seen": seen})
+        return SearchPage(documents=[hit.get('_source', {}) for hit in hits], next_cursor=next_cursor, total=total)
+        
+    async def _search_pit_page(self, query: Dict[str, Any], size: int, state: Optional[Dict[str, Any]],
+                               fields: Optional[List[str]]) -> SearchPage:
+        """Get one page of an index without the id field, over a point in time sorted with PAGE_SORT.
+
+        The first page opens the point in time and the last one closes it. One left
+        behind by an unfollowed cursor expires after SEARCH_PIT_KEEP_ALIVE, so these
+        pages are not cacheable.
+        """
+        if state is None:
+            try:
+                pit_id = await self._open_pit()
+            except NotFoundError:
+                return SearchPage(documents=[], next_cursor=None, total=0)
+            search_after, total, seen = None, None, 0
+        else:
+            pit_id, search_after = state["pit"], state["after"]
+            total, seen = state.get("total"), state.get("seen", 0)
+        
+        try:
+            response = await self._pit_search(pit_id, query, size, search_after, fields,
+                                              track_total_hits=total is None)
+        except NotFoundError as e:
+            if state is not None:
+                raise InvalidCursorError("Cursor expired, start again without a cursor") from e
+            raise
+        except Exception:
+            await self._close_pit(pit_id)
+            raise
+        
+        pit_id = response.get('pit_id', pit_id)
+        hits = response['hits']['hits']
+        if total is None:
+            total = response['hits']['total']['value']
+        seen += len(hits)
+        
+        next_cursor = None
+        if len(hits) == size and seen < total:
+            last = hits[-1]
+            next_cursor = encode_cursor({"index": last['_index'], "pit": pit_id, "after": last['sort'],
+                                         "total": total, "seen": seen})
+        else:
+            await self._close_pit(pit_id)
+        return SearchPage(documents=[hit.get('_source', {}) for hit in hits], next_cursor=next_cursor,
+                          total=total, cacheable=False)
+        
+    async def iter_search_pages(self, query: Dict[str, Any], page_size: int = 1000, cursor: Optional[str] = None,
+                                fields: Optional[List[str]] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        "Yield every page of matching documents from the cursor on"
+        while True:
+            page = await self.search_page(query, page_size, cursor, fields)
+            cursor = page.next_cursor
+            if page.documents:
+                yield page.documents
+            if not cursor:
+                return
             
-            documents = []
-            for hit in response['hits']['hits']:
-                doc = hit['_source'].copy()
-                doc['_id'] = hit['_id']  # Include the document ID
-                documents.append(doc)
+    async def iter_documents(self, query: Optional[Dict[str, Any]] = None, fields: Optional[List[str]] = None,
+                             batch_size: Optional[int] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Iterate over every matching document in batches, without the 10,000 hit window limit.
+
+        Pages through a point in time with search_after, so the whole index is read
+        from one consistent snapshot. Documents include their _id, and fields limits
+        the _source fields fetched.
+        """
+        query = query or {"match_all": {}}
+        batch_size = batch_size or settings.SCAN_BATCH_SIZE
+        try:
+            pit_id = await self._open_pit()
+        except NotFoundError:
+            # Nothing to iterate before the index exists
+            return
+        
+        try:
+            search_after = None
+            while True:
+                response = await self._pit_search(pit_id, query, batch_size, search_after, fields)
+                pit_id = response.get('pit_id', pit_id)
+                hits = response['hits']['hits']
+                if hits:
+                    batch = []
+                    for hit in hits:
+                        doc = dict(hit.get('_source', {}))
+                        doc['_id'] = hit['_id']
+                        batch.append(doc)
+                    yield batch
+                if len(hits) < batch_size:
+                    return
+                search_after = hits[-1]['sort']
+        finally:
+            await self._close_pit(pit_id)
             
+    async def get_all_documents(self, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        "Get all documents, with their _id, reading the whole index in batches"
+        try:
+            documents = []
+            async for batch in self.iter_documents(fields=fields):
+                documents.extend(batch)
             return documents
             
         except Exception as e:
             logger.error(f"Error getting all documents: {e}")
             return []
     
-    async def get_document_count(self) -> int:
+    async def get_processing_counts(self) -> Dict[str, int]:
+        "Count all documents and the enriched ones with a single size=0 search"
+        try:
+            response = await self.client.search(
+                index=self.index_name,
+                size=0,
+                track_total_hits=True,
+                aggs={
+                    "processed": {
+                        # exists skips empty arrays, so an empty detected_weapons list would not
+                        # count; weapon_count is always written together with it
+                        "filter": {
+                            "bool": {
+                                "filter": [
+                                    {"exists": {"field": "sentiment"}},
+                                    {"exists": {"field": "weapon_count"}}
+                                ]
+                            }
+                        }
+                    }
+                }
+            )
+            return {
+                "total_count": response['hits']['total']['value'],
+                "processed_count": response['aggregations']['processed']['doc_count']
+            }
+        except NotFoundError:
+            return {"total_count": 0, "processed_count": 0}
+        
+    async def get_document_count(self, index: Optional[str] = None) -> int:
         "Get total document count"
         try:
-            response = self.client.count(index=self.index_name)
+            response = await self.client.count(index=index or self.index_name)
             return response['count']
         except Exception as e:
             logger.error(f"Error getting document count: {e}")
             return 0
 
+    async def analyze_texts(self, texts: List[str], analyzer: str = "standard") -> List[List[str]]:
+        """Analyze many texts with an ES analyzer in as few _analyze calls as possible.
+
+        Texts are sent as one array per request, bounded by ANALYZE_BATCH_SIZE texts and
+        ANALYZE_MAX_BATCH_CHARS characters. ES reports offsets continuously across the
+        array (each text's length plus an offset gap of 1), so tokens are mapped back
+        to their text by start offset. A batch the server rejects for exceeding its
+        max_token_count is split in half and retried; a single text over the limit
+        is tokenized in-process.
+        """
+        results: List[List[str]] = [[] for _ in texts]
+        batch: List[int] = []
+        batch_chars = 0
+        
+        async def flush(indexes: List[int]) -> None:
+            try:
+                response = await self.client.indices.analyze(
+                    analyzer=analyzer,
+                    text=[texts[i] for i in indexes]
+                )
+            except BadRequestError as e:
+                if not _exceeds_max_token_count(e):
+                    raise
+                if len(indexes) == 1:
+                    logger.warning(f"Text of {len(texts[indexes[0]])} characters exceeds the _analyze token limit, "
+                                   f"tokenizing it in-process")
+                    results[indexes[0]] = standard_tokenize(texts[indexes[0]])
+                    return
+                middle = len(indexes) // 2
+                await flush(indexes[:middle])
+                await flush(indexes[middle:])
+                return
+            # Offsets are counted in UTF-16 code units by the server
+            starts = []
+            offset = 0
+            for i in indexes:
+                starts.append(offset)
+                offset += len(texts[i].encode('utf-16-le')) // 2 + 1
+            for token in response.get("tokens", []):
+                position = bisect_right(starts, token.get("start_offset", 0)) - 1
+                if token.get("token"):
+                    results[indexes[position]].append(token["token"].lower())
+        
+        for i, text in enumerate(texts):
+            if not text:
+                continue
+            if batch and (len(batch) >= settings.ANALYZE_BATCH_SIZE
+                          or batch_chars + len(text) > settings.ANALYZE_MAX_BATCH_CHARS):
+                await flush(batch)
+                batch, batch_chars = [], 0
+            batch.append(i)
+            batch_chars += len(text)
+        if batch:
+            await flush(batch)
+        return results
+    
+    async def detect_weapons_in_texts(self, texts: List[str]) -> List[List[str]]:
+        "Detect weapons in many texts using batched ES analyzer calls"
+        token_lists = await self.analyze_texts(texts)
+        return [self._weapons_service.match_tokens(tokens) for tokens in token_lists]
+        
     async def detect_weapons_in_text(self, text: str) -> List[str]:
         """Tokenize text with ES analyzer and detect weapons using the same tokenization.
 
@@ -264,50 +740,11 @@ class ElasticSearchService:
                 "analyzer": "standard",
                 "text": text
             }
-            analyze_response = self.client.indices.analyze(body=analyze_body)
+            analyze_response = await self.client.indices.analyze(body=analyze_body)
             tokens = [t.get("token", "").lower() for t in analyze_response.get("tokens", []) if t.get("token")]
 
-            if not tokens:
-                return []
-
-            detected: List[str] = []
-            weapons = self._weapons_service.get_weapon_keywords()
-
-            # Build a quick lookup set for single-token matches
-            token_set = set(tokens)
-
-            for weapon in weapons:
-                w = weapon.strip()
-                if not w:
-                    continue
-
-                # Multi-word weapon phrase: verify ordered sequence of tokens exists
-                if " " in w:
-                    phrase_tokens = [p for p in w.lower().split() if p]
-                    if len(phrase_tokens) == 0:
-                        continue
-                    # Sliding window search over tokens
-                    window = len(phrase_tokens)
-                    found_phrase = False
-                    for i in range(0, max(0, len(tokens) - window + 1)):
-                        if tokens[i:i+window] == phrase_tokens:
-                            found_phrase = True
-                            break
-                    if found_phrase:
-                        detected.append(weapon)
-                else:
-                    # Single-word: match if present as a token
-                    if w.lower() in token_set:
-                        detected.append(weapon)
-
-            # De-duplicate while preserving input order
-            seen = set()
-            unique_detected = []
-            for d in detected:
-                if d not in seen:
-                    unique_detected.append(d)
-                    seen.add(d)
-            return unique_detected
+            # Match against the same keyword tables used by local detection
+            return self._weapons_service.match_tokens(tokens)
         except Exception as e:
             logger.error(f"Error detecting weapons via Elasticsearch analyze: {e}")
             return []
\ No newline at end of file
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+
+from .date_parsing import DATE_PARSING_VERSION
+from .document_batch import SENTIMENT_CODES, DocumentBatch
+from .sentiment import SENTIMENT_VERSION, SentimentService
+from .weapons import WeaponsService
+from . import metrics
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class EnrichmentService:
+    """Service computing sentiment and weapon fields in-process before indexing"""
+
+    def __init__(self, sentiment_service: SentimentService, weapons_service: WeaponsService,
+                 es_service=None, tokenizer: Optional[str] = None):
+        """Initialize enrichment with shared analyzers.
+
+        tokenizer selects how weapon detection tokenizes text: "local" uses the
+        in-process standard analyzer port, "es" sends batched _analyze calls
+        through es_service for exact server parity.
+        """
+        self.sentiment_service = sentiment_service
+        self.weapons_service = weapons_service
+        self.es_service = es_service
+        self.tokenizer = tokenizer or settings.WEAPON_TOKENIZER
+        # Stored on every document so incremental ingests re-enrich after analyzer or date parsing changes
+        self.version = (f"{SENTIMENT_VERSION}|weapons-{weapons_service.keywords_version}|{self.tokenizer}"
+                        f"|dates-{DATE_PARSING_VERSION}")
+
+    def _apply(self, record: Dict[str, Any], sentiment: str, weapons: List[str]) -> Dict[str, Any]:
+        "Set the enriched fields on a record"
+        record['sentiment'] = sentiment
+        record['detected_weapons'] = weapons
+        record['weapon_count'] = len(weapons)
+        record['enrichment_version'] = self.version
+        return record
+
+    def enrich(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        "Add sentiment, detected_weapons and weapon_count to a raw record"
+        text = record.get('text', '')
+        return self._apply(
+            record,
+            self.sentiment_service.analyze_sentiment(text),
+            self.weapons_service.detect_weapons_in_tokens(text)
+        )
+
+    async def _detect_weapons(self, texts: List[str]) -> List[List[str]]:
+        "Detect weapons with batched ES analysis, or locally on a thread off the event loop"
+        if self.tokenizer == "es" and self.es_service is not None:
+            try:
+                return await self.es_service.detect_weapons_in_texts(texts)
+            except Exception as e:
+                logger.error(f"Batched ES analysis failed, falling back to local tokenizer: {e}")
+        return await asyncio.to_thread(self.weapons_service.batch_detect_weapons_in_tokens, texts)
+
+    async def _timed_detect_weapons(self, texts: List[str]) -> List[List[str]]:
+        "Detect weapons of a batch, timed as its own stage"
+        with metrics.stage_timer("weapons", len(texts)):
+            return await self._detect_weapons(texts)
+
+    async def _score_sentiment(self, texts: List[str]) -> List[Any]:
+        "Score sentiment of a batch, timed as its own stage"
+        with metrics.stage_timer("sentiment", len(texts)):
+            return await self.sentiment_service.analyze_batch_async(texts)
+
+    async def _score(self, texts: List[str]) -> Tuple[List[Tuple[str, float]], List[List[str]]]:
+        """Score sentiment in the worker pool while weapons are detected.
+
+        The sentiment task is scheduled first, so its first step hands the shards
+        to the pool before weapon detection starts on a thread (or in _analyze
+        calls); the event loop stays free while both run. Both stages are timed
+        from start to finish, so their times overlap.
+        """
+        sentiment_task = asyncio.ensure_future(self._score_sentiment(texts))
+        weapons_task = asyncio.ensure_future(self._timed_detect_weapons(texts))
+        try:
+            sentiments, weapons = await asyncio.gather(sentiment_task, weapons_task)
+        except BaseException:
+            sentiment_task.cancel()
+            weapons_task.cancel()
+            raise
+        return sentiments, weapons
+
+    async def enrich_batch(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        "Enrich a batch of raw records"
+        sentiments, weapons = await self._score([record.get('text', '') for record in records])
+        return [
+            self._apply(record, label, found)
+            for record, (label, _), found in zip(records, sentiments, weapons)
+        ]
+
+    async def enrich_documents(self, batch: DocumentBatch) -> DocumentBatch:
+        "Enrich a columnar batch in place, storing detected weapons as bitsets"
+        sentiments, weapons = await self._score(batch.texts)
+        table = batch.weapon_table
+        batch.set_enrichment((label for label, _ in sentiments), (table.mask(found) for found in weapons), self.version)
+        return batch
+
+    def enrich_documents_sync(self, batch: DocumentBatch) -> DocumentBatch:
+        "Enrich a columnar batch in the calling thread with the local tokenizer, as ingest worker processes do"
+        texts = batch.texts
+        with metrics.stage_timer("weapons", len(texts)):
+            weapons = self.weapons_service.batch_detect_weapons_in_tokens(texts)
+        with metrics.stage_timer("sentiment", len(texts)):
+            labels = self.sentiment_service.batch_analyze_sentiment(texts)
+        table = batch.weapon_table
+        batch.set_enrichment(labels, (table.mask(found) for found in weapons), self.version)
+        return batch
+
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        "Get counters of the shared enrichment cache, if one is configured"
+        cache = self.sentiment_service.cache or self.weapons_service.cache
+        return cache.stats() if cache is not None else None
+
+    @staticmethod
+    def is_relevant(record: Dict[str, Any]) -> bool:
+        "Keep documents that are antisemitic, mention weapons or have negative sentiment"
+        return bool(
+            record.get('is_antisemitic')
+            or record.get('weapon_count', 0) > 0
+            or record.get('sentiment') == 'negative'
+        )
+
+    @staticmethod
+    def relevant_rows(batch: DocumentBatch) -> List[bool]:
+        "Relevance of every row of an enriched batch, by the same rule as is_relevant"
+        negative = SENTIMENT_CODES['negative']
+        return [
+            bool(flag or mask or code == negative)
+            for flag, mask, code in zip(batch.antisemitic, batch.weapons, batch.sentiments)
+        ]
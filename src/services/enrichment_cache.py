@@ -0,0 +1,160 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+def normalize_text(text: str) -> str:
+    "Collapse whitespace runs so retweets and reformatted copies share a key"
+    return " ".join(text.split())
+
+class EnrichmentCache:
+    """Bounded LRU cache of per-text enrichment results, optionally persisted to sqlite.
+
+    Keys hash the analyzer namespace, its version (library version, keyword list
+    digest) and the text, so changing an analyzer never serves stale results.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, path: Optional[str] = None):
+        "Initialize the cache, opening the sqlite store when a path is configured"
+        self.max_size = settings.ENRICHMENT_CACHE_SIZE if max_size is None else max_size
+        self.path = settings.ENRICHMENT_CACHE_PATH if path is None else path
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        # Sentiment scoring runs on worker threads, so guard the dict and connection
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._db: Optional[sqlite3.Connection] = None
+        if self.path:
+            try:
+                self._db = sqlite3.connect(self.path, check_same_thread=False)
+                self._db.execute("CREATE TABLE IF NOT EXISTS enrichment_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+                self._db.commit()
+                logger.info(f"Opened persistent enrichment cache at {self.path}")
+            except sqlite3.Error as e:
+                logger.error(f"Could not open enrichment cache at {self.path}, using memory only: {e}")
+                self._db = None
+
+    @staticmethod
+    def make_key(namespace: str, version: str, text: str, normalize: bool = True) -> str:
+        "Build the cache key for a text under an analyzer namespace and version"
+        if normalize:
+            text = normalize_text(text)
+        return hashlib.sha1(f"{namespace}\0{version}\0{text}".encode('utf-8')).hexdigest()
+
+    def _remember(self, key: str, value: Any) -> None:
+        "Insert into the in-memory LRU, evicting the oldest entries past max_size"
+        if self.max_size <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        "Look up keys, returning only the ones found in memory or on disk"
+        keys = list(keys)
+        found: Dict[str, Any] = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+                else:
+                    missing.append(key)
+
+            if missing and self._db is not None:
+                try:
+                    for start in range(0, len(missing), 500):
+                        chunk = missing[start:start + 500]
+                        placeholders = ",".join("?" * len(chunk))
+                        rows = self._db.execute(
+                            f"SELECT key, value FROM enrichment_cache WHERE key IN ({placeholders})", chunk
+                        ).fetchall()
+                        for key, value in rows:
+                            found[key] = json.loads(value)
+                            self._remember(key, found[key])
+                except sqlite3.Error as e:
+                    logger.error(f"Error reading enrichment cache: {e}")
+
+            hits = sum(1 for key in keys if key in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return found
+
+    def get(self, key: str) -> Optional[Any]:
+        "Look up a single key"
+        return self.get_many([key]).get(key)
+
+    def lookup(self, keys: List[str], values: List[Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Split keyed inputs into cached results and the unique inputs still to compute.
+
+        Returns (found, pending): found maps keys to cached results, pending maps
+        each missing key to its first input, so duplicates are computed once.
+        """
+        found = self.get_many(keys)
+        pending: Dict[str, Any] = {}
+        for key, value in zip(keys, values):
+            if key not in found and key not in pending:
+                pending[key] = value
+        return found, pending
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]) -> None:
+        "Store results in memory and write them through to disk"
+        items = list(items)
+        with self._lock:
+            for key, value in items:
+                self._remember(key, value)
+            if items and self._db is not None:
+                try:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO enrichment_cache (key, value) VALUES (?, ?)",
+                        [(key, json.dumps(value)) for key, value in items]
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Error writing enrichment cache: {e}")
+
+    def put(self, key: str, value: Any) -> None:
+        "Store a single result"
+        self.put_many([(key, value)])
+
+    def clear(self) -> None:
+        "Drop every cached result, in memory and on disk"
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                try:
+                    self._db.execute("DELETE FROM enrichment_cache")
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Error clearing enrichment cache: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        "Get hit, miss and eviction counters"
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "persistent": self._db is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def close(self) -> None:
+        "Close the sqlite store"
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
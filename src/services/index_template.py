@@ -0,0 +1,70 @@
+from typing import Any, Dict, List
+
+from ..config.settings import settings
+
+# Bump whenever the settings or mappings below change, so the template is re-installed
+TEMPLATE_VERSION = 2
+
+def template_name(index_name: str) -> str:
+    "Name of the index template for an index"
+    return f"{index_name}-template"
+
+def index_patterns(index_name: str) -> List[str]:
+    "Index patterns the template applies to, the index itself and its versioned copies"
+    return [index_name, f"{index_name}-*"]
+
+def template_settings() -> Dict[str, Any]:
+    "Index settings applied by the template"
+    return {
+        "number_of_shards": settings.INDEX_NUMBER_OF_SHARDS,
+        "number_of_replicas": settings.INDEX_NUMBER_OF_REPLICAS,
+        # Documents are stored in created_at order, which the paginated queries sort on
+        # and which lets date range filters skip whole segments
+        "sort.field": "created_at",
+        "sort.order": "asc"
+    }
+
+def template_mappings() -> Dict[str, Any]:
+    "Field mappings applied by the template"
+    return {
+        "_meta": {"template_version": TEMPLATE_VERSION},
+        "properties": {
+            "id": {
+                "type": "keyword"
+            },
+            "text": {
+                "type": "text",
+                "analyzer": "standard"
+            },
+            "is_antisemitic": {
+                "type": "boolean"
+            },
+            "created_at": {
+                "type": "date",
+                # Offsets such as -05:00 and epoch millis parse too
+                "format": "strict_date_optional_time||yyyy-MM-dd'T'HH:mm:ss||yyyy-MM-dd HH:mm:ss||yyyy-MM-dd HH:mm:ssZ||epoch_millis"
+            },
+            # Keywords keep doc values for filters and aggregations; eager global ordinals
+            # build the term dictionaries on refresh instead of on the first aggregation
+            "sentiment": {
+                "type": "keyword",
+                "eager_global_ordinals": True
+            },
+            "detected_weapons": {
+                "type": "keyword",
+                "eager_global_ordinals": True
+            },
+            "weapon_count": {
+                "type": "short"
+            },
+            # Only read back through mget by incremental ingests, never searched
+            "content_hash": {
+                "type": "keyword",
+                "index": False,
+                "doc_values": False
+            },
+            "enrichment_version": {
+                "type": "keyword"
+            }
+        }
+    }
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Read size when hashing the ingested prefix
+HASH_BLOCK_BYTES = 1024 * 1024
+
+def _hash_prefix(path: str, end: int) -> str:
+    "Hash the first end bytes of a file in one sequential read"
+    digest = hashlib.sha1()
+    remaining = end
+    with open(path, 'rb') as f:
+        while remaining > 0:
+            block = f.read(min(HASH_BLOCK_BYTES, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+@dataclass
+class IngestCheckpoint:
+    """How far a data file has been ingested into an index, and what the file looked like then.
+
+    prefix_hash covers every byte up to offset, and version is the enrichment
+    version the prefix was processed with.
+    """
+    file_path: str
+    index: str
+    offset: int
+    size: int
+    # Empty in checkpoints saved before the whole prefix was hashed, which never match
+    prefix_hash: str = ""
+    rows: int = 0
+    updated_at: str = ""
+    version: str = ""
+
+    @classmethod
+    def create(cls, file_path: str, index: str, offset: int, rows: int, version: str = "") -> "IngestCheckpoint":
+        "Fingerprint the ingested prefix of a file"
+        return cls(
+            file_path=os.path.abspath(file_path),
+            index=index,
+            offset=offset,
+            size=os.path.getsize(file_path),
+            prefix_hash=_hash_prefix(file_path, offset),
+            rows=rows,
+            updated_at=datetime.now().isoformat(),
+            version=version
+        )
+
+    @classmethod
+    def load(cls, path: str) -> Optional["IngestCheckpoint"]:
+        "Read a saved checkpoint, or None if there is none or it is unreadable"
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            # Drop fields of older checkpoint formats
+            known = {field.name for field in fields(cls)}
+            return cls(**{key: value for key, value in data.items() if key in known})
+        except FileNotFoundError:
+            return None
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable ingest checkpoint {path}: {e}")
+            return None
+
+    def save(self, path: str) -> None:
+        "Write the checkpoint atomically"
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(asdict(self), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def resume_offset(self, file_path: str, index: str, version: str = "") -> int:
+        """Offset to resume reading from, or 0 when the file, index or version no longer match.
+
+        Resuming is only safe when rows were appended: the file must still be at
+        least as long and every byte of the ingested prefix must hash the same as
+        before, which reads the prefix once. A new enrichment version re-reads the
+        file so rows processed before it are redone.
+        """
+        try:
+            if os.path.abspath(file_path) != self.file_path or index != self.index:
+                return 0
+            if version != self.version:
+                logger.info(f"Enrichment version changed since the last ingest, reading {file_path} from the start")
+                return 0
+            if os.path.getsize(file_path) < self.offset:
+                logger.info(f"{file_path} shrank since the last ingest, reading it from the start")
+                return 0
+            if not self.prefix_hash or _hash_prefix(file_path, self.offset) != self.prefix_hash:
+                logger.info(f"{file_path} was modified since the last ingest, reading it from the start")
+                return 0
+            return self.offset
+        except OSError as e:
+            logger.warning(f"Could not verify ingest checkpoint for {file_path}: {e}")
+            return 0
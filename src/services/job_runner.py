@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .bulk_indexer import BulkReport
+from ..models.job import JobInfo, StageProgress
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+
+class JobConflictError(Exception):
+    """Raised when a job is submitted for an index that already has one running"""
+
+class IngestProgress:
+    """Live counters the ingest pipeline updates while a job runs.
+
+    The pipeline shares its own stats, position and bulk report objects here
+    instead of copying them, so snapshots always see the latest values.
+    """
+
+    def __init__(self):
+        "Initialize empty progress"
+        self.phase = "queued"
+        self.stats: Dict[str, int] = {}
+        self.position: Dict[str, int] = {}
+        self.report: Optional[BulkReport] = None
+        self.bytes_start = 0
+        self.bytes_total = 0
+        # Whether the run writes into the index readers see, rather than a new one behind the alias
+        self.live = False
+
+    @property
+    def bytes_read(self) -> int:
+        "Bytes of the data file read so far"
+        return max(0, self.position.get('offset', self.bytes_start))
+
+class Job:
+    """A background pipeline run and its progress"""
+
+    def __init__(self, index: str, incremental: bool = False):
+        "Create a queued job"
+        self.job_id = uuid.uuid4().hex
+        self.index = index
+        self.incremental = incremental
+        self.status = "queued"
+        self.progress = IngestProgress()
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+        self._started = 0.0
+        self._finished = 0.0
+
+    @property
+    def is_active(self) -> bool:
+        "Whether the job is queued or running"
+        return self.status in ACTIVE_STATUSES
+
+    def elapsed_seconds(self) -> float:
+        "Seconds the job has been running"
+        if not self._started:
+            return 0.0
+        return (self._finished or time.perf_counter()) - self._started
+
+    def to_info(self) -> JobInfo:
+        "Snapshot the job for API responses"
+        progress = self.progress
+        elapsed = self.elapsed_seconds()
+        stats = progress.stats
+        report = progress.report
+        counts = {
+            "read": stats.get("loaded", 0),
+            "unchanged": stats.get("unchanged", 0),
+            "dropped": stats.get("dropped", 0),
+            "indexed": report.indexed if report is not None else 0,
+            "deleted": report.deleted if report is not None else 0,
+            "failed": report.failed if report is not None else 0
+        }
+        stages = {
+            name: StageProgress(count=count, per_second=round(count / elapsed, 1) if elapsed > 0 else 0.0)
+            for name, count in counts.items()
+        }
+
+        percent = eta = None
+        bytes_read = progress.bytes_read
+        remaining = progress.bytes_total - progress.bytes_start
+        if remaining > 0:
+            done = min(bytes_read - progress.bytes_start, remaining)
+            percent = round(100.0 * done / remaining, 1)
+            if self.is_active and done > 0 and elapsed > 0:
+                # Reading runs at most a few batches ahead of indexing, so its rate bounds the whole run
+                eta = round((remaining - done) / (done / elapsed), 1)
+
+        return JobInfo(
+            job_id=self.job_id,
+            index=self.index,
+            status=self.status,
+            incremental=self.incremental,
+            phase=progress.phase if self.is_active else None,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            elapsed_seconds=round(elapsed, 3),
+            stages=stages,
+            bytes_read=bytes_read,
+            bytes_total=progress.bytes_total,
+            percent=percent,
+            eta_seconds=eta,
+            result=self.result,
+            error=self.error
+        )
+
+class JobRunner:
+    """Runs pipeline jobs as background tasks on the event loop, one active job per index"""
+
+    def __init__(self, max_history: Optional[int] = None):
+        "Initialize the runner, keeping the most recent finished jobs for inspection"
+        self.max_history = settings.JOB_HISTORY_SIZE if max_history is None else max_history
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+    def submit(self, index: str, run: Callable[[IngestProgress], Awaitable[Dict[str, Any]]],
+               incremental: bool = False) -> Job:
+        """Start a job for an index, raising JobConflictError if one is already active.
+
+        run receives the job's progress object and returns the pipeline result dict.
+        """
+        active = self.active_job(index)
+        if active is not None:
+            raise JobConflictError(f"Job {active.job_id} is already {active.status} for index {index}")
+        job = Job(index, incremental)
+        self._jobs[job.job_id] = job
+        job.task = asyncio.create_task(self._run(job, run))
+        self._prune()
+        logger.info(f"Queued job {job.job_id} for index {index}")
+        return job
+
+    async def _run(self, job: Job, run: Callable[[IngestProgress], Awaitable[Dict[str, Any]]]) -> None:
+        "Run a job, recording its outcome"
+        job.status = "running"
+        job.started_at = datetime.now()
+        job._started = time.perf_counter()
+        try:
+            job.result = await run(job.progress)
+            if job.result.get("status") == "success":
+                job.status = "completed"
+            else:
+                job.status = "failed"
+                job.error = job.result.get("message")
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            logger.info(f"Job {job.job_id} was cancelled")
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job._finished = time.perf_counter()
+            job.finished_at = datetime.now()
+            logger.info(f"Job {job.job_id} {job.status} after {job.elapsed_seconds():.1f}s")
+
+    def _prune(self) -> None:
+        "Forget the oldest finished jobs beyond the history size"
+        finished = [job_id for job_id, job in self._jobs.items() if not job.is_active]
+        for job_id in finished[:max(0, len(finished) - self.max_history)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        "Get a job by id"
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[Job]:
+        "Get all known jobs, newest first"
+        return list(reversed(self._jobs.values()))
+
+    def active_job(self, index: str) -> Optional[Job]:
+        "Get the queued or running job for an index, if any"
+        for job in self._jobs.values():
+            if job.index == index and job.is_active:
+                return job
+        return None
+
+    def cancel(self, job_id: str) -> bool:
+        "Request cancellation of an active job"
+        job = self._jobs.get(job_id)
+        if job is None or not job.is_active or job.task is None:
+            return False
+        job.task.cancel()
+        return True
+
+    async def shutdown(self) -> None:
+        "Cancel active jobs and wait for them to stop"
+        tasks = [job.task for job in self._jobs.values() if job.is_active and job.task is not None]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
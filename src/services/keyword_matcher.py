@@ -0,0 +1,128 @@
+import logging
+from collections import deque
+from typing import Dict, Hashable, Iterator, List, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+class _Automaton:
+    """Aho-Corasick automaton over sequences of hashable symbols (characters or tokens)"""
+
+    def __init__(self, patterns: List[Tuple[int, Sequence[Hashable]]]):
+        "Build the trie, failure links and merged outputs for the given (id, pattern) pairs"
+        self.goto: List[Dict[Hashable, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Tuple[int, int]]] = [[]]
+
+        for pattern_id, pattern in patterns:
+            if not pattern:
+                continue
+            state = 0
+            for symbol in pattern:
+                next_state = self.goto[state].get(symbol)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][symbol] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = next_state
+            self.output[state].append((pattern_id, len(pattern)))
+
+        # Breadth-first pass to link each state to its longest proper suffix state
+        queue = deque(self.goto[0].values())
+        order = []
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            for symbol, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and symbol not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(symbol, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+        # Resolve failure links ahead of time so matching is one dict lookup per symbol.
+        # Symbols missing from a state's table lead back to the root.
+        self.delta: List[Dict[Hashable, int]] = [dict(self.goto[0])] + [{} for _ in order]
+        for state in order:
+            table = dict(self.delta[self.fail[state]])
+            table.update(self.goto[state])
+            self.delta[state] = table
+
+    def iter_matches(self, sequence: Sequence[Hashable]) -> Iterator[Tuple[int, int, int]]:
+        "Yield (pattern_id, start, end) for every pattern occurrence in one pass"
+        delta, output = self.delta, self.output
+        state = 0
+        for position, symbol in enumerate(sequence):
+            state = delta[state].get(symbol, 0)
+            if output[state]:
+                for pattern_id, length in output[state]:
+                    yield pattern_id, position - length + 1, position + 1
+
+def _is_word_char(char: str) -> bool:
+    "Match the regex \\w class used by word-boundary detection"
+    return char.isalnum() or char == '_'
+
+class KeywordMatcher:
+    """Finds all single- and multi-word keywords in one linear pass over a text.
+
+    Supported semantics:
+    - substring: keyword appears anywhere in the lowercased text
+    - word: keyword appears between word boundaries (like the regex \\b detector)
+    - token: keyword tokens appear as an ordered sequence of analyzed tokens
+    """
+
+    SEMANTICS = ("substring", "word", "token")
+
+    def __init__(self, keywords: List[str]):
+        "Precompile character and token automata for the keyword list"
+        self.keywords = list(keywords)
+        self._char_automaton = _Automaton([
+            (keyword_id, keyword.lower()) for keyword_id, keyword in enumerate(self.keywords)
+        ])
+        self._token_automaton = _Automaton([
+            (keyword_id, keyword.lower().split()) for keyword_id, keyword in enumerate(self.keywords)
+        ])
+        logger.debug(f"Built keyword automata for {len(self.keywords)} keywords")
+
+    def _to_keywords(self, keyword_ids: Set[int]) -> List[str]:
+        "Return matched keywords in keyword list order"
+        return [self.keywords[keyword_id] for keyword_id in sorted(keyword_ids)]
+
+    def find_ids(self, text: str, semantics: str = "substring") -> Set[int]:
+        "Return ids of keywords found in text with the given semantics"
+        if semantics == "token":
+            raise ValueError("Token semantics need analyzed tokens, use find_token_ids")
+        if semantics not in self.SEMANTICS:
+            raise ValueError(f"Unknown match semantics: {semantics}")
+        if not text:
+            return set()
+
+        lowered = text.lower()
+        found: Set[int] = set()
+        for keyword_id, start, end in self._char_automaton.iter_matches(lowered):
+            if keyword_id in found:
+                continue
+            if semantics == "word":
+                if start > 0 and _is_word_char(lowered[start - 1]) and _is_word_char(lowered[start]):
+                    continue
+                if end < len(lowered) and _is_word_char(lowered[end]) and _is_word_char(lowered[end - 1]):
+                    continue
+            found.add(keyword_id)
+        return found
+
+    def find_token_ids(self, tokens: Sequence[str]) -> Set[int]:
+        "Return ids of keywords whose tokens appear in order in the token sequence"
+        if not tokens:
+            return set()
+        return {keyword_id for keyword_id, _, _ in self._token_automaton.iter_matches(tokens)}
+
+    def find(self, text: str, semantics: str = "substring") -> List[str]:
+        "Find keywords in text with the given semantics"
+        return self._to_keywords(self.find_ids(text, semantics))
+
+    def find_tokens(self, tokens: Sequence[str]) -> List[str]:
+        "Find keywords in a sequence of lowercase analyzed tokens"
+        return self._to_keywords(self.find_token_ids(tokens))
@@ -0,0 +1,259 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+LabelValues = Tuple[str, ...]
+
+# Seconds, from a fast ES round trip to a slow bulk request
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    "Render a Prometheus label set"
+    escape = lambda value: value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    "Render a sample value, integers without a fraction"
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), lock: Optional[threading.Lock] = None):
+        "Initialize an empty counter"
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = lock or threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        "Add to the counter of a label set"
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        "Current value of a label set"
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0.0)
+
+    def render(self) -> List[str]:
+        "Exposition lines for the counter"
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    """Cumulative bucket histogram with optional labels"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, lock: Optional[threading.Lock] = None):
+        "Initialize an empty histogram"
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+        self._lock = lock or threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        "Record one observation for a label set"
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * len(self.buckets)
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[position] += 1
+                    break
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def count(self, **labels: str) -> int:
+        "Number of observations of a label set"
+        return sum(self._counts.get(tuple(str(labels[name]) for name in self.labelnames), []))
+
+    def render(self) -> List[str]:
+        "Exposition lines for the histogram"
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key in sorted(self._counts):
+                cumulative = 0
+                for bound, count in zip(self.buckets, self._counts[key]):
+                    cumulative += count
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(self._sums[key])}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """In-process metrics rendered in the Prometheus text format"""
+
+    def __init__(self):
+        "Initialize an empty registry"
+        self._metrics: Dict[str, object] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        "Register a counter"
+        metric = self._metrics[name] = Counter(name, documentation, labelnames)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        "Register a histogram"
+        metric = self._metrics[name] = Histogram(name, documentation, labelnames, buckets)
+        return metric
+
+    def render(self) -> str:
+        "Every metric in the Prometheus text exposition format"
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+# Ingest pipeline, stage time is a running total so rates give the cost per item
+INGEST_STAGE_SECONDS = registry.counter(
+    "ingest_stage_seconds_total", "Time spent in each ingest stage", ("stage",))
+INGEST_STAGE_ITEMS = registry.counter(
+    "ingest_stage_items_total", "Documents handled by each ingest stage", ("stage",))
+INGEST_RUNS = registry.counter(
+    "ingest_runs_total", "Finished ingest runs", ("mode", "status"))
+INGEST_DURATION = registry.histogram(
+    "ingest_duration_seconds", "Duration of ingest runs", ("mode",),
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600))
+
+# ElasticSearch round trips, one observation per HTTP request including retries
+ES_REQUESTS = registry.counter(
+    "es_requests_total", "ElasticSearch HTTP requests by outcome", ("operation", "status"))
+ES_REQUEST_DURATION = registry.histogram(
+    "es_request_duration_seconds", "ElasticSearch HTTP round trip time", ("operation",))
+ES_REQUEST_BYTES = registry.counter(
+    "es_request_bytes_total", "Bytes sent to ElasticSearch", ("operation",))
+ES_RESPONSE_BYTES = registry.counter(
+    "es_response_bytes_total", "Bytes received from ElasticSearch", ("operation",))
+
+# Stage breakdown of the current request, set only while profiling it
+_profile: ContextVar[Optional[Dict[str, float]]] = ContextVar("profile", default=None)
+
+def start_profile() -> Dict[str, float]:
+    "Collect stage timings of the current request into the returned dict"
+    profile: Dict[str, float] = {}
+    _profile.set(profile)
+    return profile
+
+def add_to_profile(stage: str, seconds: float) -> None:
+    "Add time to a stage of the profiled request, if any"
+    profile = _profile.get()
+    if profile is not None:
+        profile[stage] = profile.get(stage, 0.0) + seconds
+
+@contextmanager
+def profiled(stage: str) -> Iterator[None]:
+    "Time a block as a stage of the profiled request, if any"
+    if _profile.get() is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_to_profile(stage, time.perf_counter() - start)
+
+def server_timing(profile: Dict[str, float]) -> str:
+    "Render a stage breakdown as a Server-Timing header value"
+    return ", ".join(f"{stage.replace('.', '-')};dur={seconds * 1000:.2f}" for stage, seconds in profile.items())
+
+def record_stage(stage: str, seconds: float, items: int = 0) -> None:
+    "Add time and documents to an ingest stage"
+    INGEST_STAGE_SECONDS.inc(seconds, stage=stage)
+    if items:
+        INGEST_STAGE_ITEMS.inc(items, stage=stage)
+    add_to_profile(stage, seconds)
+
+@contextmanager
+def stage_timer(stage: str, items: int = 0) -> Iterator[None]:
+    "Time a block as an ingest stage"
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start, items)
+
+def timed_iter(stage: str, items: Iterable[T], flush_every: int = 1000) -> Iterator[T]:
+    "Pass items through, counting the time spent producing them as a stage"
+    iterator = iter(items)
+    elapsed, count = 0.0, 0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                elapsed += time.perf_counter() - start
+                return
+            elapsed += time.perf_counter() - start
+            count += 1
+            if count >= flush_every:
+                record_stage(stage, elapsed, count)
+                elapsed, count = 0.0, 0
+            yield item
+    finally:
+        record_stage(stage, elapsed, count)
+
+def timed_map(stage: str, func: Callable[[T], R], items: Iterable[T], flush_every: int = 1000) -> Iterator[R]:
+    "Apply func to each item, counting the time spent in it as a stage"
+    elapsed, count = 0.0, 0
+    try:
+        for item in items:
+            start = time.perf_counter()
+            result = func(item)
+            elapsed += time.perf_counter() - start
+            count += 1
+            if count >= flush_every:
+                record_stage(stage, elapsed, count)
+                elapsed, count = 0.0, 0
+            yield result
+    finally:
+        record_stage(stage, elapsed, count)
+
+def es_operation(method: str, target: str) -> str:
+    """Name an ES request by its API, e.g. search, bulk, mget, pit or indices.create.
+
+    The first path segment starting with an underscore names the API; requests on
+    a bare index path are index-level operations named after the HTTP method.
+    """
+    path = target.split("?", 1)[0]
+    segments = [segment for segment in path.split("/") if segment]
+    for segment in segments:
+        if segment.startswith("_"):
+            return segment[1:]
+    if not segments:
+        return "info"
+    return {"HEAD": "indices.exists", "PUT": "indices.create", "DELETE": "indices.delete"}.get(method, f"index.{method.lower()}")
+
+def observe_es_request(operation: str, status: str, seconds: float, request_bytes: int, response_bytes: int) -> None:
+    "Record one ES HTTP round trip"
+    ES_REQUESTS.inc(operation=operation, status=status)
+    ES_REQUEST_DURATION.observe(seconds, operation=operation)
+    if request_bytes:
+        ES_REQUEST_BYTES.inc(request_bytes, operation=operation)
+    if response_bytes:
+        ES_RESPONSE_BYTES.inc(response_bytes, operation=operation)
+    add_to_profile(f"es.{operation}", seconds)
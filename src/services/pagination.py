@@ -0,0 +1,43 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# Sort for point-in-time scans, _shard_doc is the cheapest unique tiebreaker. Also
+# pages indices created before the id field was mapped, which CURSOR_SORT cannot sort
+PAGE_SORT = [{"created_at": {"order": "asc"}}, {"_shard_doc": "asc"}]
+
+# Sort for cursor pagination. The id keyword is unique and has doc values, so pages
+# resume with search_after alone and no point in time is held between requests
+CURSOR_SORT = [{"created_at": {"order": "asc"}}, {"id": {"order": "asc"}}]
+
+class InvalidCursorError(ValueError):
+    """Raised for malformed cursors and cursors whose index no longer exists"""
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    "Encode pagination state as an opaque url-safe cursor"
+    raw = json.dumps(state, separators=(",", ":")).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    "Decode a cursor produced by encode_cursor"
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise InvalidCursorError("Malformed cursor") from e
+    if not isinstance(state, dict) or "index" not in state or "after" not in state:
+        raise InvalidCursorError("Malformed cursor")
+    return state
+
+@dataclass
+class SearchPage:
+    """One page of search hits and the cursor for the next one.
+
+    cacheable is False when next_cursor holds a point in time, which expires.
+    """
+    documents: List[Dict[str, Any]]
+    next_cursor: Optional[str]
+    total: int
+    cacheable: bool = True
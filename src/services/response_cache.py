@@ -0,0 +1,154 @@
+import hashlib
+import logging
+import sqlite3
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# (etag, body) of a rendered response
+CachedResponse = Tuple[str, bytes]
+
+def make_etag(body: bytes) -> str:
+    "Strong ETag derived from the response body"
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    "Check an If-None-Match header against an ETag, using weak comparison as HTTP requires"
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+class ResponseCache:
+    """Bounded LRU cache of rendered read responses, keyed by index generation.
+
+    The generation counter is bumped whenever the indexed data changes (an ingest
+    starts or finishes, the alias is swapped), which orphans every earlier entry.
+    With a sqlite path the counter and entries are shared by every worker process
+    on the host, otherwise each process has its own.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, path: Optional[str] = None):
+        "Initialize the cache, opening the shared sqlite store when a path is configured"
+        self.max_size = settings.RESPONSE_CACHE_SIZE if max_size is None else max_size
+        self.path = settings.RESPONSE_CACHE_PATH if path is None else path
+        self._entries: "OrderedDict[Tuple[int, str], CachedResponse]" = OrderedDict()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._db: Optional[sqlite3.Connection] = None
+        if self.path:
+            try:
+                self._db = sqlite3.connect(self.path, check_same_thread=False)
+                self._db.execute("CREATE TABLE IF NOT EXISTS response_generation (id INTEGER PRIMARY KEY CHECK (id = 0), value INTEGER NOT NULL)")
+                self._db.execute("INSERT OR IGNORE INTO response_generation (id, value) VALUES (0, 0)")
+                self._db.execute("CREATE TABLE IF NOT EXISTS response_cache (key TEXT PRIMARY KEY, generation INTEGER NOT NULL, etag TEXT NOT NULL, body BLOB NOT NULL)")
+                self._db.commit()
+                logger.info(f"Opened shared response cache at {self.path}")
+            except sqlite3.Error as e:
+                logger.error(f"Could not open response cache at {self.path}, using memory only: {e}")
+                self._db = None
+
+    @property
+    def enabled(self) -> bool:
+        "Whether responses are cached at all"
+        return self.max_size > 0
+
+    @staticmethod
+    def make_key(path: str, params: Iterable[Tuple[str, str]]) -> str:
+        "Build the cache key of a request from its path and sorted query parameters"
+        query = "&".join(f"{name}={value}" for name, value in sorted(params))
+        return f"{path}?{query}"
+
+    @property
+    def generation(self) -> int:
+        "Current index generation, read from the shared store when there is one"
+        if self._db is not None:
+            try:
+                row = self._db.execute("SELECT value FROM response_generation WHERE id = 0").fetchone()
+                self._generation = row[0]
+            except sqlite3.Error as e:
+                logger.error(f"Error reading response cache generation: {e}")
+        return self._generation
+
+    def bump_generation(self) -> int:
+        "Invalidate every cached response, returning the new generation"
+        self._entries.clear()
+        if self._db is not None:
+            try:
+                self._db.execute("UPDATE response_generation SET value = value + 1 WHERE id = 0")
+                self._db.execute("DELETE FROM response_cache WHERE generation < (SELECT value FROM response_generation WHERE id = 0)")
+                self._db.commit()
+                return self.generation
+            except sqlite3.Error as e:
+                logger.error(f"Error bumping response cache generation: {e}")
+        self._generation += 1
+        return self._generation
+
+    def _remember(self, generation: int, key: str, entry: CachedResponse) -> None:
+        "Insert into the in-memory LRU, evicting the oldest entries past max_size"
+        self._entries[(generation, key)] = entry
+        self._entries.move_to_end((generation, key))
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get(self, generation: int, key: str) -> Optional[CachedResponse]:
+        "Look up a response rendered at the given generation"
+        if not self.enabled:
+            return None
+        entry = self._entries.get((generation, key))
+        if entry is not None:
+            self._entries.move_to_end((generation, key))
+        elif self._db is not None:
+            try:
+                row = self._db.execute(
+                    "SELECT etag, body FROM response_cache WHERE key = ? AND generation = ?", (key, generation)
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], bytes(row[1]))
+                    self._remember(generation, key, entry)
+            except sqlite3.Error as e:
+                logger.error(f"Error reading response cache: {e}")
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, generation: int, key: str, entry: CachedResponse) -> None:
+        "Store a response rendered at the given generation, unless the data changed meanwhile"
+        if not self.enabled or generation != self._generation:
+            return
+        self._remember(generation, key, entry)
+        if self._db is not None:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO response_cache (key, generation, etag, body) "
+                    "SELECT ?, ?, ?, ? WHERE ? = (SELECT value FROM response_generation WHERE id = 0)",
+                    (key, generation, entry[0], entry[1], generation)
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Error writing response cache: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        "Get the generation and hit counters"
+        lookups = self.hits + self.misses
+        return {
+            "generation": self._generation,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "shared": self._db is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def close(self) -> None:
+        "Close the sqlite store"
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -1,58 +1,167 @@
-import nltk
-from textblob import TextBlob
-from typing import List
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from importlib import metadata
+from typing import List, Optional, Tuple
 import logging
 
+from .enrichment_cache import EnrichmentCache
+from ..config.settings import settings
+
 logger = logging.getLogger(__name__)
 
+def _textblob_version() -> str:
+    "Installed TextBlob version, read without importing it"
+    try:
+        return metadata.version("textblob")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+# Bump when the scoring or labelling changes so cached results are recomputed
+SENTIMENT_VERSION = f"textblob-{_textblob_version()}-v1"
+
+# NLTK resources bundled into the image at build time, never downloaded at runtime
+NLTK_RESOURCES = {
+    "punkt": "tokenizers/punkt",
+    "stopwords": "corpora/stopwords",
+    "vader_lexicon": "sentiment/vader_lexicon.zip"
+}
+
+def missing_nltk_resources() -> List[str]:
+    "Names of the NLTK resources not found on the NLTK data path"
+    import nltk
+    missing = []
+    for name, path in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            missing.append(name)
+    return missing
+
+@lru_cache(maxsize=None)
+def _textblob():
+    """Import TextBlob on first use.
+
+    NLTK and TextBlob take a large share of the API's import time and read-only
+    workers never score text, so they are only loaded when enrichment needs them.
+    """
+    from textblob import TextBlob
+    missing = missing_nltk_resources()
+    if missing:
+        logger.warning(f"NLTK data not found: {', '.join(missing)}; install it with python -m nltk.downloader")
+    return TextBlob
+
+def _polarity_to_label(polarity: float) -> str:
+    "Convert polarity to sentiment categories"
+    if polarity > 0.1:
+        return 'positive'
+    elif polarity < -0.1:
+        return 'negative'
+    else:
+        return 'neutral'
+
+def score_text(text: str) -> Tuple[str, float]:
+    "Score one text with TextBlob, returning (label, polarity)"
+    if not text or not text.strip():
+        return 'neutral', 0.0
+    try:
+        polarity = _textblob()(text).sentiment.polarity # type: ignore
+        return _polarity_to_label(polarity), polarity
+    except Exception as e:
+        logger.error(f"Error in sentiment analysis: {e}")
+        return 'neutral', 0.0
+
+def score_texts(texts: List[str]) -> List[Tuple[str, float]]:
+    "Score a shard of texts, runs inside pool workers"
+    return [score_text(text) for text in texts]
+
+def _warm_worker() -> None:
+    "Load the TextBlob lexicon once per worker process"
+    score_text("warm up the sentiment lexicon")
+
 class SentimentService:
     """Service for sentiment analysis using NLTK and TextBlob"""
-    
-    def __init__(self):
-        "Initiaite sentiment"
-        try:
-            # Download required NLTK data (only needed once)
-            nltk.download('punkt', quiet=True)
-            nltk.download('stopwords', quiet=True)
-            nltk.download('vader_lexicon', quiet=True)
-            logger.info("NLTK data loaded successfully")
-        except Exception as e:
-            logger.warning(f"Could not download NLTK data: {e}")
-            
+
+    def __init__(self, workers: Optional[int] = None, cache: Optional[EnrichmentCache] = None):
+        "Initiaite sentiment, TextBlob and its NLTK data load on first use"
+        # Number of worker processes for batch scoring, 0 scores on a thread instead
+        self.workers = settings.SENTIMENT_WORKERS if workers is None else workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.cache = cache
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        "Create the worker pool on first use, with the lexicon preloaded in each worker"
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker
+            )
+            logger.info(f"Started sentiment pool with {self.workers} workers")
+        return self._pool
+
+    def close(self) -> None:
+        "Shut down the worker pool"
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def _cache_key(self, text: str) -> str:
+        "Cache key for a text under the current sentiment version"
+        return EnrichmentCache.make_key("sentiment", SENTIMENT_VERSION, text or "")
+
+    def _score_cached(self, texts: List[str]) -> List[Tuple[str, float]]:
+        "Score texts synchronously, computing only uncached unique texts"
+        if self.cache is None:
+            return score_texts(texts)
+        keys = [self._cache_key(text) for text in texts]
+        found, pending = self.cache.lookup(keys, texts)
+        if pending:
+            computed = list(zip(pending.keys(), score_texts(list(pending.values()))))
+            self.cache.put_many(computed)
+            found.update(computed)
+        return [tuple(found[key]) for key in keys] # type: ignore
+
     def analyze_sentiment(self, text: str) -> str:
         "Analyze sentiment using TextBlob"
-        if not text or not text.strip():
-            return 'neutral'
-        
-        try:
-            # Use TextBlob for sentiment analysis
-            blob = TextBlob(text)
-            polarity = blob.sentiment.polarity # type: ignore
-            
-            # Convert polarity to sentiment categories
-            if polarity > 0.1:
-                return 'positive'
-            elif polarity < -0.1:
-                return 'negative'
-            else:
-                return 'neutral'
-                
-        except Exception as e:
-            logger.error(f"Error in sentiment analysis: {e}")
-            return 'neutral'
-        
+        return self.analyze_with_score(text)[0]
+
+    def analyze_with_score(self, text: str) -> Tuple[str, float]:
+        "Get sentiment label and polarity score from a single TextBlob pass"
+        return self._score_cached([text])[0]
+
     def batch_analyze_sentiment(self, texts: List[str]) -> List[str]:
         "Analyze sentiment for multiple texts"
-        return [self.analyze_sentiment(text) for text in texts]
-    
+        return [label for label, _ in self._score_cached(texts)]
+
+    async def _score_in_pool(self, texts: List[str]) -> List[Tuple[str, float]]:
+        "Score texts across the worker pool without blocking the event loop"
+        if not texts:
+            return []
+        if self.workers <= 0:
+            return await asyncio.to_thread(score_texts, texts)
+
+        # One shard per worker, but never so small that pickling dominates
+        shard_size = max(settings.SENTIMENT_MIN_SHARD_SIZE, -(-len(texts) // self.workers))
+        shards = [texts[i:i + shard_size] for i in range(0, len(texts), shard_size)]
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        results = await asyncio.gather(*(loop.run_in_executor(pool, score_texts, shard) for shard in shards))
+        return [result for shard_result in results for result in shard_result]
+
+    async def analyze_batch_async(self, texts: List[str]) -> List[Tuple[str, float]]:
+        "Score a batch, sending only uncached unique texts to the worker pool"
+        if self.cache is None:
+            return await self._score_in_pool(texts)
+        keys = [self._cache_key(text) for text in texts]
+        found, pending = self.cache.lookup(keys, texts)
+        if pending:
+            computed = list(zip(pending.keys(), await self._score_in_pool(list(pending.values()))))
+            self.cache.put_many(computed)
+            found.update(computed)
+        return [tuple(found[key]) for key in keys] # type: ignore
+
     def get_sentiment_score(self, text: str) -> float:
         "Get detailed sentiment polarity score (-1.0 to 1.0)"
-        if not text or not text.strip():
-            return 0.0
-        
-        try:
-            blob = TextBlob(text)
-            return blob.sentiment.polarity # type: ignore
-        except Exception as e:
-            logger.error(f"Error getting sentiment score: {e}")
-            return 0.0
\ No newline at end of file
+        return self.analyze_with_score(text)[1]
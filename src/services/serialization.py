@@ -0,0 +1,37 @@
+import json
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+from ..models.document import MaliciousDocument
+
+# _source fields requested for lean responses, so they have the same shape as MaliciousDocument
+DOCUMENT_FIELDS: List[str] = list(MaliciousDocument.model_fields)
+
+def dumps(obj: Any) -> bytes:
+    "Serialize to compact UTF-8 JSON, with orjson when it is installed"
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode('utf-8')
+
+def dumps_lines(documents: List[Dict[str, Any]]) -> bytes:
+    "Serialize documents as newline delimited JSON"
+    return b"".join(dumps(doc) + b"\n" for doc in documents)
+
+def render_document_page(documents: List[Dict[str, Any]], total_count: int, message: Optional[str],
+                         next_cursor: Optional[str] = None, total_hits: Optional[int] = None) -> bytes:
+    """Render a DocumentResponse body straight from ES _source dicts.
+
+    Skips building and re-validating a MaliciousDocument per hit; the index mapping
+    already guarantees the field types.
+    """
+    return dumps({
+        "documents": documents,
+        "total_count": total_count,
+        "message": message,
+        "next_cursor": next_cursor,
+        "total_hits": total_hits
+    })
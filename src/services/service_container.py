@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from typing import Optional
+
+from elasticsearch import AsyncElasticsearch
+
+from .analytics import AnalyticsService
+from .elasticsearch_service import ElasticSearchService, create_es_client
+from .data_processing import DataProcessingService
+from .enrichment_cache import EnrichmentCache
+from .job_runner import JobRunner
+from .response_cache import ResponseCache
+from .sentiment import SentimentService
+from .weapons import WeaponsService
+
+logger = logging.getLogger(__name__)
+
+class ServiceContainer:
+    """Application-scoped services shared by every request"""
+
+    def __init__(self, es_client: Optional[AsyncElasticsearch] = None):
+        "Initialize an empty container, services are built on startup around es_client or a new client"
+        self.es_client: Optional[AsyncElasticsearch] = es_client
+        self.es_service: Optional[ElasticSearchService] = None
+        self.analytics_service: Optional[AnalyticsService] = None
+        self.enrichment_cache: Optional[EnrichmentCache] = None
+        self.sentiment_service: Optional[SentimentService] = None
+        self.weapons_service: Optional[WeaponsService] = None
+        self.processing_service: Optional[DataProcessingService] = None
+        self.job_runner: Optional[JobRunner] = None
+        self.response_cache: Optional[ResponseCache] = None
+        self._index_check: Optional[asyncio.Task] = None
+
+    async def startup(self) -> None:
+        "Create the es client, analyzers and keyword tables once"
+        logger.info("Starting application services...")
+        if self.es_client is None:
+            self.es_client = create_es_client()
+        self.enrichment_cache = EnrichmentCache()
+        self.weapons_service = WeaponsService(cache=self.enrichment_cache)
+        self.sentiment_service = SentimentService(cache=self.enrichment_cache)
+        self.es_service = ElasticSearchService(
+            client=self.es_client,
+            weapons_service=self.weapons_service
+        )
+        self.analytics_service = AnalyticsService(self.es_service)
+        self.job_runner = JobRunner()
+        self.response_cache = ResponseCache()
+        self.processing_service = DataProcessingService(
+            es_service=self.es_service,
+            sentiment_service=self.sentiment_service,
+            weapons_service=self.weapons_service,
+            job_runner=self.job_runner,
+            response_cache=self.response_cache
+        )
+        # In the background, so an unreachable node does not hold up startup
+        self._index_check = asyncio.create_task(self.es_service.check_index_version())
+
+    async def shutdown(self) -> None:
+        "Close the shared es connection pool and worker processes"
+        logger.info("Shutting down application services...")
+        if self._index_check is not None:
+            self._index_check.cancel()
+            await asyncio.gather(self._index_check, return_exceptions=True)
+        if self.job_runner is not None:
+            # Stop running ingests before closing the services they use
+            await self.job_runner.shutdown()
+        if self.sentiment_service is not None:
+            self.sentiment_service.close()
+        if self.enrichment_cache is not None:
+            self.enrichment_cache.close()
+        if self.response_cache is not None:
+            self.response_cache.close()
+        if self.es_client is not None:
+            await self.es_client.close()
+            self.es_client = None
@@ -0,0 +1,71 @@
+import logging
+from itertools import islice
+from typing import Any, Dict, Tuple
+
+from . import metrics
+from .document_batch import DocumentBatch
+
+logger = logging.getLogger(__name__)
+
+# Analyzers of this worker process, built once by init_worker
+_worker: Dict[str, Any] = {}
+
+def init_worker(cache_path: str, cache_size: int) -> None:
+    "Build the csv reader and analyzers once per ingest worker process"
+    from .csv_converter_service import CSVConverterService
+    from .data_processing import DataProcessingService
+    from .enrichment import EnrichmentService
+    from .enrichment_cache import EnrichmentCache
+    from .sentiment import SentimentService
+    from .weapons import WeaponsService
+
+    cache = EnrichmentCache(max_size=cache_size, path=cache_path)
+    weapons = WeaponsService(cache=cache)
+    _worker.update(
+        converter=CSVConverterService(),
+        normalize=DataProcessingService._try_normalize,
+        enrichment=EnrichmentService(SentimentService(workers=0, cache=cache), weapons, tokenizer="local")
+    )
+
+def _stage_totals() -> Dict[str, Tuple[float, float]]:
+    "Stage seconds and items recorded so far in this process"
+    seconds = metrics.INGEST_STAGE_SECONDS
+    items = metrics.INGEST_STAGE_ITEMS
+    return {
+        stage: (seconds.value(stage=stage), items.value(stage=stage))
+        for stage in ("load", "convert", "weapons", "sentiment")
+    }
+
+def process_shard(csv_path: str, start: int, end: int, index_name: str, batch_size: int) -> Dict[str, Any]:
+    """Parse, enrich and render one byte range of a csv, inside a worker process.
+
+    Returns the bulk lines of the relevant rows with the counters of the range and
+    the time its stages took, for the parent to record.
+    """
+    converter = _worker["converter"]
+    normalize = _worker["normalize"]
+    enrichment = _worker["enrichment"]
+    weapon_table = enrichment.weapons_service.weapon_table
+    before = _stage_totals()
+
+    rows = (record for record, _ in converter.iter_records_with_offsets(csv_path, start, end_offset=end))
+    normalized = metrics.timed_map("convert", lambda item: normalize(item, True), metrics.timed_iter("load", rows))
+    records = (record for record in normalized if record is not None)
+    items = []
+    loaded = dropped = 0
+    while True:
+        batch = DocumentBatch.from_records(islice(records, batch_size), weapon_table)
+        if not batch:
+            break
+        loaded += len(batch)
+        enrichment.enrich_documents_sync(batch)
+        kept = [row for row, relevant in enumerate(enrichment.relevant_rows(batch)) if relevant]
+        dropped += len(batch) - len(kept)
+        items.extend(batch.select(kept).bulk_items(index_name))
+
+    after = _stage_totals()
+    stages = {
+        stage: (after[stage][0] - before[stage][0], int(after[stage][1] - before[stage][1]))
+        for stage in after
+    }
+    return {"start": start, "end": end, "loaded": loaded, "dropped": dropped, "items": items, "stages": stages}
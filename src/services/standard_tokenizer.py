@@ -0,0 +1,152 @@
+import re
+import unicodedata
+from typing import List
+
+# Word break classes from the Unicode word segmentation rules (UAX #29) that the Lucene
+# StandardTokenizer behind the ES `standard` analyzer implements, one symbol per class
+ALETTER = "L"
+HEBREW = "H"
+NUMERIC = "N"
+KATAKANA = "K"
+EXTEND_NUM_LET = "U"
+MID_LETTER = "M"
+MID_NUM = "m"
+MID_NUM_LET = "P"
+SINGLE_QUOTE = "Q"
+DOUBLE_QUOTE = "D"
+IDEOGRAPHIC = "I"
+HIRAGANA = "G"
+SOUTHEAST_ASIAN = "S"
+EMOJI = "J"
+REGIONAL_INDICATOR = "R"
+EXTEND = "E"
+ZWJ = "Z"
+OTHER = "O"
+
+MID_LETTER_CHARS = frozenset("\u003a\u00b7\u0387\u055f\u05f4\u2027\ufe13\ufe55\uff1a")
+MID_NUM_CHARS = frozenset("\u002c\u003b\u037e\u0589\u060c\u060d\u066c\u07f8\u2044\ufe10\ufe14\ufe50\ufe54\uff0c\uff1b")
+MID_NUM_LET_CHARS = frozenset("\u002e\u2018\u2019\u2024\ufe52\uff07\uff0e")
+
+MAX_TOKEN_LENGTH = 255
+
+def char_class(char: str) -> str:
+    "Classify a character for word break purposes"
+    if char == "'":
+        return SINGLE_QUOTE
+    if char == '"':
+        return DOUBLE_QUOTE
+    if char in MID_NUM_LET_CHARS:
+        return MID_NUM_LET
+    if char in MID_LETTER_CHARS:
+        return MID_LETTER
+    if char in MID_NUM_CHARS:
+        return MID_NUM
+
+    code = ord(char)
+    if code == 0x200D:
+        return ZWJ
+    if 0x1F1E6 <= code <= 0x1F1FF:
+        return REGIONAL_INDICATOR
+    if 0x1F3FB <= code <= 0x1F3FF or 0xFE00 <= code <= 0xFE0F:
+        return EXTEND
+    if (0x1F000 <= code <= 0x1FAFF or 0x2600 <= code <= 0x27BF or 0x2300 <= code <= 0x23FF
+            or 0x2B00 <= code <= 0x2BFF):
+        return EMOJI
+
+    category = unicodedata.category(char)
+    if category in ('Mn', 'Me', 'Mc', 'Cf'):
+        return EXTEND
+    if category == 'Nd':
+        return NUMERIC
+    if category == 'Pc':
+        return EXTEND_NUM_LET
+    if 0x3040 <= code <= 0x309F:
+        return HIRAGANA
+    if 0x30A0 <= code <= 0x30FF or 0x31F0 <= code <= 0x31FF or 0xFF66 <= code <= 0xFF9F:
+        return KATAKANA
+    if (0x4E00 <= code <= 0x9FFF or 0x3400 <= code <= 0x4DBF or 0xF900 <= code <= 0xFAFF
+            or 0x20000 <= code <= 0x2FFFF or code in (0x3005, 0x3006, 0x3007)):
+        return IDEOGRAPHIC
+    if (0x0E00 <= code <= 0x0EFF or 0x1000 <= code <= 0x109F or 0x1780 <= code <= 0x17FF
+            or 0x1950 <= code <= 0x19DF):
+        return SOUTHEAST_ASIAN
+    if 0x05D0 <= code <= 0x05F2 or 0xFB1D <= code <= 0xFB4F:
+        return HEBREW
+    if char.isalpha() or category == 'Nl':
+        return ALETTER
+    return OTHER
+
+class _ClassTable(dict):
+    """str.translate table mapping code points to class symbols, filled on first sight"""
+
+    def __missing__(self, code: int) -> str:
+        symbol = char_class(chr(code))
+        self[code] = symbol
+        return symbol
+
+_CLASS_TABLE = _ClassTable()
+
+# Letters and numbers, joined across MidLetter/MidNum punctuation only when both sides qualify
+_JOIN = r"(?:(?<=[LH])[MPQ](?=[LH])|(?<=N)[mPQ](?=N)|(?<=H)D(?=H))"
+_ALNUM = rf"[LHN]+(?:{_JOIN}[LHN]+)*(?:(?<=H)Q)?"
+# Underscores (ExtendNumLet) glue letter/number and katakana runs together
+_WORD = rf"U*(?:{_ALNUM}|K+)(?:U+(?:{_ALNUM}|K+)?)*"
+
+_TOKEN_PATTERN = re.compile(
+    rf"(?=[LHNKUIGSJR])(?:{_WORD}|[IG]|S+|J|RR?)"
+)
+
+# Slower variant for texts with combining marks, variation selectors or joiners,
+# where extend characters belong to the unit they follow
+_X = r"[EZ]*"
+_ALNUM_EXTENDED = (
+    rf"(?:H{_X}(?:D{_X}(?=H)|[MPQ]{_X}(?=[LH])|Q{_X}(?![LHNKU]))?"
+    rf"|L{_X}(?:[MPQ]{_X}(?=[LH]))?"
+    rf"|N{_X}(?:[mPQ]{_X}(?=N))?)+"
+)
+_PIECE_EXTENDED = rf"(?:{_ALNUM_EXTENDED}|(?:K{_X})+)"
+_WORD_EXTENDED = rf"(?:U{_X})*{_PIECE_EXTENDED}(?:(?:U{_X})+{_PIECE_EXTENDED}?)*"
+
+_TOKEN_PATTERN_EXTENDED = re.compile(
+    rf"{_WORD_EXTENDED}"
+    rf"|[IG]{_X}"
+    rf"|(?:S{_X})+"
+    # Zero width joiners glue pictographs into one emoji sequence
+    rf"|J{_X}(?:(?<=Z)J{_X})*"
+    rf"|R{_X}(?:R{_X})?"
+)
+
+def _split_long(token: str) -> List[str]:
+    "Split tokens longer than the maximum token length, as Lucene does"
+    if len(token) <= MAX_TOKEN_LENGTH:
+        return [token]
+    return [token[i:i + MAX_TOKEN_LENGTH] for i in range(0, len(token), MAX_TOKEN_LENGTH)]
+
+def standard_tokenize(text: str) -> List[str]:
+    """Tokenize text the way the ES `standard` analyzer does, without a network call.
+
+    The text is mapped to one word break class symbol per character and the
+    segmentation rules run as a single compiled regex over that class string:
+    letters and digits joined, apostrophes and dots inside words, decimal numbers,
+    underscores, per-character CJK tokens and emoji sequences. Tokens are then
+    lowercased like the analyzer's lowercase filter.
+    """
+    if not text:
+        return []
+
+    classes = text.translate(_CLASS_TABLE)
+    pattern = _TOKEN_PATTERN_EXTENDED if ('E' in classes or 'Z' in classes) else _TOKEN_PATTERN
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # A few characters change length when lowercased, lowercase tokens one by one
+        return [piece for match in pattern.finditer(classes)
+                for piece in _split_long(text[match.start():match.end()].lower())]
+
+    tokens: List[str] = []
+    for match in pattern.finditer(classes):
+        start, end = match.span()
+        if end - start > MAX_TOKEN_LENGTH:
+            tokens.extend(_split_long(lowered[start:end]))
+        else:
+            tokens.append(lowered[start:end])
+    return tokens
@@ -1,28 +1,28 @@
-import re
 import os
-import nltk
+import hashlib
 import logging
-from typing import List
+from typing import List, Optional
+
+from .document_batch import WeaponTable
+from .enrichment_cache import EnrichmentCache
+from .keyword_matcher import KeywordMatcher
+from .standard_tokenizer import standard_tokenize
 
 logger = logging.getLogger(__name__)
 
 class WeaponsService:
     """Service for detecting weapon keywords in text"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[EnrichmentCache] = None):
         "Initialize service"
-        try:
-            # Download required NLTK data
-            nltk.download('punkt', quiet=True)
-            nltk.download('stopwords', quiet=True)
-            logger.info("NLTK data loaded for weapon detection")
-        except Exception as e:
-            logger.warning(f"Could not download NLTK data: {e}")
-            
         self.weapon_keywords = self._load_weapon_keywords()
-        # Create compiled regex patterns
-        self.weapon_patterns = [re.compile(r'\b' + re.escape(keyword) + r'\b', re.IGNORECASE) 
-                               for keyword in self.weapon_keywords]
+        # Precompile all keywords into one multi-pattern automaton
+        self.matcher = KeywordMatcher(self.weapon_keywords)
+        # Keyword ids for the weapon bitsets of document batches
+        self.weapon_table = WeaponTable(self.weapon_keywords)
+        # Cached detections are only valid for this exact keyword list
+        self.keywords_version = hashlib.sha1("\n".join(self.weapon_keywords).encode('utf-8')).hexdigest()[:16]
+        self.cache = cache
         
     def _load_weapon_keywords(self) -> List[str]:
         "Load weapon keywords from file"
@@ -58,43 +58,78 @@ class WeaponsService:
             "weapon", "firearm", "armament", "ordnance"
         ]
         
-    def detect_weapons(self, text: str) -> List[str]:
-        "Detect weapon keywords in text using NLTK tokenization"
+    def detect_weapons(self, text: str, semantics: str = "substring") -> List[str]:
+        """Detect weapon keywords in text in a single pass.
+
+        semantics selects how keywords match:
+        - substring: anywhere in the lowercased text (default)
+        - word: between word boundaries, like the regex detector
+        - token: as whole analyzed tokens, like the ES-backed detector
+        """
         if not text:
             return []
         
+        if self.cache is not None and semantics in self.matcher.SEMANTICS:
+            # Only token matching ignores whitespace, the other semantics key on the exact text
+            key = EnrichmentCache.make_key(f"weapons:{semantics}", self.keywords_version, text,
+                                           normalize=(semantics == "token"))
+            cached = self.cache.get(key)
+            if cached is not None:
+                return list(cached)
+            found = self._detect_weapons_uncached(text, semantics)
+            self.cache.put(key, found)
+            return found
+        return self._detect_weapons_uncached(text, semantics)
+    
+    def _detect_weapons_uncached(self, text: str, semantics: str) -> List[str]:
+        "Run the keyword matcher for one text"
         try:
-            # Use NLTK for better tokenization
-            tokens = nltk.word_tokenize(text.lower())
-            detected_weapons = []
-            
-            for keyword in self.weapon_keywords:
-                # Check for exact matches and partial matches
-                if (keyword.lower() in tokens or 
-                    keyword.lower() in text.lower() or
-                    any(keyword.lower() in token.lower() for token in tokens)):
-                    detected_weapons.append(keyword)
-            
-            return list(set(detected_weapons))  # Remove duplicates
+            if semantics == "token":
+                return self.match_tokens(self.tokenize(text))
+            return self.matcher.find(text, semantics)
         
+        except ValueError:
+            raise
         except Exception as e:
-            logger.error(f"Error in NLTK weapon detection, falling back to regex: {e}")
+            logger.error(f"Error in weapon detection, falling back to word matching: {e}")
             return self._detect_weapons_regex(text)
         
     def _detect_weapons_regex(self, text: str) -> List[str]:
-        "Backup weapon detection using regex patterns"
+        "Backup weapon detection with word-boundary semantics"
         if not text:
             return []
+        return self.matcher.find(text, "word")
+    
+    def tokenize(self, text: str) -> List[str]:
+        "Split text into the same lowercase tokens the ES standard analyzer produces"
+        return standard_tokenize(text)
+    
+    def match_tokens(self, tokens: List[str]) -> List[str]:
+        """Match weapon keywords against analyzed tokens.
+
+        - Single-word weapons match when present as a token
+        - Multi-word weapons match when their tokens appear as an ordered sequence
+        - Results keep keyword list order without duplicates
+        """
+        return self.matcher.find_tokens(tokens)
+    
+    def detect_weapons_in_tokens(self, text: str) -> List[str]:
+        "Detect weapons with the same token semantics as the ES-backed detection, without a network call"
+        return self.detect_weapons(text, semantics="token")
         
-        detected_weapons = []
-        for pattern in self.weapon_patterns:
-            if pattern.search(text):
-                # Extract the keyword from the pattern
-                keyword = pattern.pattern.replace(r'\b', '').replace(r'\\', '')
-                detected_weapons.append(keyword)
+    def batch_detect_weapons_in_tokens(self, texts: List[str]) -> List[List[str]]:
+        "Detect weapons with token semantics for a batch, matching each unique uncached text once"
+        if self.cache is None:
+            return [self.match_tokens(self.tokenize(text)) if text else [] for text in texts]
+        keys = [EnrichmentCache.make_key("weapons:token", self.keywords_version, text or "") for text in texts]
+        found, pending = self.cache.lookup(keys, texts)
+        if pending:
+            computed = [(key, self.match_tokens(self.tokenize(text)) if text else [])
+                        for key, text in pending.items()]
+            self.cache.put_many(computed)
+            found.update(computed)
+        return [list(found[key]) for key in keys]
         
-        return list(set(detected_weapons))
-    
     def batch_detect_weapons(self, texts: List[str]) -> List[List[str]]:
         "Detect weapons in multiple texts"
         return [self.detect_weapons(text) for text in texts]
@@ -0,0 +1,111 @@
+"""Conformance of the in-process standard tokenizer with the `_analyze` output in a fixture.
+
+The fixture's "source" says where its expectations come from. The checked-in ones
+are hand-written from the Lucene StandardTokenizer rules; replace them with real
+output from a running node with:
+
+    python -m scripts.check_tokenizer_parity --record tests/fixtures/standard_analyzer.json
+"""
+import asyncio
+import json
+import os
+
+import pytest
+from elastic_transport import ApiResponseMeta, HttpHeaders, NodeConfig
+from elasticsearch import BadRequestError
+
+from src.config.settings import settings
+from src.services.elasticsearch_service import ElasticSearchService
+from src.services.standard_tokenizer import standard_tokenize
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "standard_analyzer.json")
+
+with open(FIXTURE_PATH, encoding="utf-8") as f:
+    FIXTURE = json.load(f)
+
+CASES = FIXTURE["cases"]
+TEXTS = [case["text"] for case in CASES]
+
+def _utf16_length(text: str) -> int:
+    "Length in the UTF-16 code units ES counts offsets in"
+    return len(text.encode("utf-16-le")) // 2
+
+class FixtureAnalyzeClient:
+    """Stands in for the ES client, answering _analyze requests from the fixture"""
+
+    def __init__(self, max_token_count=None):
+        "Start with no requests seen, rejecting responses over max_token_count tokens like ES"
+        self.indices = self
+        self.requests = []
+        self.max_token_count = max_token_count
+
+    async def analyze(self, analyzer, text):
+        "Answer one _analyze request"
+        assert analyzer == FIXTURE["analyzer"]
+        self.requests.append(list(text))
+        response = self._response(text)
+        if self.max_token_count is not None and len(response["tokens"]) > self.max_token_count:
+            reason = (f"The number of tokens produced by calling _analyze has exceeded the allowed maximum of "
+                      f"[{self.max_token_count}]. This limit can be set by changing the "
+                      f"[index.analyze.max_token_count] index level setting.")
+            meta = ApiResponseMeta(status=400, http_version="1.1", headers=HttpHeaders(), duration=0.0,
+                                   node=NodeConfig("http", "localhost", 9200))
+            raise BadRequestError(reason, meta, {"error": {"type": "illegal_argument_exception", "reason": reason}})
+        return response
+
+    def _response(self, text):
+        "The fixture's response for the full array, or one assembled from each text's own tokens"
+        if list(text) == TEXTS:
+            return FIXTURE["batch"]
+        by_text = {case["text"]: case["tokens"] for case in CASES}
+        tokens, base = [], 0
+        for value in text:
+            for token in by_text[value]:
+                tokens.append(dict(token, start_offset=token["start_offset"] + base,
+                                   end_offset=token["end_offset"] + base))
+            # ES continues offsets across array values with an offset gap of 1
+            base += _utf16_length(value) + 1
+        return {"tokens": tokens}
+
+def _analyze(texts, max_token_count=None):
+    "Run analyze_texts against the fixture's responses"
+    client = FixtureAnalyzeClient(max_token_count)
+    results = asyncio.run(ElasticSearchService(client).analyze_texts(texts))
+    return results, client.requests
+
+@pytest.mark.parametrize("case", CASES, ids=[case["name"] for case in CASES])
+def test_standard_tokenize_matches_analyze(case):
+    assert standard_tokenize(case["text"]) == [token["token"] for token in case["tokens"]]
+
+@pytest.mark.parametrize("case", CASES, ids=[case["name"] for case in CASES])
+def test_fixture_offsets_slice_their_tokens(case):
+    units = case["text"].encode("utf-16-le")
+    for token in case["tokens"]:
+        piece = units[token["start_offset"] * 2:token["end_offset"] * 2].decode("utf-16-le")
+        assert piece.lower() == token["token"]
+
+def test_batch_offsets_map_tokens_to_their_texts():
+    results, requests = _analyze(TEXTS)
+    assert requests == [TEXTS]
+    assert results == [[token["token"] for token in case["tokens"]] for case in CASES]
+    assert results == [standard_tokenize(text) for text in TEXTS]
+
+def test_batches_split_by_count_and_size(monkeypatch):
+    monkeypatch.setattr(settings, "ANALYZE_BATCH_SIZE", 4)
+    monkeypatch.setattr(settings, "ANALYZE_MAX_BATCH_CHARS", 400)
+    texts = [""] + TEXTS[:10] + [""] + TEXTS[10:]
+    results, requests = _analyze(texts)
+    assert len(requests) > len(TEXTS) // 4
+    assert all(len(request) <= 4 for request in requests)
+    assert results == [standard_tokenize(text) for text in texts]
+
+def test_batches_over_the_token_limit_are_split():
+    most = max(len(case["tokens"]) for case in CASES)
+    results, requests = _analyze(TEXTS, max_token_count=most)
+    assert requests[0] == TEXTS
+    assert len(requests) > 1
+    assert results == [standard_tokenize(text) for text in TEXTS]
+
+def test_single_text_over_the_token_limit_is_tokenized_locally():
+    results, requests = _analyze(TEXTS, max_token_count=2)
+    assert results == [standard_tokenize(text) for text in TEXTS]